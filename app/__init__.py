@@ -2,13 +2,24 @@ from flask import Flask
 from flask_cors import CORS
 from config import Config
 from app.database import db
+from app.cache import cache
+from app.metrics import metrics
+from app.slowlog import slow_query_log
+from app.livefeed import live_feed
+from app.pool import engine_options, statement_timeouts
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
     
     # Initialize extensions
     db.init_app(app)
+    statement_timeouts.init_app(app)
+    cache.init_app(app)
+    metrics.init_app(app)
+    slow_query_log.init_app(app)
+    live_feed.init_app(app)
     CORS(app)
     
     # Register blueprints
@@ -0,0 +1,253 @@
+"""
+ASGI serving mode (asgi.py at the top level; pip install -r requirements-asgi.txt).
+
+    uvicorn asgi:app --workers 4
+
+The operational panels and the overview (ASYNC_BLUEPRINTS and ASYNC_ENDPOINTS)
+run on an async engine: each request gets an AsyncSession and runs the unchanged
+Flask view through AsyncSession.run_sync, with db.session pointed at it. SQLAlchemy
+drives the sync ORM code in a greenlet and awaits the driver for every round trip,
+so the five concurrent calls in loadDashboardData run side by side in one process.
+Identical concurrent GETs and HEADs share one execution unless ASGI_COALESCE is
+off; single_flight, which would block the loop on a threading.Event, is bypassed.
+
+run_sync still runs each view's Python code on the loop between queries, so the
+/analytical views, which aggregate and reshape their results in Python, run on the
+thread pool below instead of stalling every other request in the process.
+
+The live feed streams from LiveFeed.astream(). Everything else (analytical views,
+exports, pages and static files) runs on the plain WSGI app in a thread pool of
+ASGI_THREADS, streaming its body chunk by chunk; anything that uses db.engine
+directly instead of db.session stays on the synchronous pool.
+
+This mode is not a throughput win: load_test.py measured it at 0.78x the gunicorn
+deployment on SQLite, and there are no PostgreSQL/asyncpg numbers yet. What it buys
+is live feed streams that hold no worker threads and request coalescing.
+"""
+
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.exceptions import HTTPException
+from werkzeug.wrappers import Request
+from app.database import db
+from app.cache import cache_key
+from app.metrics import metrics
+from app.livefeed import live_feed
+from app.singleflight import COALESCED_UPSTREAM
+from app.pool import async_engine_options
+from app.routes.operational import live_topic
+
+ASYNC_DRIVERS = {'postgresql': 'postgresql+asyncpg', 'sqlite': 'sqlite+aiosqlite'}
+ASYNC_BLUEPRINTS = ('operational',)
+ASYNC_ENDPOINTS = {'api.get_overview_stats'}
+LIVE_ENDPOINT = 'operational.live_updates'
+
+def async_database_url(url):
+    """The async driver URL for a sync SQLAlchemy URL (postgresql:// -> postgresql+asyncpg://)"""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+def wsgi_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope and its request body"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name, value = name.decode('latin-1'), value.decode('latin-1')
+        if name == 'content-type':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'content-length':
+            environ['CONTENT_LENGTH'] = value
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+def _headers(headers):
+    return [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+class AsyncDashboard:
+    def __init__(self, app):
+        self.app = app
+        # Streams wait on the event loop here, so the live feed holds no threads
+        app.config['LIVE_FEED'] = True
+        self.engine = create_async_engine(
+            app.config.get('ASYNC_DATABASE_URL') or async_database_url(app.config['SQLALCHEMY_DATABASE_URI']),
+            **async_engine_options(app.config)
+        )
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        metrics.instrument(self.engine.sync_engine)
+        self.executor = ThreadPoolExecutor(app.config['ASGI_THREADS'], thread_name_prefix='wsgi')
+        self._inflight = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        environ = wsgi_environ(scope, body)
+        endpoint = self._endpoint(environ)
+        if endpoint == LIVE_ENDPOINT:
+            await self._live(environ, receive, send)
+        elif endpoint in ASYNC_ENDPOINTS or (endpoint or '').split('.')[0] in ASYNC_BLUEPRINTS:
+            status, headers, content = await self._coalesced(environ)
+            await send({'type': 'http.response.start', 'status': status, 'headers': _headers(headers)})
+            await send({'type': 'http.response.body',
+                        'body': b'' if environ['REQUEST_METHOD'] == 'HEAD' else content})
+        else:
+            await self._threaded(environ, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _endpoint(self, environ):
+        try:
+            endpoint, _ = self.app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            return None
+        return endpoint
+
+    async def _coalesced(self, environ):
+        environ[COALESCED_UPSTREAM] = True
+        if not self.app.config['ASGI_COALESCE'] or environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            return await self._run(environ)
+
+        # A HEAD shares the GET's execution; only the body is left out when sent
+        request = Request(environ)
+        key = cache_key(request.path, request.args)
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._run(environ))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A cancelled request must not cancel the others waiting on the same task
+        return await asyncio.shield(task)
+
+    async def _run(self, environ):
+        async with self.sessions() as session:
+            return await session.run_sync(self._dispatch, environ)
+
+    def _dispatch(self, session, environ):
+        """Run the Flask request for `environ` with db.session bound to `session` (in a greenlet)"""
+        # A fresh app context per request, even if the caller has one, gives each
+        # request its own db.session scope
+        app_ctx = self.app.app_context()
+        ctx = self.app.request_context(environ)
+        error = None
+        app_ctx.push()
+        ctx.push()
+        try:
+            db.session.registry.set(session)
+            try:
+                response = self.app.full_dispatch_request()
+            except Exception as e:
+                error = e
+                response = self.app.handle_exception(e)
+            return response.status_code, response.headers.to_wsgi_list(), response.get_data()
+        finally:
+            ctx.pop(error)
+            app_ctx.pop(error)
+
+    async def _live(self, environ, receive, send):
+        try:
+            topic = live_topic(Request(environ).args)
+        except ValueError:
+            # Let the view produce the 400
+            await self._threaded(environ, send)
+            return
+
+        disconnected = asyncio.ensure_future(self._disconnect(receive))
+        stream = live_feed.astream(topic)
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': _headers([
+                ('Content-Type', 'text/event-stream; charset=utf-8'),
+                ('Cache-Control', 'no-cache'),
+                ('X-Accel-Buffering', 'no'),
+            ])})
+            while True:
+                # Wait for the next event or the client leaving, whichever comes first
+                message = asyncio.ensure_future(stream.__anext__())
+                await asyncio.wait({message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    message.cancel()
+                    await asyncio.gather(message, return_exceptions=True)
+                    return
+                try:
+                    body = message.result().encode('utf-8')
+                except StopAsyncIteration:
+                    break
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        except OSError:
+            pass  # client went away mid-send
+        finally:
+            disconnected.cancel()
+            await stream.aclose()
+
+    async def _disconnect(self, receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    async def _threaded(self, environ, send):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._respond, environ, send, loop)
+
+    def _respond(self, environ, send, loop):
+        """Run the WSGI app on this thread, handing each chunk of its body to the loop"""
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = headers
+
+        def deliver(message):
+            # Waiting for each send gives slow clients backpressure
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        # The body is iterated on one thread, as stream_with_context generators expect
+        result = self.app(environ, start_response)
+        try:
+            deliver({'type': 'http.response.start', 'status': started['status'],
+                     'headers': _headers(started['headers'])})
+            for chunk in result:
+                if chunk:
+                    deliver({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            deliver({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
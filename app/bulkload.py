@@ -0,0 +1,182 @@
+"""
+COPY-based bulk loading for the import scripts.
+
+Rows are streamed from any iterable into `COPY <stage> FROM STDIN` on a temporary
+staging table, then merged into the real tables with INSERT ... SELECT ... ON
+CONFLICT, so a whole file costs a handful of statements instead of one per row.
+Staging tables are ON COMMIT DROP: stage and merge in one transaction, and nothing
+is left behind on a pooled (or PgBouncer) connection once it commits.
+
+    loader = BulkLoader(conn)
+    loader.load('tweet', ['tweet_id', 'user_id', ...], rows, conflict='(tweet_id) DO NOTHING')
+    conn.commit()
+    loader.report()
+"""
+
+import csv
+import io
+import time
+from datetime import datetime
+
+# NULL marker for COPY, so that None and '' stay distinct
+NULL = r'\N'
+
+class CsvStream(io.RawIOBase):
+    """File-like object that serialises rows to CSV lazily as COPY reads from it"""
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.count = 0
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator='\n')
+        self.pending = b''
+
+    def readable(self):
+        return True
+
+    def _fill(self, size):
+        for row in self.rows:
+            self.writer.writerow([NULL if value is None else value for value in row])
+            self.count += 1
+            if self.buffer.tell() >= size:
+                break
+        data = self.buffer.getvalue().encode('utf-8')
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = 1 << 16
+        if len(self.pending) < size:
+            self.pending += self._fill(size - len(self.pending))
+        data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+class BulkLoader:
+    """Stages rows with COPY and merges them into their tables, recording throughput"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.stats = []
+
+    def stage(self, name, columns, rows, like=None):
+        """
+        COPY `rows` into a fresh temporary table `name`, dropped at the next commit.
+        Its columns are either taken from table `like` or given as (column, type)
+        pairs. Returns the row count.
+        """
+        started = time.perf_counter()
+        with self.conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {name}")
+            if like:
+                cur.execute(f"CREATE TEMP TABLE {name} ON COMMIT DROP AS "
+                            f"SELECT {', '.join(columns)} FROM {like} WITH NO DATA")
+                names = columns
+            else:
+                cur.execute(f"CREATE TEMP TABLE {name} ({', '.join(f'{c} {t}' for c, t in columns)}) "
+                            f"ON COMMIT DROP")
+                names = [c for c, _ in columns]
+
+            stream = CsvStream(rows)
+            cur.copy_expert(f"COPY {name} ({', '.join(names)}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')", stream)
+
+        self._record(name, 'staged', stream.count, started)
+        return stream.count
+
+    def copy(self, table, columns, rows):
+        """COPY `rows` straight into `table`, for rows known not to conflict. Returns the row count."""
+        started = time.perf_counter()
+        stream = CsvStream(rows)
+        with self.conn.cursor() as cur:
+            cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')", stream)
+
+        self._record(table, 'copied', stream.count, started)
+        return stream.count
+
+    def merge(self, table, sql):
+        """Run an INSERT ... SELECT from a staging table and return the rows it inserted"""
+        started = time.perf_counter()
+        with self.conn.cursor() as cur:
+            cur.execute(sql)
+            inserted = cur.rowcount
+
+        self._record(table, 'merged', inserted, started)
+        return inserted
+
+    def load(self, table, columns, rows, conflict='DO NOTHING'):
+        """Stage `rows` for `columns` of `table` and merge them with ON CONFLICT `conflict`"""
+        stage = f'stage_{table}'
+        self.stage(stage, columns, rows, like=table)
+        column_list = ', '.join(columns)
+        inserted = self.merge(table, f"""
+            INSERT INTO {table} ({column_list})
+            SELECT {column_list} FROM {stage}
+            ON CONFLICT {conflict}
+        """)
+        self.drop(stage)
+        return inserted
+
+    def drop(self, name):
+        with self.conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {name}")
+
+    def _record(self, table, step, rows, started):
+        self.stats.append((table, step, rows, time.perf_counter() - started))
+
+    def report(self):
+        """Print rows and rows/sec for every staging and merge step"""
+        for table, step, rows, elapsed in self.stats:
+            rate = rows / elapsed if elapsed > 0 else 0
+            print(f"  {table:<24} {step:<7} {rows:>10,} rows in {elapsed:7.2f}s ({rate:,.0f} rows/s)")
+
+# FakeNewsNet article files, shared by import_data.py and import_politifact.py
+
+ARTICLE_STAGE_COLUMNS = [
+    ('article_id', 'VARCHAR(50)'),
+    ('source_id', 'INTEGER'),
+    ('title', 'VARCHAR(500)'),
+    ('url', 'VARCHAR(500)'),
+    ('label', 'VARCHAR(10)'),
+    ('created_at', 'TIMESTAMP'),
+    ('text', 'TEXT'),
+    ('category_id', 'INTEGER'),
+]
+
+def article_rows(filepath, label, source_id, category_id, id_prefix, start):
+    """Yield staging rows for one FakeNewsNet CSV file, numbering article ids from `start`"""
+    number = start
+    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+        for row in csv.DictReader(f):
+            title = row.get('title', '')[:500]  # Limit title length
+            url = row.get('news_url', row.get('url', ''))[:500]
+            
+            if not title or not url:
+                continue
+            
+            number += 1
+            content = row.get('content', row.get('text', '')) or None
+            yield (f"{id_prefix}_{number}", source_id, title, url, label, datetime.now(),
+                   content, category_id)
+
+def merge_staged_articles(loader, stage, link_without_content=False):
+    """Merge staged articles into news_article, news_content and article_category"""
+    articles = loader.merge('news_article', f"""
+        INSERT INTO news_article (article_id, source_id, title, url, label, created_at)
+        SELECT article_id, source_id, title, url, label, created_at FROM {stage}
+        ON CONFLICT (article_id) DO NOTHING
+    """)
+    loader.merge('news_content', f"""
+        INSERT INTO news_content (article_id, text)
+        SELECT article_id, text FROM {stage} WHERE text IS NOT NULL
+        ON CONFLICT (article_id) DO NOTHING
+    """)
+    content_filter = '' if link_without_content else 'AND text IS NOT NULL'
+    loader.merge('article_category', f"""
+        INSERT INTO article_category (article_id, category_id)
+        SELECT article_id, category_id FROM {stage}
+        WHERE category_id IS NOT NULL {content_filter}
+        ON CONFLICT DO NOTHING
+    """)
+    loader.drop(stage)
+    return articles
@@ -0,0 +1,217 @@
+"""
+Response cache for the dashboard endpoints.
+
+Views decorated with @cache.cached() store their JSON responses under a key built
+from the request path and its normalized query string. The backend is chosen by
+CACHE_TYPE:
+
+    "simple"  in-process LRU bounded by CACHE_MAX_ENTRIES (per worker)
+    "redis"   shared across gunicorn workers via CACHE_REDIS_URL (needs the redis package)
+    "null"    caching disabled
+
+Import scripts call invalidate_cache() when they finish loading data. It bumps the
+shared generation in Redis and touches CACHE_INVALIDATION_FILE, which every worker's
+in-process cache and search index (app/search.py) check before serving.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import urlencode
+from flask import current_app, g, request, Response
+from config import Config
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+class NullCache:
+    def get(self, key):
+        return None
+    
+    def set(self, key, value, timeout):
+        pass
+    
+    def clear(self):
+        pass
+
+class LRUCache:
+    """Thread-safe in-process cache with per-entry expiry and a bound on entry count"""
+    
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+class RedisCache:
+    """Cache shared by all workers; clear() moves every key to a new generation"""
+    
+    def __init__(self, url, prefix='dashboard-cache'):
+        if redis is None:
+            raise RuntimeError("CACHE_TYPE 'redis' requires the redis package")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+    
+    def _key(self, key):
+        generation = int(self.client.get(f'{self.prefix}:generation') or 0)
+        return f'{self.prefix}:{generation}:{key}'
+    
+    def get(self, key):
+        value = self.client.get(self._key(key))
+        return json.loads(value) if value is not None else None
+    
+    def set(self, key, value, timeout):
+        self.client.setex(self._key(key), timeout, json.dumps(value))
+    
+    def clear(self):
+        self.client.incr(f'{self.prefix}:generation')
+
+def create_backend(config):
+    cache_type = config.get('CACHE_TYPE', 'simple')
+    if cache_type == 'null':
+        return NullCache()
+    if cache_type == 'simple':
+        return LRUCache(config.get('CACHE_MAX_ENTRIES', 512))
+    if cache_type == 'redis':
+        return RedisCache(config['CACHE_REDIS_URL'])
+    raise ValueError(f"Unknown CACHE_TYPE: {cache_type}")
+
+def cache_key(path, args):
+    """Build a key from the path and the sorted, non-empty query parameters"""
+    params = sorted((name, value) for name, value in args.items(multi=True) if value != '')
+    return f'{path}?{urlencode(params)}' if params else path
+
+def _stamp_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def invalidation_stamp():
+    """Changes whenever invalidate_cache() runs, in this process or any other"""
+    return _stamp_mtime(current_app.config['CACHE_INVALIDATION_FILE'])
+
+class ResponseCache:
+    def __init__(self, app=None):
+        # Shared by request threads and the live feed's ticker
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        app.extensions['response_cache'] = {
+            'backend': create_backend(app.config),
+            'stamp': _stamp_mtime(app.config['CACHE_INVALIDATION_FILE'])
+        }
+    
+    @property
+    def backend(self):
+        state = current_app.extensions['response_cache']
+        # Another process (an import script) may have invalidated the cache
+        stamp = _stamp_mtime(current_app.config['CACHE_INVALIDATION_FILE'])
+        if stamp != state['stamp']:
+            state['stamp'] = stamp
+            state['backend'].clear()
+        return state['backend']
+    
+    def cached(self, timeout=None):
+        """Cache a view's successful JSON responses, keyed on path and query parameters"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if g.get('cache_bypass'):
+                    return view(*args, **kwargs)
+                backend = self.backend
+                key = cache_key(request.path, request.args)
+                entry = backend.get(key)
+                if entry is not None:
+                    with self._lock:
+                        self.hits += 1
+                    response = Response(entry['body'], status=entry['status'], mimetype=entry['mimetype'])
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+                
+                with self._lock:
+                    self.misses += 1
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code == 200 and response.mimetype == 'application/json':
+                    backend.set(key, {
+                        'body': response.get_data(as_text=True),
+                        'status': response.status_code,
+                        'mimetype': response.mimetype
+                    }, timeout or current_app.config['CACHE_DEFAULT_TIMEOUT'])
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+    
+    @contextmanager
+    def bypass(self):
+        """Run cached views in the current request without reading or filling the cache"""
+        g.cache_bypass = True
+        try:
+            yield
+        finally:
+            g.pop('cache_bypass', None)
+    
+    def clear(self):
+        self.backend.clear()
+    
+    def stats(self):
+        backend = current_app.extensions['response_cache']['backend']
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'backend': type(backend).__name__,
+            'entries': len(backend) if isinstance(backend, LRUCache) else None,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total > 0 else 0
+        }
+
+def invalidate_cache(config=Config):
+    """Drop cached dashboard responses in every worker; safe to call outside the app"""
+    from app.search import invalidate_search_index
+    path = config.CACHE_INVALIDATION_FILE
+    with open(path, 'a'):
+        os.utime(path, None)
+    if config.CACHE_TYPE == 'redis':
+        RedisCache(config.CACHE_REDIS_URL).clear()
+    # Other processes rebuild their search index when they see the new stamp
+    invalidate_search_index()
+
+cache = ResponseCache()
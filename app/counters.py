@@ -0,0 +1,83 @@
+"""
+Overview counters for /api/stats/overview.
+
+The dashboard_counters table holds one pre-aggregated row. It is maintained by the
+triggers in dashboard_queries.sql, and the import scripts call
+refresh_dashboard_counters() when they finish so the row is correct even without them.
+"""
+
+from sqlalchemy import func, true
+from sqlalchemy.exc import SQLAlchemyError
+from app.models import NewsArticle, User, Tweet, DashboardCounters
+from app.database import db
+
+COUNTER_FIELDS = ('total_articles', 'fake_articles', 'real_articles', 'total_users',
+                  'verified_users', 'total_tweets', 'total_retweets')
+
+REFRESH_COUNTERS_SQL = """
+    INSERT INTO dashboard_counters (counter_id, total_articles, fake_articles, real_articles,
+                                    total_users, verified_users, total_tweets, total_retweets,
+                                    updated_at)
+    SELECT 1, a.total, a.fake_count, a.real_count, u.total, u.verified_count,
+           t.total, t.retweet_sum, CURRENT_TIMESTAMP
+    FROM (SELECT COUNT(*) AS total,
+                 COUNT(*) FILTER (WHERE label = 'fake') AS fake_count,
+                 COUNT(*) FILTER (WHERE label = 'real') AS real_count
+          FROM news_article) a,
+         (SELECT COUNT(*) AS total,
+                 COUNT(*) FILTER (WHERE verified) AS verified_count
+          FROM users) u,
+         (SELECT COUNT(*) AS total,
+                 COALESCE(SUM(retweet_count), 0) AS retweet_sum
+          FROM tweet) t
+    WHERE TRUE
+    ON CONFLICT (counter_id) DO UPDATE SET
+        total_articles = EXCLUDED.total_articles,
+        fake_articles = EXCLUDED.fake_articles,
+        real_articles = EXCLUDED.real_articles,
+        total_users = EXCLUDED.total_users,
+        verified_users = EXCLUDED.verified_users,
+        total_tweets = EXCLUDED.total_tweets,
+        total_retweets = EXCLUDED.total_retweets,
+        updated_at = EXCLUDED.updated_at
+"""
+
+def refresh_dashboard_counters(cur):
+    """Recompute the counters row from the base tables using a DB-API cursor"""
+    cur.execute(REFRESH_COUNTERS_SQL)
+
+def compute_overview_counts():
+    """Compute every overview counter in one statement with FILTER aggregates"""
+    articles = db.session.query(
+        func.count().label('total_articles'),
+        func.count().filter(NewsArticle.label == 'fake').label('fake_articles'),
+        func.count().filter(NewsArticle.label == 'real').label('real_articles')
+    ).select_from(NewsArticle).subquery()
+    users = db.session.query(
+        func.count().label('total_users'),
+        func.count().filter(User.verified.is_(True)).label('verified_users')
+    ).select_from(User).subquery()
+    tweets = db.session.query(
+        func.count().label('total_tweets'),
+        func.coalesce(func.sum(Tweet.retweet_count), 0).label('total_retweets')
+    ).select_from(Tweet).subquery()
+    
+    # Each subquery returns exactly one row, so the cross join is one row too
+    row = db.session.query(articles, users, tweets).select_from(articles).join(
+        users, true()
+    ).join(
+        tweets, true()
+    ).one()
+    return {field: int(getattr(row, field) or 0) for field in COUNTER_FIELDS}
+
+def get_overview_counts():
+    """Read the counters row, falling back to a live aggregate if it is missing"""
+    try:
+        counters = db.session.get(DashboardCounters, 1)
+    except SQLAlchemyError:
+        db.session.rollback()
+        counters = None
+    
+    if counters is None:
+        return compute_overview_counts()
+    return {field: int(getattr(counters, field)) for field in COUNTER_FIELDS}
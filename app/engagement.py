@@ -0,0 +1,249 @@
+"""
+Vectorized synthetic engagement for seeding and load tests (needs numpy).
+
+Tweets, retweets, timestamps and engagement counts are sampled as NumPy arrays
+from the distributions in ENGAGEMENT_PROFILES, a batch at a time, and streamed
+straight into tweet and retweet with COPY. Tweet ids come from a contiguous
+range above the current MAX(tweet_id), so they never collide with existing rows.
+
+Profiles (each replaces one of the old seed scripts):
+    baseline  create_tweets.py: 0-8 tweets for the first 2000 articles
+    recent    create_more_engagement.py: 5-15 high-engagement tweets for the newest 100
+    verified  create_verified_engagement.py: 10-30 tweets from every verified user
+"""
+
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from app.bulkload import BulkLoader
+
+BATCH_SIZE = 500000
+
+MINUTE = 60
+DAY = 24 * 60 * MINUTE
+
+ENGAGEMENT_PROFILES = {
+    'baseline': dict(
+        articles="SELECT article_id, label FROM news_article LIMIT 2000",
+        authors="SELECT user_id FROM users",
+        per='article',
+        # Tweets per article: 0-8, most having 1-3
+        counts=dict(values=list(range(9)), weights=[20, 30, 25, 15, 5, 2, 1, 1, 1]),
+        # (probability, retweet range, favorite range) for viral, popular and regular tweets
+        tiers={None: [(0.10, (50, 500), (100, 1000)),
+                      (0.27, (10, 100), (20, 200)),
+                      (0.63, (0, 20), (0, 50))]},
+        age=(0, 30 * DAY),
+        retweets=dict(threshold=5, divisor=3, cap=20, delay=(1 * MINUTE, 2 * 60 * MINUTE)),
+        texts={None: [
+            "This is important news! #breaking #news",
+            "Everyone should read this article #mustread",
+            "Interesting story here #news #trending",
+            "This changes everything! #important",
+            "Can't believe this happened #shocking",
+            "Great reporting on this story #journalism",
+            "This is so relevant right now #current",
+            "Amazing story, thanks for sharing #awesome",
+            "This is concerning... #worried #news",
+            "Excellent piece of journalism #quality"
+        ]},
+    ),
+    'recent': dict(
+        articles="SELECT article_id, label FROM news_article ORDER BY created_at DESC LIMIT 100",
+        authors="SELECT user_id FROM users",
+        per='article',
+        counts=dict(low=5, high=15),
+        tiers={None: [(0.40, (100, 1000), (200, 2000)),
+                      (0.42, (25, 200), (50, 400)),
+                      (0.18, (5, 50), (10, 100))]},
+        age=(0, 25 * 60 * MINUTE),
+        retweets=dict(threshold=50, divisor=5, cap=30, delay=(1 * MINUTE, 90 * MINUTE)),
+        texts={None: [
+            "This is breaking news! 🚨 #breaking #news #important",
+            "Everyone needs to see this! Share now! #viral #news",
+            "This story is everywhere! Can't believe it #trending",
+            "MUST READ: This changes everything! #mustread #important",
+            "This is going viral for good reason! #viral #share",
+            "Breaking: Major development in this story! #breaking",
+            "This is the story everyone's talking about! #trending",
+            "Incredible reporting! Everyone should read this #journalism",
+            "This is huge news! Sharing immediately! #bignews",
+            "This story is spreading like wildfire! #viral"
+        ]},
+    ),
+    'verified': dict(
+        articles="SELECT article_id, label FROM news_article ORDER BY RANDOM() LIMIT 200",
+        authors="SELECT user_id FROM users WHERE verified = true",
+        per='author',
+        counts=dict(low=10, high=30),
+        # Verified users warn about fake news and promote real news, which gets more engagement
+        tiers={'fake': [(1.0, (20, 100), (50, 200))],
+               'real': [(1.0, (50, 300), (100, 500))]},
+        age=(1 * DAY, 90 * DAY),
+        retweets=dict(threshold=30, divisor=5, cap=20, delay=(1 * MINUTE, 60 * DAY)),
+        texts={
+            'fake': [
+                "⚠️ This article needs fact-checking. Be cautious about sharing. #FactCheck",
+                "🧐 Questionable claims in this article. Always verify sources! #MediaLiteracy",
+                "❌ This doesn't align with verified information. #FactCheck #News",
+                "🔍 Investigating this claim - preliminary findings suggest it's misleading.",
+                "📰 PSA: This article contains unverified information. Please fact-check!"
+            ],
+            'real': [
+                "✅ Important and verified news everyone should read. #News #TrustWorthySource",
+                "📢 Sharing this well-researched article. Great journalism! #News",
+                "👍 Solid reporting on an important issue. Worth reading. #QualityNews",
+                "📰 Excellent piece with proper sourcing and fact-checking. #Journalism",
+                "🎯 This article presents the facts clearly and objectively. #News"
+            ],
+        },
+    ),
+}
+
+TWEET_COLUMNS = ['tweet_id', 'user_id', 'article_id', 'content', 'retweet_count',
+                 'favorite_count', 'created_at']
+RETWEET_COLUMNS = ['tweet_id', 'user_id', 'retweeted_at']
+
+def _sample_counts(spec, size, rng):
+    if 'weights' in spec:
+        weights = np.asarray(spec['weights'], dtype=float)
+        return rng.choice(spec['values'], size=size, p=weights / weights.sum())
+    return rng.integers(spec['low'], spec['high'], size=size, endpoint=True)
+
+def _parents(profile, n_articles, n_authors, rng, total):
+    """Article and author index for every tweet to generate"""
+    if total is not None:
+        return rng.integers(0, n_articles, size=total), rng.integers(0, n_authors, size=total)
+
+    if profile['per'] == 'article':
+        articles = np.repeat(np.arange(n_articles), _sample_counts(profile['counts'], n_articles, rng))
+        return articles, rng.integers(0, n_authors, size=len(articles))
+
+    authors = np.repeat(np.arange(n_authors), _sample_counts(profile['counts'], n_authors, rng))
+    return rng.integers(0, n_articles, size=len(authors)), authors
+
+def _timestamps(now, seconds):
+    return np.datetime_as_string(np.datetime64(now, 's') - seconds.astype('timedelta64[s]'), unit='s')
+
+def _engagement(profile, labels, rng):
+    """Retweet and favorite counts drawn from each tweet's label-specific tier mix"""
+    size = len(labels)
+    retweets = np.zeros(size, dtype=np.int64)
+    favorites = np.zeros(size, dtype=np.int64)
+
+    for label, tiers in profile['tiers'].items():
+        mask = np.ones(size, dtype=bool) if label is None else labels == label
+        count = int(mask.sum())
+        if not count:
+            continue
+        probabilities = np.array([tier[0] for tier in tiers])
+        tier = rng.choice(len(tiers), size=count, p=probabilities / probabilities.sum())
+        rt_low, rt_high, fav_low, fav_high = (np.array([t[i][j] for t in tiers])[tier]
+                                              for i, j in ((1, 0), (1, 1), (2, 0), (2, 1)))
+        retweets[mask] = rng.integers(rt_low, rt_high, endpoint=True)
+        favorites[mask] = rng.integers(fav_low, fav_high, endpoint=True)
+
+    return retweets, favorites
+
+def _texts(profile, labels, rng):
+    texts = np.empty(len(labels), dtype=object)
+    for label, options in profile['texts'].items():
+        mask = np.ones(len(labels), dtype=bool) if label is None else labels == label
+        texts[mask] = np.array(options, dtype=object)[rng.integers(0, len(options), size=int(mask.sum()))]
+    return texts
+
+def generate_batches(profile, article_ids, article_labels, author_ids, retweeter_ids, rng,
+                     first_tweet_id, now, total=None, batch_size=BATCH_SIZE):
+    """
+    Yield (tweets, retweets) column dicts of NumPy arrays, `batch_size` tweets at a time.
+    `total` overrides the profile's per-article/per-author counts with that many tweets.
+    """
+    article_ids = np.asarray(article_ids, dtype=object)
+    article_labels = np.asarray(article_labels, dtype=object)
+    author_ids = np.asarray(author_ids, dtype=np.int64)
+    retweeter_ids = np.asarray(retweeter_ids, dtype=np.int64)
+    article_index, author_index = _parents(profile, len(article_ids), len(author_ids), rng, total)
+    spec = profile['retweets']
+
+    for start in range(0, len(article_index), batch_size):
+        articles = article_index[start:start + batch_size]
+        size = len(articles)
+        labels = article_labels[articles]
+        tweet_ids = first_tweet_id + start + np.arange(size, dtype=np.int64)
+        user_ids = author_ids[author_index[start:start + batch_size]]
+        ages = rng.integers(profile['age'][0], profile['age'][1], size=size, endpoint=True)
+        retweet_counts, favorite_counts = _engagement(profile, labels, rng)
+
+        tweets = {
+            'tweet_id': tweet_ids,
+            'user_id': user_ids,
+            'article_id': article_ids[articles],
+            'content': _texts(profile, labels, rng),
+            'retweet_count': retweet_counts,
+            'favorite_count': favorite_counts,
+            'created_at': _timestamps(now, ages),
+        }
+
+        # Popular tweets get retweets from random users, deduplicated and never by the author
+        per_tweet = np.where(retweet_counts > spec['threshold'],
+                             np.minimum(retweet_counts // spec['divisor'], spec['cap']), 0)
+        parent = np.repeat(np.arange(size), per_tweet)
+        retweeter = rng.integers(0, len(retweeter_ids), size=len(parent))
+        _, unique = np.unique(parent * len(retweeter_ids) + retweeter, return_index=True)
+        parent, retweeter = parent[unique], retweeter_ids[retweeter[unique]]
+        keep = retweeter != user_ids[parent]
+        parent, retweeter = parent[keep], retweeter[keep]
+        delays = rng.integers(spec['delay'][0], spec['delay'][1], size=len(parent), endpoint=True)
+
+        retweets = {
+            'tweet_id': tweet_ids[parent],
+            'user_id': retweeter,
+            'retweeted_at': _timestamps(now, np.maximum(ages[parent] - delays, 0)),
+        }
+        yield tweets, retweets
+
+def _rows(columns, names):
+    return zip(*(columns[name].tolist() for name in names))
+
+def generate_engagement(conn, profile_name, seed=None, total=None, batch_size=BATCH_SIZE):
+    """Generate and COPY one profile's engagement; returns (tweets, retweets) created"""
+    if np is None:
+        raise RuntimeError('The engagement generator needs the numpy package')
+
+    profile = ENGAGEMENT_PROFILES[profile_name]
+    with conn.cursor() as cur:
+        cur.execute(profile['articles'])
+        articles = cur.fetchall()
+        cur.execute(profile['authors'])
+        authors = [row[0] for row in cur.fetchall()]
+        cur.execute("SELECT user_id FROM users")
+        users = [row[0] for row in cur.fetchall()]
+        # Lock out concurrent writers so the id range stays ours
+        cur.execute("LOCK TABLE tweet IN SHARE ROW EXCLUSIVE MODE")
+        cur.execute("SELECT COALESCE(MAX(tweet_id), 0) + 1 FROM tweet")
+        first_tweet_id = cur.fetchone()[0]
+
+    if not articles or not authors:
+        print("No articles or users found")
+        return 0, 0
+
+    rng = np.random.default_rng(seed)
+    loader = BulkLoader(conn)
+    tweet_total = retweet_total = 0
+    started = time.perf_counter()
+
+    for tweets, retweets in generate_batches(profile, [a[0] for a in articles], [a[1] for a in articles],
+                                             authors, users, rng, first_tweet_id,
+                                             np.datetime64('now'), total, batch_size):
+        tweet_total += loader.copy('tweet', TWEET_COLUMNS, _rows(tweets, TWEET_COLUMNS))
+        retweet_total += loader.copy('retweet', RETWEET_COLUMNS, _rows(retweets, RETWEET_COLUMNS))
+        print(f"  {tweet_total:,} tweets, {retweet_total:,} retweets "
+              f"({tweet_total / (time.perf_counter() - started):,.0f} tweets/s)")
+
+    conn.commit()
+    loader.report()
+    return tweet_total, retweet_total
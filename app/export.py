@@ -0,0 +1,115 @@
+"""
+Streaming exports of articles, tweets and users as NDJSON or CSV.
+
+Rows are fetched through a server-side cursor (yield_per) and serialised one at a
+time, so memory use stays flat however large the export is.
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from sqlalchemy import select
+from app.models import NewsArticle, NewsSource, Tweet, User
+from app.filters import apply_article_filters
+from app.database import db
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+def _has_article_filters(args):
+    return any(args.get(name) for name in ('label', 'source_id', 'category_id'))
+
+def _articles_select(args):
+    query = select(
+        NewsArticle.article_id,
+        NewsArticle.title,
+        NewsArticle.label,
+        NewsArticle.source_id,
+        NewsSource.source_name,
+        NewsArticle.url,
+        NewsArticle.created_at
+    ).outerjoin(
+        NewsSource, NewsArticle.source_id == NewsSource.source_id
+    ).order_by(NewsArticle.article_id)
+    return apply_article_filters(query, args)
+
+def _tweets_select(args):
+    query = select(
+        Tweet.tweet_id,
+        Tweet.article_id,
+        Tweet.user_id,
+        Tweet.content,
+        Tweet.created_at,
+        Tweet.retweet_count,
+        Tweet.favorite_count
+    ).order_by(Tweet.tweet_id)
+    if _has_article_filters(args):
+        query = apply_article_filters(query.join(NewsArticle, Tweet.article_id == NewsArticle.article_id), args)
+    return query
+
+def _users_select(args):
+    query = select(
+        User.user_id,
+        User.username,
+        User.display_name,
+        User.verified,
+        User.followers_count,
+        User.following_count,
+        User.created_at
+    ).order_by(User.user_id)
+    if _has_article_filters(args):
+        # Users who shared at least one matching article
+        sharers = apply_article_filters(
+            select(Tweet.user_id).join(NewsArticle, Tweet.article_id == NewsArticle.article_id), args
+        )
+        query = query.filter(User.user_id.in_(sharers))
+    return query
+
+EXPORTS = {
+    'articles': _articles_select,
+    'tweets': _tweets_select,
+    'users': _users_select,
+}
+
+def _value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _stream_rows(entity, args):
+    result = db.session.execute(
+        EXPORTS[entity](args).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    try:
+        yield list(result.keys())
+        for row in result:
+            yield [_value(value) for value in row]
+    finally:
+        result.close()
+
+def _ndjson_lines(rows):
+    columns = next(rows)
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row))) + '\n'
+
+def _csv_lines(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+def stream_export(entity, fmt, args):
+    """Yield the serialised export of `entity` in `fmt`, one row at a time"""
+    rows = _stream_rows(entity, args)
+    if fmt == 'csv':
+        return _csv_lines(rows)
+    return _ndjson_lines(rows)
@@ -0,0 +1,16 @@
+from app.models import NewsArticle, NewsCategory
+
+def apply_article_filters(query, args):
+    """Apply the label, source_id and category_id filters shared by the article endpoints"""
+    label = args.get('label')  # 'fake' or 'real'
+    source_id = args.get('source_id', type=int)
+    category_id = args.get('category_id', type=int)
+    
+    if label:
+        query = query.filter(NewsArticle.label == label)
+    if source_id:
+        query = query.filter(NewsArticle.source_id == source_id)
+    if category_id:
+        query = query.join(NewsArticle.categories).filter(NewsCategory.category_id == category_id)
+    
+    return query
@@ -0,0 +1,228 @@
+"""
+Server-Sent Events feed for the operational dashboard.
+
+Dashboards subscribe to /operational/live with their filters (hours, label,
+sort) and receive these events:
+
+    overview    body of /api/stats/overview
+    viral       body of /operational/viral-content for the filters
+    categories  body of /operational/category-distribution for the hours
+
+One ticker thread per worker does the work for every open dashboard. Each
+LIVE_FEED_INTERVAL seconds it reads the overview counters (a primary-key lookup
+on PostgreSQL) and, only when they moved or LIVE_FEED_MAX_AGE has passed, renders
+each distinct panel that some subscriber needs once. A panel whose body changed
+is pushed to its subscribers; unchanged panels send nothing, so clients get
+deltas. Panels are rendered with their view functions, bypassing the response
+cache, so the payloads match the JSON endpoints.
+
+Under WSGI every open stream holds a server thread, so the feed is off unless
+LIVE_FEED is set, which only threaded workers should do (gunicorn's default sync
+workers would all end up holding streams); dashboards poll instead. The ASGI mode
+(asgi.py) turns it on and serves streams from astream(), which waits on the event
+loop instead.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from flask import current_app
+from app.cache import cache
+
+OVERVIEW = ('api.get_overview_stats', ())
+
+class Subscriber:
+    def __init__(self, topic, max_pending, notify=None):
+        self.topic = topic
+        self.queue = queue.Queue(max_pending)
+        self.notify = notify  # called from the ticker thread after queueing a message
+
+class LiveFeed:
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._latest = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.sequence = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._stop_ticker()
+        self.app = app
+        self.interval = app.config['LIVE_FEED_INTERVAL']
+        self.max_age = app.config['LIVE_FEED_MAX_AGE']
+        self.heartbeat = app.config['LIVE_FEED_HEARTBEAT']
+        self.max_pending = app.config['LIVE_FEED_MAX_PENDING']
+        self._latest = {}
+        self._rendered_at = 0.0
+
+    @staticmethod
+    def panels(topic):
+        """{event: (endpoint, query args)} pushed to subscribers of (hours, label, sort)"""
+        hours, label, sort = topic
+        viral_args = [('hours', hours), ('sort', sort)] + ([('label', label)] if label else [])
+        return {
+            'overview': OVERVIEW,
+            'viral': ('operational.viral_content', tuple(viral_args)),
+            'categories': ('operational.category_distribution', (('hours', hours),)),
+        }
+
+    def subscribe(self, topic, notify=None):
+        """Register a subscriber and queue the panels already rendered for it"""
+        subscriber = Subscriber(topic, self.max_pending, notify)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            pending = [(event, self._latest.get(panel)) for event, panel in self.panels(topic).items()]
+        for event, body in pending:
+            if body is not None:
+                self._send(subscriber, event, body)
+        if any(body is None for _, body in pending):
+            self._wake.set()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def stream(self, topic):
+        """SSE body for one dashboard; ends when the client goes away or falls too far behind"""
+        self._start()
+        subscriber = self.subscribe(topic)
+        try:
+            yield f'retry: {int(self.interval * 1000)}\n\n'
+            while True:
+                try:
+                    message = subscriber.queue.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def astream(self, topic):
+        """stream() for an event loop: waits for the ticker without holding a thread"""
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        self._start()
+        subscriber = self.subscribe(topic, notify=lambda: loop.call_soon_threadsafe(ready.set))
+        try:
+            yield f'retry: {int(self.interval * 1000)}\n\n'
+            while True:
+                try:
+                    message = subscriber.queue.get_nowait()
+                except queue.Empty:
+                    ready.clear()
+                    if subscriber.queue.empty():
+                        try:
+                            await asyncio.wait_for(ready.wait(), self.heartbeat)
+                        except asyncio.TimeoutError:
+                            yield ': keepalive\n\n'
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop,), name='live-feed',
+                                                daemon=True)
+                self._thread.start()
+
+    def _stop_ticker(self):
+        """Stop the ticker of a previous init_app, so it never ticks against the new app"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stop.set()
+        if thread is not None:
+            self._wake.set()
+            thread.join()
+
+    def _run(self, stop):
+        while not stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if stop.is_set():
+                return
+            try:
+                self.tick()
+            except Exception:
+                self.app.logger.exception('Live feed tick failed')
+
+    def tick(self):
+        """Render the panels subscribers need, once each, and push the ones that changed"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            latest = dict(self._latest)
+        if not subscribers:
+            return 0
+
+        needed = {panel for subscriber in subscribers for panel in self.panels(subscriber.topic).values()}
+        overview = self._render(OVERVIEW)
+        stale = (overview != latest.get(OVERVIEW)
+                 or time.monotonic() - self._rendered_at >= self.max_age)
+
+        rendered = {OVERVIEW: overview}
+        for panel in needed:
+            if panel not in rendered and (stale or panel not in latest):
+                rendered[panel] = self._render(panel)
+        if stale:
+            self._rendered_at = time.monotonic()
+
+        changed = {panel: body for panel, body in rendered.items()
+                   if body is not None and body != latest.get(panel)}
+        if not changed:
+            return 0
+        with self._lock:
+            self._latest.update(changed)
+            # Panels nobody is watching any more are rendered afresh if they come back
+            for panel in set(self._latest) - needed:
+                del self._latest[panel]
+            self.sequence += 1
+
+        for subscriber in subscribers:
+            for event, panel in self.panels(subscriber.topic).items():
+                if panel in changed:
+                    self._send(subscriber, event, changed[panel])
+        return len(changed)
+
+    def _render(self, panel):
+        endpoint, args = panel
+        view = self.app.view_functions[endpoint]
+        # Skip the response cache, which would serve the panel unchanged until it expires
+        with self.app.test_request_context(query_string=list(args)), cache.bypass():
+            response = current_app.make_response(view())
+            if response.status_code != 200:
+                return None
+            return response.get_data(as_text=True)
+
+    def _send(self, subscriber, event, body):
+        data = '\n'.join(f'data: {line}' for line in body.splitlines() or [''])
+        try:
+            subscriber.queue.put_nowait(f'id: {self.sequence}\nevent: {event}\n{data}\n\n')
+        except queue.Full:
+            # A client this far behind reconnects and starts from the latest panels
+            self.unsubscribe(subscriber)
+            try:
+                subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(None)
+            except (queue.Empty, queue.Full):
+                pass
+        if subscriber.notify is not None:
+            subscriber.notify()
+
+live_feed = LiveFeed()
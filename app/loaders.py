@@ -0,0 +1,155 @@
+"""
+Batched loaders that fetch related rows for a set of articles in a fixed number of
+queries, however many articles are requested.
+"""
+
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from app.models import NewsArticle, NewsCategory, ArticleCategory, Tweet, User
+from app.database import db
+
+TOP_TWEETS_LIMIT = 5
+
+def load_categories(article_ids):
+    """Fetch (category_id, category_name) pairs for a set of articles in a single query"""
+    categories = {article_id: [] for article_id in article_ids}
+    if not categories:
+        return categories
+    
+    rows = db.session.query(
+        ArticleCategory.article_id,
+        NewsCategory.category_id,
+        NewsCategory.category_name
+    ).join(
+        NewsCategory, ArticleCategory.category_id == NewsCategory.category_id
+    ).filter(
+        ArticleCategory.article_id.in_(list(categories))
+    ).order_by(
+        NewsCategory.category_name
+    ).all()
+    
+    for article_id, category_id, category_name in rows:
+        categories[article_id].append((category_id, category_name))
+    
+    return categories
+
+def load_category_names(article_ids):
+    """Fetch category names for a page of articles in a single query"""
+    return {article_id: [name for _, name in pairs]
+            for article_id, pairs in load_categories(article_ids).items()}
+
+def engagement_subquery(article_ids=None):
+    """Tweet count, retweet sum and favorite sum per article, as a joinable subquery"""
+    query = db.session.query(
+        Tweet.article_id.label('article_id'),
+        func.count(Tweet.tweet_id).label('tweet_count'),
+        func.coalesce(func.sum(Tweet.retweet_count), 0).label('total_retweets'),
+        func.coalesce(func.sum(Tweet.favorite_count), 0).label('total_favorites')
+    )
+    if article_ids is not None:
+        # A list of ids or a query selecting them
+        query = query.filter(Tweet.article_id.in_(article_ids))
+    return query.group_by(Tweet.article_id).subquery()
+
+def load_top_tweets(article_ids, limit=TOP_TWEETS_LIMIT):
+    """Fetch the most retweeted tweets per article, with their authors, in a single query"""
+    top_tweets = {article_id: [] for article_id in article_ids}
+    if not top_tweets:
+        return top_tweets
+    
+    ranked = db.session.query(
+        Tweet.tweet_id,
+        Tweet.article_id,
+        func.row_number().over(
+            partition_by=Tweet.article_id,
+            order_by=(Tweet.retweet_count.desc(), Tweet.tweet_id)
+        ).label('position')
+    ).filter(
+        Tweet.article_id.in_(list(top_tweets))
+    ).subquery()
+    
+    rows = db.session.query(
+        Tweet, User.username, User.verified, ranked.c.position
+    ).join(
+        ranked, ranked.c.tweet_id == Tweet.tweet_id
+    ).outerjoin(
+        User, Tweet.user_id == User.user_id
+    ).filter(
+        ranked.c.position <= limit
+    ).order_by(
+        ranked.c.article_id, ranked.c.position
+    ).all()
+    
+    for tweet, username, verified, _ in rows:
+        top_tweets[tweet.article_id].append({
+            'tweet_id': tweet.tweet_id,
+            'username': username,
+            'verified': verified if verified is not None else False,
+            'content': tweet.content,
+            'retweet_count': tweet.retweet_count,
+            'favorite_count': tweet.favorite_count
+        })
+    
+    return top_tweets
+
+def load_article_details(article_ids):
+    """
+    Build the /api/articles/<id> payload for each requested article in three queries:
+    articles with source, content and engagement totals; categories; top tweets.
+    Articles that do not exist are left out of the returned dict.
+    """
+    article_ids = list(dict.fromkeys(article_ids))
+    if not article_ids:
+        return {}
+    
+    engagement = engagement_subquery(article_ids)
+    rows = db.session.query(
+        NewsArticle,
+        engagement.c.tweet_count,
+        engagement.c.total_retweets,
+        engagement.c.total_favorites
+    ).outerjoin(
+        engagement, engagement.c.article_id == NewsArticle.article_id
+    ).options(
+        joinedload(NewsArticle.source),
+        joinedload(NewsArticle.content)
+    ).filter(
+        NewsArticle.article_id.in_(article_ids)
+    ).all()
+    
+    found_ids = [article.article_id for article, _, _, _ in rows]
+    categories = load_categories(found_ids)
+    top_tweets = load_top_tweets(found_ids)
+    
+    details = {}
+    for article, tweet_count, total_retweets, total_favorites in rows:
+        content = article.content
+        source = article.source
+        details[article.article_id] = {
+            'article_id': article.article_id,
+            'title': article.title,
+            'url': article.url,
+            'label': article.label,
+            'created_at': article.created_at.isoformat() if article.created_at else None,
+            'source': {
+                'source_id': source.source_id,
+                'source_name': source.source_name,
+                'credibility_rating': float(source.credibility_rating) if source.credibility_rating else None
+            } if source else None,
+            'content': {
+                'text': content.text if content else None,
+                'author': content.author if content else None,
+                'publish_date': content.publish_date.isoformat() if content and content.publish_date else None,
+                'word_count': content.word_count if content else None
+            },
+            'categories': [{'id': category_id, 'name': name}
+                           for category_id, name in categories[article.article_id]],
+            'engagement': {
+                'tweet_count': tweet_count or 0,
+                'total_retweets': total_retweets or 0,
+                'total_favorites': total_favorites or 0
+            },
+            'top_tweets': top_tweets[article.article_id]
+        }
+    
+    return details
@@ -0,0 +1,181 @@
+"""
+Per-route SQL and latency instrumentation.
+
+SQLAlchemy's before/after_cursor_execute events count the queries each request
+issues and time them; a JSON provider wrapper times response serialization. Every
+response gets a Server-Timing header:
+
+    Server-Timing: db;dur=12.40;desc="5 queries", serialize;dur=0.80, total;dur=15.10
+
+and per-route totals are served at /metrics in the Prometheus text format. Metrics
+are kept per process, so each gunicorn worker reports its own.
+"""
+
+import threading
+import time
+from flask import Response, current_app, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from app.database import db
+from app.slowlog import fingerprint, normalize_sql
+
+METRIC_PREFIX = 'dashboard'
+STATEMENT_LABEL_LENGTH = 200
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider that adds the time spent in dumps() to the current request"""
+
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            if has_request_context() and 'request_metrics' in g:
+                g.request_metrics['serialize'] += time.perf_counter() - started
+
+class RouteStats:
+    def __init__(self):
+        self.requests = {}
+        self.duration = 0.0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_time = 0.0
+        self.serialize = 0.0
+        self.slowest = (0.0, None)
+
+def _statement_label(normalized):
+    return normalized[:STATEMENT_LABEL_LENGTH]
+
+def _format(value):
+    # Counts stay integers; repr() keeps every digit of a float, where :g would round
+    # a long-running counter to six significant figures
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which goes away with the statement even when it
+    # fails and after_cursor_execute never fires
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_started', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    if not has_request_context() or 'request_metrics' not in g:
+        return
+    metrics = g.request_metrics
+    metrics['queries'] += 1
+    metrics['db_time'] += elapsed
+    if elapsed > metrics['slowest'][0]:
+        metrics['slowest'] = (elapsed, statement)
+
+class RequestMetrics:
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['request_metrics'] = {}
+        app.json = TimedJSONProvider(app)
+
+        with app.app_context():
+            for engine in db.engines.values():
+                self.instrument(engine)
+
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule('/metrics', 'metrics', self.render)
+
+    def instrument(self, engine):
+        """Count and time the statements run on `engine` (also the ASGI mode's async engine)"""
+        if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    def _start(self):
+        g.request_metrics = {'started': time.perf_counter(), 'queries': 0, 'db_time': 0.0,
+                             'serialize': 0.0, 'slowest': (0.0, None)}
+
+    def _finish(self, response):
+        metrics = g.pop('request_metrics', None)
+        if metrics is None:
+            return response
+        duration = time.perf_counter() - metrics['started']
+
+        response.headers.add('Server-Timing', ', '.join([
+            f'db;dur={metrics["db_time"] * 1000:.2f};desc="{metrics["queries"]} queries"',
+            f'serialize;dur={metrics["serialize"] * 1000:.2f}',
+            f'total;dur={duration * 1000:.2f}',
+        ]))
+
+        route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        routes = current_app.extensions['request_metrics']
+        with self._lock:
+            stats = routes.setdefault(route, RouteStats())
+            key = (request.method, response.status_code)
+            stats.requests[key] = stats.requests.get(key, 0) + 1
+            stats.duration += duration
+            stats.queries += metrics['queries']
+            stats.max_queries = max(stats.max_queries, metrics['queries'])
+            stats.db_time += metrics['db_time']
+            stats.serialize += metrics['serialize']
+            if metrics['slowest'][0] > stats.slowest[0]:
+                stats.slowest = (metrics['slowest'][0], normalize_sql(metrics['slowest'][1]))
+        return response
+
+    def snapshot(self):
+        """Per-route totals as plain dicts"""
+        with self._lock:
+            return {route: {
+                'requests': sum(stats.requests.values()),
+                'duration_seconds': stats.duration,
+                'queries': stats.queries,
+                'max_queries': stats.max_queries,
+                'db_seconds': stats.db_time,
+                'serialize_seconds': stats.serialize,
+                'slowest_query_seconds': stats.slowest[0],
+                'slowest_query': stats.slowest[1] and _statement_label(stats.slowest[1]),
+                'slowest_query_fingerprint': stats.slowest[1] and fingerprint(stats.slowest[1]),
+            } for route, stats in current_app.extensions['request_metrics'].items()}
+
+    def render(self):
+        """Prometheus text exposition of the per-route totals"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {METRIC_PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {METRIC_PREFIX}_{name} {kind}')
+            for labels, value in samples:
+                label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f'{METRIC_PREFIX}_{name}{{{label_text}}} {_format(value)}' if label_text
+                             else f'{METRIC_PREFIX}_{name} {_format(value)}')
+
+        with self._lock:
+            routes = sorted(current_app.extensions['request_metrics'].items())
+            metric('requests_total', 'counter', 'Requests handled, by route, method and status',
+                   [({'route': route, 'method': method, 'status': status}, count)
+                    for route, stats in routes for (method, status), count in sorted(stats.requests.items())])
+            metric('request_duration_seconds_total', 'counter', 'Total time spent handling requests',
+                   [({'route': route}, stats.duration) for route, stats in routes])
+            metric('db_queries_total', 'counter', 'SQL statements issued',
+                   [({'route': route}, stats.queries) for route, stats in routes])
+            metric('db_queries_per_request_max', 'gauge', 'Most SQL statements issued by a single request',
+                   [({'route': route}, stats.max_queries) for route, stats in routes])
+            metric('db_time_seconds_total', 'counter', 'Time spent executing SQL',
+                   [({'route': route}, stats.db_time) for route, stats in routes])
+            metric('serialize_seconds_total', 'counter', 'Time spent serializing JSON responses',
+                   [({'route': route}, stats.serialize) for route, stats in routes])
+            # Labelled with the slow query log's fingerprint of the normalized SQL, so
+            # literals in the statement can't mint new series; snapshot() keeps the SQL
+            metric('slowest_query_seconds', 'gauge', 'Slowest SQL statement seen for the route',
+                   [({'route': route, 'fingerprint': fingerprint(stats.slowest[1])}, stats.slowest[0])
+                    for route, stats in routes if stats.slowest[1] is not None])
+
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+metrics = RequestMetrics()
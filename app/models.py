@@ -14,6 +14,10 @@ class NewsSource(db.Model):
 
 class NewsArticle(db.Model):
     __tablename__ = 'news_article'
+    __table_args__ = (
+        # Supports keyset pagination over (created_at DESC, article_id DESC)
+        db.Index('idx_article_created_at_id', 'created_at', 'article_id'),
+    )
     
     article_id = db.Column(db.String(50), primary_key=True)
     source_id = db.Column(db.Integer, db.ForeignKey('news_source.source_id'))
@@ -132,4 +136,120 @@ class UserTimeline(db.Model):
     tweet_date = db.Column(db.DateTime)
     
     # Relationships
-    user = db.relationship('User', back_populates='timeline')
\ No newline at end of file
+    user = db.relationship('User', back_populates='timeline')
+
+class DashboardCounters(db.Model):
+    __tablename__ = 'dashboard_counters'
+    
+    # Single-row summary table kept current by triggers or the import scripts
+    counter_id = db.Column(db.Integer, primary_key=True, default=1)
+    total_articles = db.Column(db.BigInteger, nullable=False, default=0)
+    fake_articles = db.Column(db.BigInteger, nullable=False, default=0)
+    real_articles = db.Column(db.BigInteger, nullable=False, default=0)
+    total_users = db.Column(db.BigInteger, nullable=False, default=0)
+    verified_users = db.Column(db.BigInteger, nullable=False, default=0)
+    total_tweets = db.Column(db.BigInteger, nullable=False, default=0)
+    total_retweets = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ArticleDailyRollup(db.Model):
+    __tablename__ = 'article_daily_rollup'
+    
+    day = db.Column(db.Date, primary_key=True)
+    label = db.Column(db.String(10), primary_key=True)
+    source_id = db.Column(db.Integer, primary_key=True)  # 0 when the article has no source
+    article_count = db.Column(db.Integer, nullable=False, default=0)
+
+class ArticleEngagementDaily(db.Model):
+    __tablename__ = 'article_engagement_daily'
+    
+    # Tweets per article per day the tweets were posted
+    article_id = db.Column(db.String(50), primary_key=True)
+    day = db.Column(db.Date, primary_key=True, index=True)
+    tweet_count = db.Column(db.Integer, nullable=False, default=0)
+    total_retweets = db.Column(db.BigInteger, nullable=False, default=0)
+    total_favorites = db.Column(db.BigInteger, nullable=False, default=0)
+
+class CategoryDailyRollup(db.Model):
+    __tablename__ = 'category_daily_rollup'
+    
+    # Articles by the day they were created, with the engagement they have received
+    day = db.Column(db.Date, primary_key=True)
+    category_id = db.Column(db.Integer, primary_key=True)
+    label = db.Column(db.String(10), primary_key=True)
+    article_count = db.Column(db.Integer, nullable=False, default=0)
+    tweet_count = db.Column(db.BigInteger, nullable=False, default=0)
+    total_retweets = db.Column(db.BigInteger, nullable=False, default=0)
+
+class CategoryMonthlyRollup(db.Model):
+    __tablename__ = 'category_monthly_rollup'
+    
+    month = db.Column(db.Date, primary_key=True)  # first day of the month
+    category_id = db.Column(db.Integer, primary_key=True)
+    label = db.Column(db.String(10), primary_key=True)
+    article_count = db.Column(db.Integer, nullable=False, default=0)
+    tweet_count = db.Column(db.BigInteger, nullable=False, default=0)
+    total_retweets = db.Column(db.BigInteger, nullable=False, default=0)
+
+class RollupState(db.Model):
+    __tablename__ = 'rollup_state'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    refreshed_at = db.Column(db.DateTime)
+
+class UserEngagementProfile(db.Model):
+    __tablename__ = 'user_engagement_profile'
+    
+    # Per-user tweet activity, maintained by a tweet insert trigger (dashboard_queries.sql)
+    user_id = db.Column(db.BigInteger, db.ForeignKey('users.user_id'), primary_key=True)
+    tweet_count = db.Column(db.Integer, nullable=False, default=0)
+    articles_shared = db.Column(db.Integer, nullable=False, default=0)
+    fake_tweets = db.Column(db.Integer, nullable=False, default=0)
+    real_tweets = db.Column(db.Integer, nullable=False, default=0)
+    total_retweets = db.Column(db.BigInteger, nullable=False, default=0)
+    fake_retweets = db.Column(db.BigInteger, nullable=False, default=0)
+    real_retweets = db.Column(db.BigInteger, nullable=False, default=0)
+    first_activity = db.Column(db.DateTime)
+    last_activity = db.Column(db.DateTime)
+
+class SlowQueryLog(db.Model):
+    __tablename__ = 'slow_query_log'
+    
+    # Plans captured by the opt-in slow query log (app/slowlog.py)
+    log_id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(16), nullable=False, index=True)
+    normalized_sql = db.Column(db.Text, nullable=False)
+    route = db.Column(db.String(200))
+    duration_ms = db.Column(db.Float, nullable=False)
+    plan = db.Column(db.Text)  # JSON: EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL, EXPLAIN QUERY PLAN elsewhere
+    seq_scans = db.Column(db.String(500))  # comma-separated tables read by sequential scans
+    indexes_used = db.Column(db.String(500))
+    captured_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class ArticleEngagementHourly(db.Model):
+    __tablename__ = 'article_engagement_hourly'
+    
+    # Sliding-window engagement buckets for viral content (app/viral.py)
+    article_id = db.Column(db.String(50), primary_key=True)
+    hour = db.Column(db.DateTime, primary_key=True, index=True)
+    tweet_count = db.Column(db.Integer, nullable=False, default=0)
+    total_retweets = db.Column(db.BigInteger, nullable=False, default=0)
+    total_favorites = db.Column(db.BigInteger, nullable=False, default=0)
+
+class ArticleVelocity(db.Model):
+    __tablename__ = 'article_velocity'
+    
+    # Exponentially decayed tweet and retweet rates, as of velocity_state.refreshed_at (app/velocity.py)
+    article_id = db.Column(db.String(50), primary_key=True)
+    fast_rate = db.Column(db.Float, nullable=False, default=0)
+    slow_rate = db.Column(db.Float, nullable=False, default=0)
+    # The part of them from events before velocity_state.settled_at
+    settled_fast = db.Column(db.Float, nullable=False, default=0)
+    settled_slow = db.Column(db.Float, nullable=False, default=0)
+
+class VelocityState(db.Model):
+    __tablename__ = 'velocity_state'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    refreshed_at = db.Column(db.DateTime, nullable=False)
+    settled_at = db.Column(db.DateTime, nullable=False)
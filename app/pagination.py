@@ -0,0 +1,70 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+
+def encode_cursor(created_at, article_id):
+    """Encode an article's sort key as an opaque, URL-safe cursor"""
+    payload = json.dumps([created_at.isoformat(), article_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        created_at, article_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(created_at), str(article_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def keyset_ordering(created_at_col, article_id_col, before=None):
+    """ORDER BY clause matching keyset_seek: oldest first when paging backwards"""
+    if before:
+        return created_at_col.asc(), article_id_col.asc()
+    return created_at_col.desc(), article_id_col.desc()
+
+def keyset_seek(query, created_at_col, article_id_col, per_page, after=None, before=None):
+    """
+    Restrict a query to the per_page + 1 rows after (older than) or before (newer than)
+    a cursor in (created_at DESC, article_id DESC) order.
+    The extra row tells keyset_cursors whether another page exists.
+    """
+    sort_key = tuple_(created_at_col, article_id_col)
+    query = query.filter(created_at_col.isnot(None))
+    
+    if before:
+        query = query.filter(sort_key > tuple_(*decode_cursor(before)))
+    elif after:
+        query = query.filter(sort_key < tuple_(*decode_cursor(after)))
+    
+    return query.order_by(*keyset_ordering(created_at_col, article_id_col, before)).limit(per_page + 1)
+
+def keyset_cursors(rows, per_page, key, after=None, before=None):
+    """
+    Trim rows fetched by keyset_seek to one page in newest-first order.
+    `key` maps a row to its (created_at, article_id) sort key.
+    Returns (rows, next_cursor, prev_cursor).
+    """
+    if before:
+        has_newer = len(rows) > per_page
+        rows = list(reversed(rows[:per_page]))
+        has_older = True
+    else:
+        has_older = len(rows) > per_page
+        rows = rows[:per_page]
+        has_newer = bool(after)
+    
+    next_cursor = encode_cursor(*key(rows[-1])) if rows and has_older else None
+    prev_cursor = encode_cursor(*key(rows[0])) if rows and has_newer else None
+    
+    return rows, next_cursor, prev_cursor
+
+def keyset_page(query, created_at_col, article_id_col, per_page, after=None, before=None):
+    """
+    Seek to one page of a (created_at DESC, article_id DESC) ordered query.
+    
+    `after` returns the rows older than the cursor, `before` the rows newer than it.
+    Only per_page + 1 rows are read, so the cost does not depend on how deep the page is.
+    Returns (rows, next_cursor, prev_cursor).
+    """
+    rows = keyset_seek(query, created_at_col, article_id_col, per_page, after, before).all()
+    return keyset_cursors(rows, per_page, lambda row: (row.created_at, row.article_id), after, before)
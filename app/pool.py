@@ -0,0 +1,117 @@
+"""
+Connection pool settings, per-route statement timeouts and the import scripts'
+connection factory.
+
+engine_options() turns the DB_POOL_* settings into SQLAlchemy engine options
+(PostgreSQL only; SQLite keeps its defaults) for the app, the ASGI mode's async
+engine and the scripts alike.
+
+Every request transaction on PostgreSQL starts with SET LOCAL statement_timeout,
+taken from STATEMENT_TIMEOUTS for the request's blueprint (its route class). SET
+LOCAL ends with the transaction, so nothing leaks onto a server connection that
+PgBouncer hands to another client. With DB_PGBOUNCER set for transaction pooling,
+asyncpg's prepared statement caches are turned off and its statements get unique
+names; psycopg2 never prepares statements, so the sync engine needs no change.
+Queries cancelled by the timeout are raised as QueryTimeout and answered with a
+503; other OperationalErrors are left to Flask's usual 500 handling.
+
+Import scripts call get_db_connection() for a psycopg2 connection from one
+process-wide pool; close() hands it back.
+"""
+
+import threading
+import uuid
+from flask import current_app, has_request_context, jsonify, request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from config import Config
+
+QUERY_CANCELED = '57014'
+
+def engine_options(config, pool_size=None, max_overflow=None):
+    """Engine keyword arguments for the DB_POOL_* settings in `config`"""
+    if make_url(config['SQLALCHEMY_DATABASE_URI']).get_backend_name() != 'postgresql':
+        return {}
+    return {
+        'pool_size': pool_size if pool_size is not None else config['DB_POOL_SIZE'],
+        'max_overflow': max_overflow if max_overflow is not None else config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+def async_engine_options(config):
+    """engine_options() for the asyncpg engine, with prepared statements disabled behind PgBouncer"""
+    options = engine_options(config, config['ASYNC_POOL_SIZE'], config['ASYNC_MAX_OVERFLOW'])
+    if options and config['DB_PGBOUNCER']:
+        options['connect_args'] = {
+            'statement_cache_size': 0,
+            'prepared_statement_cache_size': 0,
+            # PgBouncer may hand the same server connection to several clients
+            'prepared_statement_name_func': lambda: f'__asyncpg_{uuid.uuid4()}__',
+        }
+    return options
+
+def statement_timeout_ms(config, blueprint):
+    """statement_timeout for a route class, in milliseconds (0: none)"""
+    return config['STATEMENT_TIMEOUTS'].get(blueprint, config['DEFAULT_STATEMENT_TIMEOUT'])
+
+class QueryTimeout(OperationalError):
+    """A statement cancelled by statement_timeout"""
+
+def _raise_query_timeouts(context):
+    orig = context.original_exception
+    if not isinstance(context.sqlalchemy_exception, OperationalError) or isinstance(orig, QueryTimeout):
+        return None
+    if getattr(orig, 'pgcode', None) == QUERY_CANCELED or getattr(orig, 'sqlstate', None) == QUERY_CANCELED:
+        return QueryTimeout(context.statement, context.parameters, orig)
+    return None
+
+class StatementTimeouts:
+    def __init__(self, app=None):
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not self._listening:
+            # Class-level, so they also cover the ASGI mode's async sessions and engine
+            event.listen(Session, 'after_begin', self._after_begin)
+            event.listen(Engine, 'handle_error', _raise_query_timeouts)
+            self._listening = True
+        app.register_error_handler(QueryTimeout, self._handle_query_timeout)
+
+    def _after_begin(self, session, transaction, connection):
+        if not has_request_context() or connection.dialect.name != 'postgresql':
+            return
+        timeout = statement_timeout_ms(current_app.config, request.blueprint)
+        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {int(timeout)}')
+
+    def _handle_query_timeout(self, e):
+        return jsonify({'error': 'The query took too long; try a narrower filter'}), 503
+
+statement_timeouts = StatementTimeouts()
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def script_engine():
+    """The process-wide engine behind get_db_connection(), created on first use"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            config = vars(Config)
+            url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+            if url.drivername == 'postgresql':
+                # SQLAlchemy 2.1 picks psycopg 3 for a bare postgresql:// URL; the
+                # scripts are written against psycopg2
+                url = url.set(drivername='postgresql+psycopg2')
+            _engine = create_engine(url, **engine_options(config))
+        return _engine
+
+def get_db_connection():
+    """A pooled DB-API (psycopg2) connection; close() returns it to the pool"""
+    return script_engine().raw_connection()
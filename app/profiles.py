@@ -0,0 +1,62 @@
+"""
+Per-user engagement profiles (user_engagement_profile).
+
+PostgreSQL keeps the table current with the tweet insert trigger in
+dashboard_queries.sql. refresh_user_profiles() rebuilds it from the tweet table,
+which is also how it is first populated.
+"""
+
+from datetime import datetime
+from sqlalchemy import delete, distinct, func, insert, select
+from app.models import NewsArticle, Tweet, UserEngagementProfile, RollupState
+from app.database import db
+
+PROFILE_STATE_NAME = 'user_engagement_profile'
+
+PROFILE_COLUMNS = ['user_id', 'tweet_count', 'articles_shared', 'fake_tweets', 'real_tweets',
+                   'total_retweets', 'fake_retweets', 'real_retweets', 'first_activity',
+                   'last_activity']
+
+def _profile_select():
+    """One row of profile columns per user, aggregated from tweets and article labels"""
+    is_fake = NewsArticle.label == 'fake'
+    is_real = NewsArticle.label == 'real'
+    return select(
+        Tweet.user_id,
+        func.count(Tweet.tweet_id),
+        func.count(distinct(Tweet.article_id)),
+        func.count(Tweet.tweet_id).filter(is_fake),
+        func.count(Tweet.tweet_id).filter(is_real),
+        func.coalesce(func.sum(Tweet.retweet_count), 0),
+        func.coalesce(func.sum(Tweet.retweet_count).filter(is_fake), 0),
+        func.coalesce(func.sum(Tweet.retweet_count).filter(is_real), 0),
+        func.min(Tweet.created_at),
+        func.max(Tweet.created_at)
+    ).outerjoin(
+        NewsArticle, Tweet.article_id == NewsArticle.article_id
+    ).where(
+        Tweet.user_id.isnot(None)
+    ).group_by(Tweet.user_id)
+
+def profiles_ready():
+    """True once refresh_user_profiles() has populated the table"""
+    return db.session.get(RollupState, PROFILE_STATE_NAME) is not None
+
+def refresh_user_profiles():
+    """Rebuild every profile from the tweet table"""
+    db.session.execute(delete(UserEngagementProfile))
+    db.session.execute(insert(UserEngagementProfile).from_select(PROFILE_COLUMNS, _profile_select()))
+    
+    state = db.session.get(RollupState, PROFILE_STATE_NAME) or RollupState(name=PROFILE_STATE_NAME)
+    state.refreshed_at = datetime.utcnow()
+    db.session.add(state)
+    db.session.commit()
+
+def compute_user_profile(user_id):
+    """Aggregate one user's profile live (unsaved); used when no stored row exists"""
+    row = db.session.execute(_profile_select().where(Tweet.user_id == user_id)).first()
+    if row is None:
+        return UserEngagementProfile(user_id=user_id, tweet_count=0, articles_shared=0,
+                                     fake_tweets=0, real_tweets=0, total_retweets=0,
+                                     fake_retweets=0, real_retweets=0)
+    return UserEngagementProfile(**dict(zip(PROFILE_COLUMNS, row)))
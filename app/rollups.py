@@ -0,0 +1,156 @@
+"""
+Daily and monthly rollup tables for the analytical dashboard.
+
+refresh_rollups() rebuilds the rows affected by recent activity:
+  - article_engagement_daily for tweets posted on or after `since`
+  - article_daily_rollup and category_daily_rollup for articles created on or after
+    `since`, plus the creation days of older articles that received those tweets
+  - category_monthly_rollup for the months containing any of those days
+With since=None every rollup is rebuilt from scratch. Tweets inserted with a
+timestamp older than `since` are only picked up by a full rebuild.
+"""
+
+from datetime import datetime, time
+from sqlalchemy import Date, cast, delete, func, insert, select
+from app.models import (NewsArticle, ArticleCategory, Tweet, ArticleDailyRollup,
+                        ArticleEngagementDaily, CategoryDailyRollup, CategoryMonthlyRollup,
+                        RollupState)
+from app.database import db
+
+ROLLUP_STATE_NAME = 'analytical_rollups'
+
+def _day(column):
+    return func.date(column, type_=Date)
+
+def _month(column):
+    if db.engine.dialect.name == 'postgresql':
+        return cast(func.date_trunc('month', column), Date)
+    return func.date(column, 'start of month', type_=Date)
+
+def rollups_ready():
+    """True once refresh_rollups() has populated the rollup tables"""
+    return db.session.get(RollupState, ROLLUP_STATE_NAME) is not None
+
+def _refresh_engagement(since_start):
+    tweet_day = _day(Tweet.created_at)
+    stmt = delete(ArticleEngagementDaily)
+    source = select(
+        Tweet.article_id,
+        tweet_day,
+        func.count(Tweet.tweet_id),
+        func.coalesce(func.sum(Tweet.retweet_count), 0),
+        func.coalesce(func.sum(Tweet.favorite_count), 0)
+    ).where(
+        Tweet.article_id.isnot(None),
+        Tweet.created_at.isnot(None)
+    )
+    if since_start is not None:
+        stmt = stmt.where(ArticleEngagementDaily.day >= since_start.date())
+        source = source.where(Tweet.created_at >= since_start)
+    
+    db.session.execute(stmt)
+    db.session.execute(insert(ArticleEngagementDaily).from_select(
+        ['article_id', 'day', 'tweet_count', 'total_retweets', 'total_favorites'],
+        source.group_by(Tweet.article_id, tweet_day)
+    ))
+
+def _affected_days(since_start):
+    """Creation days whose article or category rollups need rebuilding"""
+    article_day = _day(NewsArticle.created_at)
+    new_articles = select(article_day).distinct().where(NewsArticle.created_at >= since_start)
+    new_engagement = select(article_day).distinct().join(
+        ArticleEngagementDaily, ArticleEngagementDaily.article_id == NewsArticle.article_id
+    ).where(
+        ArticleEngagementDaily.day >= since_start.date()
+    )
+    days = set(db.session.scalars(new_articles)) | set(db.session.scalars(new_engagement))
+    days.discard(None)
+    return days
+
+def _refresh_article_rollups(days):
+    article_day = _day(NewsArticle.created_at)
+    
+    # Engagement is summed per article first, so joining to categories does not fan out
+    engagement = select(
+        ArticleEngagementDaily.article_id,
+        func.sum(ArticleEngagementDaily.tweet_count).label('tweet_count'),
+        func.sum(ArticleEngagementDaily.total_retweets).label('total_retweets')
+    ).group_by(ArticleEngagementDaily.article_id).subquery()
+    
+    articles = select(
+        article_day,
+        NewsArticle.label,
+        func.coalesce(NewsArticle.source_id, 0),
+        func.count(NewsArticle.article_id)
+    ).where(NewsArticle.created_at.isnot(None))
+    categories = select(
+        article_day,
+        ArticleCategory.category_id,
+        NewsArticle.label,
+        func.count(NewsArticle.article_id),
+        func.coalesce(func.sum(engagement.c.tweet_count), 0),
+        func.coalesce(func.sum(engagement.c.total_retweets), 0)
+    ).join(
+        ArticleCategory, ArticleCategory.article_id == NewsArticle.article_id
+    ).outerjoin(
+        engagement, engagement.c.article_id == NewsArticle.article_id
+    ).where(NewsArticle.created_at.isnot(None))
+    clear_articles = delete(ArticleDailyRollup)
+    clear_categories = delete(CategoryDailyRollup)
+    
+    if days is not None:
+        first_day = datetime.combine(min(days), time.min)
+        articles = articles.where(NewsArticle.created_at >= first_day, article_day.in_(days))
+        categories = categories.where(NewsArticle.created_at >= first_day, article_day.in_(days))
+        clear_articles = clear_articles.where(ArticleDailyRollup.day.in_(days))
+        clear_categories = clear_categories.where(CategoryDailyRollup.day.in_(days))
+    
+    db.session.execute(clear_articles)
+    db.session.execute(insert(ArticleDailyRollup).from_select(
+        ['day', 'label', 'source_id', 'article_count'],
+        articles.group_by(article_day, NewsArticle.label, func.coalesce(NewsArticle.source_id, 0))
+    ))
+    db.session.execute(clear_categories)
+    db.session.execute(insert(CategoryDailyRollup).from_select(
+        ['day', 'category_id', 'label', 'article_count', 'tweet_count', 'total_retweets'],
+        categories.group_by(article_day, ArticleCategory.category_id, NewsArticle.label)
+    ))
+
+def _refresh_monthly_rollups(days):
+    month = _month(CategoryDailyRollup.day)
+    months_source = select(
+        month,
+        CategoryDailyRollup.category_id,
+        CategoryDailyRollup.label,
+        func.sum(CategoryDailyRollup.article_count),
+        func.sum(CategoryDailyRollup.tweet_count),
+        func.sum(CategoryDailyRollup.total_retweets)
+    )
+    clear = delete(CategoryMonthlyRollup)
+    if days is not None:
+        months = {day.replace(day=1) for day in days}
+        months_source = months_source.where(CategoryDailyRollup.day >= min(months), month.in_(months))
+        clear = clear.where(CategoryMonthlyRollup.month.in_(months))
+    
+    db.session.execute(clear)
+    db.session.execute(insert(CategoryMonthlyRollup).from_select(
+        ['month', 'category_id', 'label', 'article_count', 'tweet_count', 'total_retweets'],
+        months_source.group_by(month, CategoryDailyRollup.category_id, CategoryDailyRollup.label)
+    ))
+
+def refresh_rollups(since=None):
+    """Rebuild rollup rows touched since the given date (everything when since is None)"""
+    since_start = datetime.combine(since, time.min) if since is not None else None
+    
+    _refresh_engagement(since_start)
+    days = _affected_days(since_start) if since_start is not None else None
+    if days is None or days:
+        _refresh_article_rollups(days)
+        _refresh_monthly_rollups(days)
+    
+    state = db.session.get(RollupState, ROLLUP_STATE_NAME) or RollupState(name=ROLLUP_STATE_NAME)
+    state.refreshed_at = datetime.utcnow()
+    db.session.add(state)
+    db.session.commit()
+    
+    return len(days) if days is not None else None
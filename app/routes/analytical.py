@@ -1,7 +1,13 @@
 from flask import Blueprint, render_template, request, jsonify
-from app.models import NewsArticle, NewsSource, User, Tweet, NewsCategory, Retweet, ArticleCategory
+from app.models import (NewsArticle, NewsSource, User, Tweet, NewsCategory, Retweet, ArticleCategory,
+                        ArticleDailyRollup, CategoryMonthlyRollup, UserEngagementProfile)
 from app.database import db
-from sqlalchemy import func, desc, and_, or_, distinct
+from app.cache import cache
+from app.singleflight import single_flight
+from app.rollups import rollups_ready
+from app.loaders import engagement_subquery
+from app.profiles import profiles_ready
+from sqlalchemy import func, desc, and_, or_, distinct, select
 from datetime import datetime, timedelta
 import json
 
@@ -12,25 +18,41 @@ def analytical_dashboard():
     return render_template('analytical/dashboard.html')
 
 @analytical_bp.route('/analytical/temporal-trends')
+@cache.cached()
+@single_flight.coalesce
 def temporal_trends():
     # Get date range from query params
     days = request.args.get('days', 30, type=int)
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
     
-    # Query for daily trends
-    daily_trends = db.session.query(
-        func.date(NewsArticle.created_at).label('date'),
-        NewsArticle.label,
-        func.count(NewsArticle.article_id).label('count')
-    ).filter(
-        NewsArticle.created_at.between(start_date, end_date)
-    ).group_by(
-        func.date(NewsArticle.created_at),
-        NewsArticle.label
-    ).order_by(
-        func.date(NewsArticle.created_at)
-    ).all()
+    # Query for daily trends (from the daily rollup once it has been built)
+    if rollups_ready():
+        daily_trends = db.session.query(
+            ArticleDailyRollup.day,
+            ArticleDailyRollup.label,
+            func.sum(ArticleDailyRollup.article_count).label('count')
+        ).filter(
+            ArticleDailyRollup.day.between(start_date.date(), end_date.date())
+        ).group_by(
+            ArticleDailyRollup.day,
+            ArticleDailyRollup.label
+        ).order_by(
+            ArticleDailyRollup.day
+        ).all()
+    else:
+        daily_trends = db.session.query(
+            func.date(NewsArticle.created_at).label('date'),
+            NewsArticle.label,
+            func.count(NewsArticle.article_id).label('count')
+        ).filter(
+            NewsArticle.created_at.between(start_date, end_date)
+        ).group_by(
+            func.date(NewsArticle.created_at),
+            NewsArticle.label
+        ).order_by(
+            func.date(NewsArticle.created_at)
+        ).all()
     
     # Format results for time series
     results = {}
@@ -43,6 +65,8 @@ def temporal_trends():
     return jsonify(list(results.values()))
 
 @analytical_bp.route('/analytical/network-analysis')
+@cache.cached()
+@single_flight.coalesce
 def network_analysis():
     # Get top spreaders and their networks
     limit = request.args.get('limit', 100, type=int)
@@ -105,32 +129,57 @@ def network_analysis():
     return jsonify({'nodes': nodes, 'edges': edges})
 
 @analytical_bp.route('/analytical/category-performance')
+@cache.cached()
+@single_flight.coalesce
 def category_performance():
     # Analyze performance across categories over time
     months = request.args.get('months', 6, type=int)
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=months * 30)
     
-    # Get monthly category performance
-    performance = db.session.query(
-        func.date_trunc('month', NewsArticle.created_at).label('month'),
-        NewsCategory.category_name,
-        NewsArticle.label,
-        func.count(NewsArticle.article_id).label('count'),
-        func.avg(Tweet.retweet_count).label('avg_retweets')
-    ).join(
-        ArticleCategory, NewsArticle.article_id == ArticleCategory.article_id
-    ).join(
-        NewsCategory, ArticleCategory.category_id == NewsCategory.category_id
-    ).join(
-        Tweet, NewsArticle.article_id == Tweet.article_id
-    ).filter(
-        NewsArticle.created_at >= start_date
-    ).group_by(
-        func.date_trunc('month', NewsArticle.created_at),
-        NewsCategory.category_name,
-        NewsArticle.label
-    ).all()
+    # Get monthly category performance (from the monthly rollup once it has been built).
+    # count is the number of articles; avg_retweets is retweets per tweet across them.
+    if rollups_ready():
+        performance = db.session.query(
+            CategoryMonthlyRollup.month,
+            NewsCategory.category_name,
+            CategoryMonthlyRollup.label,
+            CategoryMonthlyRollup.article_count.label('count'),
+            (CategoryMonthlyRollup.total_retweets * 1.0 /
+             func.nullif(CategoryMonthlyRollup.tweet_count, 0)).label('avg_retweets')
+        ).join(
+            NewsCategory, CategoryMonthlyRollup.category_id == NewsCategory.category_id
+        ).filter(
+            CategoryMonthlyRollup.month >= start_date.date().replace(day=1)
+        ).all()
+    else:
+        # Aggregate tweets per article first so the category join does not
+        # multiply article rows by their tweets
+        recent_articles = select(NewsArticle.article_id).where(
+            NewsArticle.created_at >= start_date
+        )
+        engagement = engagement_subquery(recent_articles)
+        
+        performance = db.session.query(
+            func.date_trunc('month', NewsArticle.created_at).label('month'),
+            NewsCategory.category_name,
+            NewsArticle.label,
+            func.count(NewsArticle.article_id).label('count'),
+            (func.sum(engagement.c.total_retweets) * 1.0 /
+             func.nullif(func.sum(engagement.c.tweet_count), 0)).label('avg_retweets')
+        ).join(
+            ArticleCategory, NewsArticle.article_id == ArticleCategory.article_id
+        ).join(
+            NewsCategory, ArticleCategory.category_id == NewsCategory.category_id
+        ).outerjoin(
+            engagement, NewsArticle.article_id == engagement.c.article_id
+        ).filter(
+            NewsArticle.created_at >= start_date
+        ).group_by(
+            func.date_trunc('month', NewsArticle.created_at),
+            NewsCategory.category_name,
+            NewsArticle.label
+        ).all()
     
     # Format as heatmap data
     results = {}
@@ -151,25 +200,52 @@ def category_performance():
     return jsonify(list(results.values()))
 
 @analytical_bp.route('/analytical/user-behavior')
+@cache.cached()
+@single_flight.coalesce
 def user_behavior_analysis():
     # Analyze user behavior patterns
     
     # Verified vs Unverified user spreading patterns
-    user_patterns = db.session.query(
-        User.verified,
-        NewsArticle.label,
-        func.count(distinct(User.user_id)).label('user_count'),
-        func.count(Tweet.tweet_id).label('tweet_count'),
-        func.avg(User.followers_count).label('avg_followers'),
-        func.sum(Tweet.retweet_count).label('total_reach')
-    ).join(
-        Tweet, User.user_id == Tweet.user_id
-    ).join(
-        NewsArticle, Tweet.article_id == NewsArticle.article_id
-    ).group_by(
-        User.verified,
-        NewsArticle.label
-    ).all()
+    if profiles_ready():
+        # One pass over the per-user profiles; followers are weighted by tweets
+        # to match the tweet-level average of the live query
+        profile = UserEngagementProfile
+        columns = []
+        for tweets, retweets in ((profile.fake_tweets, profile.fake_retweets),
+                                 (profile.real_tweets, profile.real_retweets)):
+            columns += [
+                func.count(profile.user_id).filter(tweets > 0),
+                func.sum(tweets),
+                func.sum(User.followers_count * tweets),
+                func.sum(retweets)
+            ]
+        
+        user_patterns = []
+        rows = db.session.query(User.verified, *columns).join(
+            profile, User.user_id == profile.user_id
+        ).group_by(
+            User.verified
+        ).all()
+        for verified, *totals in rows:
+            for label, (users, tweets, weighted_followers, reach) in zip(('fake', 'real'), (totals[:4], totals[4:])):
+                if tweets:
+                    user_patterns.append((verified, label, users, tweets, weighted_followers / tweets, reach))
+    else:
+        user_patterns = db.session.query(
+            User.verified,
+            NewsArticle.label,
+            func.count(distinct(User.user_id)).label('user_count'),
+            func.count(Tweet.tweet_id).label('tweet_count'),
+            func.avg(User.followers_count).label('avg_followers'),
+            func.sum(Tweet.retweet_count).label('total_reach')
+        ).join(
+            Tweet, User.user_id == Tweet.user_id
+        ).join(
+            NewsArticle, Tweet.article_id == NewsArticle.article_id
+        ).group_by(
+            User.verified,
+            NewsArticle.label
+        ).all()
     
     results = []
     for verified, label, users, tweets, avg_followers, reach in user_patterns:
@@ -186,6 +262,8 @@ def user_behavior_analysis():
     return jsonify(results)
 
 @analytical_bp.route('/analytical/source-timeline')
+@cache.cached()
+@single_flight.coalesce
 def source_reliability_timeline():
     # Track source reliability over time
     months = request.args.get('months', 12, type=int)
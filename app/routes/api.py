@@ -1,11 +1,24 @@
-from flask import Blueprint, request, jsonify
-from app.models import NewsArticle, NewsSource, User, Tweet, NewsCategory, ArticleCategory
+from flask import Blueprint, Response, request, jsonify, abort, stream_with_context, current_app
+from app.models import (NewsArticle, NewsSource, User, Tweet, NewsCategory, ArticleCategory,
+                        UserEngagementProfile, RollupState)
 from app.database import db
+from app.cache import cache
+from app.loaders import load_category_names, load_article_details
+from app.filters import apply_article_filters
+from app.pagination import keyset_page
+from app.search import apply_search
+from app.counters import get_overview_counts
+from app.profiles import PROFILE_STATE_NAME, compute_user_profile
+from app.export import EXPORTS, EXPORT_FORMATS, stream_export
+from app.snapshots import load_manifest
 from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 
 api_bp = Blueprint('api', __name__)
 
+MAX_BATCH_SIZE = 100
+
 @api_bp.route('/articles', methods=['GET'])
 def get_articles():
     # Pagination
@@ -13,31 +26,41 @@ def get_articles():
     per_page = request.args.get('per_page', 20, type=int)
     
     # Filters
-    label = request.args.get('label')  # 'fake' or 'real'
-    source_id = request.args.get('source_id', type=int)
-    category_id = request.args.get('category_id', type=int)
     search = request.args.get('search')
     
-    # Build query
-    query = NewsArticle.query
+    # Build query (sources are joined in, categories are batched below)
+    query = apply_article_filters(NewsArticle.query.options(joinedload(NewsArticle.source)), request.args)
+    rank = None
     
-    if label:
-        query = query.filter(NewsArticle.label == label)
-    if source_id:
-        query = query.filter(NewsArticle.source_id == source_id)
-    if category_id:
-        query = query.join(NewsArticle.categories).filter(NewsCategory.category_id == category_id)
     if search:
-        query = query.filter(NewsArticle.title.ilike(f'%{search}%'))
-    
-    # Execute with pagination
-    articles = query.order_by(NewsArticle.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+        query, rank = apply_search(query, search)
+    
+    # Cursor mode seeks on (created_at, article_id) instead of scanning an OFFSET
+    cursor_mode = 'after' in request.args or 'before' in request.args
+    include_total = request.args.get('include_total', 'true').lower() != 'false'
+    
+    if cursor_mode:
+        try:
+            items, next_cursor, prev_cursor = keyset_page(
+                query, NewsArticle.created_at, NewsArticle.article_id, per_page,
+                after=request.args.get('after'), before=request.args.get('before')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        total = query.order_by(None).count() if include_total else None
+    else:
+        # Search results are ranked by relevance, newest first within equal rank
+        ordering = [NewsArticle.created_at.desc()] if rank is None else [rank, NewsArticle.created_at.desc()]
+        articles = query.order_by(*ordering).paginate(
+            page=page, per_page=per_page, error_out=False, count=include_total
+        )
+        items = articles.items
+        total = articles.total
     
     # Format results
+    categories = load_category_names([article.article_id for article in items])
     results = []
-    for article in articles.items:
+    for article in items:
         results.append({
             'article_id': article.article_id,
             'title': article.title,
@@ -45,12 +68,20 @@ def get_articles():
             'label': article.label,
             'source': article.source.source_name if article.source else None,
             'created_at': article.created_at.isoformat() if article.created_at else None,
-            'categories': [cat.category_name for cat in article.categories]
+            'categories': categories[article.article_id]
+        })
+    
+    if cursor_mode:
+        return jsonify({
+            'articles': results,
+            'total': total,
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor
         })
     
     return jsonify({
         'articles': results,
-        'total': articles.total,
+        'total': total,
         'pages': articles.pages,
         'current_page': page
     })
@@ -81,17 +112,19 @@ def get_categories():
     return jsonify(results)
 
 @api_bp.route('/stats/overview', methods=['GET'])
+@cache.cached()
 def get_overview_stats():
-    # Get overall statistics
-    total_articles = NewsArticle.query.count()
-    fake_articles = NewsArticle.query.filter_by(label='fake').count()
-    real_articles = NewsArticle.query.filter_by(label='real').count()
+    # Get overall statistics from the counters table (one primary-key lookup)
+    counts = get_overview_counts()
+    total_articles = counts['total_articles']
+    fake_articles = counts['fake_articles']
+    real_articles = counts['real_articles']
     
-    total_users = User.query.count()
-    verified_users = User.query.filter_by(verified=True).count()
+    total_users = counts['total_users']
+    verified_users = counts['verified_users']
     
-    total_tweets = Tweet.query.count()
-    total_retweets = db.session.query(func.sum(Tweet.retweet_count)).scalar() or 0
+    total_tweets = counts['total_tweets']
+    total_retweets = counts['total_retweets']
     
     return jsonify({
         'articles': {
@@ -113,77 +146,61 @@ def get_overview_stats():
         }
     })
 
+@api_bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify(cache.stats())
+
+@api_bp.route('/articles/batch', methods=['GET'])
+def get_article_details_batch():
+    # Comma-separated article ids, returned in the order requested
+    ids = [article_id for article_id in request.args.get('ids', '').split(',') if article_id]
+    if len(ids) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'At most {MAX_BATCH_SIZE} ids can be requested at once'}), 400
+    
+    details = load_article_details(ids)
+    return jsonify({'articles': [details[article_id] for article_id in ids if article_id in details]})
+
 @api_bp.route('/articles/<string:article_id>', methods=['GET'])
 def get_article_detail(article_id):
-    article = NewsArticle.query.get_or_404(article_id)
-    
-    # Get engagement metrics
-    tweet_count = article.tweets.count()
-    total_retweets = db.session.query(func.sum(Tweet.retweet_count)).filter(
-        Tweet.article_id == article_id
-    ).scalar() or 0
-    total_favorites = db.session.query(func.sum(Tweet.favorite_count)).filter(
-        Tweet.article_id == article_id
-    ).scalar() or 0
-    
-    # Get top tweets
-    top_tweets = article.tweets.order_by(Tweet.retweet_count.desc()).limit(5).all()
+    details = load_article_details([article_id])
+    if article_id not in details:
+        abort(404)
     
-    return jsonify({
-        'article_id': article.article_id,
-        'title': article.title,
-        'url': article.url,
-        'label': article.label,
-        'created_at': article.created_at.isoformat() if article.created_at else None,
-        'source': {
-            'source_id': article.source.source_id,
-            'source_name': article.source.source_name,
-            'credibility_rating': float(article.source.credibility_rating) if article.source.credibility_rating else None
-        } if article.source else None,
-        'content': {
-            'text': article.content.text if article.content else None,
-            'author': article.content.author if article.content else None,
-            'publish_date': article.content.publish_date.isoformat() if article.content and article.content.publish_date else None,
-            'word_count': article.content.word_count if article.content else None
-        },
-        'categories': [{'id': cat.category_id, 'name': cat.category_name} for cat in article.categories],
-        'engagement': {
-            'tweet_count': tweet_count,
-            'total_retweets': total_retweets,
-            'total_favorites': total_favorites
-        },
-        'top_tweets': [{
-            'tweet_id': tweet.tweet_id,
-            'username': tweet.user.username if tweet.user else None,
-            'verified': tweet.user.verified if tweet.user else False,
-            'content': tweet.content,
-            'retweet_count': tweet.retweet_count,
-            'favorite_count': tweet.favorite_count
-        } for tweet in top_tweets]
-    })
+    return jsonify(details[article_id])
+
+@api_bp.route('/export/<string:entity>.<string:fmt>', methods=['GET'])
+def export_rows(entity, fmt):
+    # Streamed straight from a server-side cursor; accepts the article filters
+    if entity not in EXPORTS or fmt not in EXPORT_FORMATS:
+        abort(404)
+    
+    response = Response(stream_with_context(stream_export(entity, fmt, request.args)),
+                        mimetype=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename={entity}.{fmt}'
+    return response
+
+@api_bp.route('/snapshots', methods=['GET'])
+def get_snapshot_manifest():
+    return jsonify(load_manifest(current_app.config['SNAPSHOT_DIR']))
 
 @api_bp.route('/users/<int:user_id>', methods=['GET'])
 def get_user_detail(user_id):
-    user = User.query.get_or_404(user_id)
-    
-    # Get user statistics
-    tweet_count = user.tweets.count()
-    articles_shared = db.session.query(func.count(func.distinct(Tweet.article_id))).filter(
-        Tweet.user_id == user_id
-    ).scalar()
-    
-    # Get fake vs real news sharing
-    fake_shared = db.session.query(func.count(Tweet.tweet_id)).join(
-        NewsArticle
+    # User, stored engagement profile and its readiness in one primary-key lookup
+    row = db.session.query(User, UserEngagementProfile, RollupState.name).outerjoin(
+        UserEngagementProfile, User.user_id == UserEngagementProfile.user_id
+    ).outerjoin(
+        RollupState, RollupState.name == PROFILE_STATE_NAME
     ).filter(
-        and_(Tweet.user_id == user_id, NewsArticle.label == 'fake')
-    ).scalar()
+        User.user_id == user_id
+    ).first()
+    if row is None:
+        abort(404)
     
-    real_shared = db.session.query(func.count(Tweet.tweet_id)).join(
-        NewsArticle
-    ).filter(
-        and_(Tweet.user_id == user_id, NewsArticle.label == 'real')
-    ).scalar()
+    user, profile, ready = row
+    # Before the first refresh the trigger's rows hold only the newest tweets
+    if profile is None or ready is None:
+        profile = compute_user_profile(user_id)
+    tweet_count = profile.tweet_count
     
     return jsonify({
         'user_id': user.user_id,
@@ -192,13 +209,16 @@ def get_user_detail(user_id):
         'verified': user.verified,
         'followers_count': user.followers_count,
         'following_count': user.following_count,
-        'tweets_count': user.tweets_count,
+        'tweets_count': tweet_count,
         'created_at': user.created_at.isoformat() if user.created_at else None,
         'activity': {
             'total_tweets': tweet_count,
-            'articles_shared': articles_shared,
-            'fake_news_tweets': fake_shared,
-            'real_news_tweets': real_shared,
-            'fake_news_percentage': round(fake_shared / tweet_count * 100, 2) if tweet_count > 0 else 0
+            'articles_shared': profile.articles_shared,
+            'fake_news_tweets': profile.fake_tweets,
+            'real_news_tweets': profile.real_tweets,
+            'fake_news_percentage': round(profile.fake_tweets / tweet_count * 100, 2) if tweet_count > 0 else 0,
+            'total_retweets': profile.total_retweets,
+            'first_activity': profile.first_activity.isoformat() if profile.first_activity else None,
+            'last_activity': profile.last_activity.isoformat() if profile.last_activity else None
         }
     })
\ No newline at end of file
@@ -1,6 +1,13 @@
-from flask import Blueprint, render_template, request, jsonify
-from app.models import NewsArticle, NewsSource, User, Tweet, NewsCategory, ArticleCategory
+from flask import Blueprint, Response, current_app, render_template, request, jsonify
+from app.models import NewsArticle, NewsSource, User, Tweet, NewsCategory, ArticleCategory, UserEngagementProfile
 from app.database import db
+from app.cache import cache
+from app.filters import apply_article_filters
+from app.pagination import keyset_seek, keyset_cursors, keyset_ordering
+from app.profiles import profiles_ready
+from app.viral import engagement_buckets_ready, engagement_score, top_viral, window_totals, MAX_WINDOW_HOURS
+from app.velocity import top_trending, VELOCITY_SORTS
+from app.livefeed import live_feed
 from sqlalchemy import func, desc
 from datetime import datetime, timedelta
 
@@ -15,36 +22,73 @@ def operational_dashboard():
     return render_template('operational/dashboard.html')
 
 @operational_bp.route('/operational/viral-content')
+@cache.cached()
 def viral_content():
     # Get time range from query params (default: last 24 hours)
     hours = request.args.get('hours', 24, type=int)
     label_filter = request.args.get('label', None)  # 'fake', 'real', or None for all
+    sort = request.args.get('sort', 'score')  # 'score', 'velocity' or 'acceleration'
     time_threshold = datetime.utcnow() - timedelta(hours=hours)
     
-    # Query for viral content
-    query = db.session.query(
-        NewsArticle,
-        func.count(Tweet.tweet_id).label('tweet_count'),
-        func.sum(Tweet.retweet_count).label('total_retweets'),
-        func.sum(Tweet.favorite_count).label('total_favorites')
-    ).join(
-        Tweet, NewsArticle.article_id == Tweet.article_id
-    ).filter(
-        Tweet.created_at >= time_threshold
-    )
-    
-    # Add label filter if specified
-    if label_filter:
-        query = query.filter(NewsArticle.label == label_filter)
+    if sort in VELOCITY_SORTS:
+        # Ranked by decayed tweet and retweet rates, so articles taking off now stand out
+        trending = top_trending(sort, label_filter)
+        totals = window_totals([article.article_id for article, _, _ in trending], hours)
+        
+        results = []
+        for article, velocity, acceleration in trending:
+            tweet_count, retweets, favorites = totals.get(article.article_id, (0, 0, 0))
+            results.append({
+                'article_id': article.article_id,
+                'title': article.title,
+                'url': article.url,
+                'label': article.label,
+                'tweet_count': tweet_count,
+                'retweet_count': retweets,
+                'favorite_count': favorites,
+                'engagement_score': engagement_score(retweets, favorites, tweet_count),
+                'velocity': round(velocity, 3),
+                'acceleration': round(acceleration, 3)
+            })
+        
+        return jsonify(results)
+    elif sort != 'score':
+        return jsonify({'error': f'sort must be one of score, {", ".join(VELOCITY_SORTS)}'}), 400
     
-    viral_articles = query.group_by(
-        NewsArticle.article_id
-    ).order_by(
-        desc('total_retweets')
-    ).limit(20).all()
+    if engagement_buckets_ready() and 1 <= hours <= MAX_WINDOW_HOURS:
+        # Summed from the hourly engagement buckets instead of scanning tweets
+        viral_articles = top_viral(hours, label_filter)
+    else:
+        # Query for viral content
+        score = engagement_score(
+            func.coalesce(func.sum(Tweet.retweet_count), 0),
+            func.coalesce(func.sum(Tweet.favorite_count), 0),
+            func.count(Tweet.tweet_id)
+        )
+        query = db.session.query(
+            NewsArticle,
+            func.count(Tweet.tweet_id).label('tweet_count'),
+            func.sum(Tweet.retweet_count).label('total_retweets'),
+            func.sum(Tweet.favorite_count).label('total_favorites'),
+            score.label('engagement_score')
+        ).join(
+            Tweet, NewsArticle.article_id == Tweet.article_id
+        ).filter(
+            Tweet.created_at >= time_threshold
+        )
+        
+        # Add label filter if specified
+        if label_filter:
+            query = query.filter(NewsArticle.label == label_filter)
+        
+        viral_articles = query.group_by(
+            NewsArticle.article_id
+        ).order_by(
+            desc('engagement_score'), NewsArticle.article_id
+        ).limit(20).all()
     
     results = []
-    for article, tweet_count, retweets, favorites in viral_articles:
+    for article, tweet_count, retweets, favorites, score in viral_articles:
         results.append({
             'article_id': article.article_id,
             'title': article.title,
@@ -53,34 +97,78 @@ def viral_content():
             'tweet_count': tweet_count,
             'retweet_count': retweets or 0,
             'favorite_count': favorites or 0,
-            'engagement_score': (retweets or 0) * 2 + (favorites or 0) + tweet_count * 0.5
+            'engagement_score': score
         })
     
     return jsonify(results)
 
+def live_topic(args):
+    """(hours, label, sort) live feed topic for the dashboard filters in `args`"""
+    sort = args.get('sort', 'score')
+    if sort not in ('score',) + VELOCITY_SORTS:
+        raise ValueError(f'sort must be one of score, {", ".join(VELOCITY_SORTS)}')
+    return args.get('hours', 24, type=int), args.get('label') or None, sort
+
+@operational_bp.route('/operational/live')
+def live_updates():
+    # Server-Sent Events: overview, viral content and categories as they change
+    if not current_app.config['LIVE_FEED']:
+        return jsonify({'error': 'The live feed is disabled on this deployment'}), 404
+    try:
+        topic = live_topic(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = Response(live_feed.stream(topic), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
+
 @operational_bp.route('/operational/influencers')
+@cache.cached()
 def top_influencers():
     # Get influencers spreading news
     label_filter = request.args.get('label', None)  # 'fake', 'real', or None for all
     
-    query = db.session.query(
-        User,
-        func.count(Tweet.tweet_id).label('tweet_count'),
-        func.sum(Tweet.retweet_count).label('total_impact')
-    ).join(
-        Tweet, User.user_id == Tweet.user_id
-    ).join(
-        NewsArticle, Tweet.article_id == NewsArticle.article_id
-    )
-    
-    if label_filter:
-        query = query.filter(NewsArticle.label == label_filter)
-    
-    influencers = query.group_by(
-        User.user_id
-    ).order_by(
-        desc('total_impact')
-    ).limit(50).all()
+    if profiles_ready():
+        # Read per-user totals from the engagement profiles instead of scanning tweets
+        profile = UserEngagementProfile
+        tweet_count, impact = {
+            'fake': (profile.fake_tweets, profile.fake_retweets),
+            'real': (profile.real_tweets, profile.real_retweets)
+        }.get(label_filter, (profile.fake_tweets + profile.real_tweets,
+                             profile.fake_retweets + profile.real_retweets))
+        
+        influencers = db.session.query(
+            User,
+            tweet_count.label('tweet_count'),
+            impact.label('total_impact')
+        ).join(
+            profile, User.user_id == profile.user_id
+        ).filter(
+            tweet_count > 0
+        ).order_by(
+            desc('total_impact')
+        ).limit(50).all()
+    else:
+        query = db.session.query(
+            User,
+            func.count(Tweet.tweet_id).label('tweet_count'),
+            func.sum(Tweet.retweet_count).label('total_impact')
+        ).join(
+            Tweet, User.user_id == Tweet.user_id
+        ).join(
+            NewsArticle, Tweet.article_id == NewsArticle.article_id
+        )
+        
+        if label_filter:
+            query = query.filter(NewsArticle.label == label_filter)
+        
+        influencers = query.group_by(
+            User.user_id
+        ).order_by(
+            desc('total_impact')
+        ).limit(50).all()
     
     results = []
     for user, tweet_count, impact in influencers:
@@ -97,6 +185,7 @@ def top_influencers():
     return jsonify(results)
 
 @operational_bp.route('/operational/source-credibility')
+@cache.cached()
 def source_credibility():
     # Real-time source credibility metrics
     sources = db.session.query(
@@ -126,6 +215,7 @@ def source_credibility():
     return jsonify(results)
 
 @operational_bp.route('/operational/category-distribution')
+@cache.cached()
 def category_distribution():
     # Current distribution by category
     hours = request.args.get('hours', 24, type=int)
@@ -155,4 +245,67 @@ def category_distribution():
             'fake_percentage': round((fake or 0) / total * 100, 2) if total > 0 else 0
         })
     
-    return jsonify(results)
\ No newline at end of file
+    return jsonify(results)
+
+@operational_bp.route('/operational/engagement')
+@cache.cached()
+def engagement_table():
+    # Latest articles with engagement totals, for the engagement metrics table
+    per_page = request.args.get('per_page', 10, type=int)
+    after = request.args.get('after')
+    before = request.args.get('before')
+    
+    # Pick the page of articles first so only their tweets are aggregated
+    try:
+        page = keyset_seek(
+            apply_article_filters(db.session.query(NewsArticle.article_id), request.args),
+            NewsArticle.created_at, NewsArticle.article_id, per_page, after, before
+        ).subquery()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    rows = db.session.query(
+        NewsArticle,
+        NewsSource.source_name,
+        func.count(Tweet.tweet_id).label('tweet_count'),
+        func.coalesce(func.sum(Tweet.retweet_count), 0).label('total_retweets'),
+        func.coalesce(func.sum(Tweet.favorite_count), 0).label('total_favorites')
+    ).join(
+        page, page.c.article_id == NewsArticle.article_id
+    ).outerjoin(
+        NewsSource, NewsArticle.source_id == NewsSource.source_id
+    ).outerjoin(
+        Tweet, NewsArticle.article_id == Tweet.article_id
+    ).group_by(
+        NewsArticle.article_id,
+        NewsSource.source_name
+    ).order_by(
+        *keyset_ordering(NewsArticle.created_at, NewsArticle.article_id, before)
+    ).all()
+    
+    rows, next_cursor, prev_cursor = keyset_cursors(
+        rows, per_page, lambda row: (row[0].created_at, row[0].article_id), after, before
+    )
+    
+    results = []
+    for article, source_name, tweet_count, retweets, favorites in rows:
+        results.append({
+            'article_id': article.article_id,
+            'title': article.title,
+            'url': article.url,
+            'label': article.label,
+            'source': source_name,
+            'created_at': article.created_at.isoformat() if article.created_at else None,
+            'engagement': {
+                'tweet_count': tweet_count,
+                'total_retweets': retweets,
+                'total_favorites': favorites
+            },
+            'engagement_score': engagement_score(retweets, favorites, tweet_count)
+        })
+    
+    return jsonify({
+        'articles': results,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor
+    })
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Full-text search over article titles and content.
+
+PostgreSQL matches against GIN-indexed tsvector expressions (see dashboard_queries.sql)
+and ranks with ts_rank. Other databases (SQLite in tests) use an in-process inverted
+index built from the same columns, so both paths accept the same query syntax:
+
+    climate change      every term must match
+    "climate change"    the words must appear next to each other
+    clim*               prefix match
+"""
+
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from flask import current_app, has_app_context
+from sqlalchemy import case, func, literal_column, select, union
+from app.models import NewsArticle, NewsContent
+from app.database import db
+from app.cache import invalidation_stamp
+
+TS_CONFIG = literal_column("'english'")
+TITLE_WEIGHT = 2.0
+CONTENT_WEIGHT = 1.0
+
+_index_lock = threading.Lock()
+
+_token_re = re.compile(r'\w+')
+_clause_re = re.compile(r'"([^"]*)"|(\S+)')
+
+def tokenize(text):
+    return _token_re.findall((text or '').lower())
+
+def parse_query(search):
+    """Split a search string into ('phrase', words), ('prefix', word) and ('term', word) clauses"""
+    clauses = []
+    for phrase, word in _clause_re.findall(search or ''):
+        if phrase:
+            words = tokenize(phrase)
+            if len(words) > 1:
+                clauses.append(('phrase', words))
+            elif words:
+                clauses.append(('term', words[0]))
+        elif word.endswith('*'):
+            clauses.extend(('prefix', token) for token in tokenize(word))
+        else:
+            clauses.extend(('term', token) for token in tokenize(word))
+    return clauses
+
+def to_tsquery_string(clauses):
+    """Render parsed clauses in to_tsquery syntax"""
+    parts = []
+    for kind, value in clauses:
+        if kind == 'phrase':
+            parts.append('(' + ' <-> '.join(value) + ')')
+        elif kind == 'prefix':
+            parts.append(f'{value}:*')
+        else:
+            parts.append(value)
+    return ' & '.join(parts)
+
+def apply_search(query, search):
+    """
+    Restrict an article query to matches for `search`.
+    Returns (query, rank) where rank is an ORDER BY expression, best match first.
+    """
+    clauses = parse_query(search)
+    if not clauses:
+        return query.filter(db.false()), None
+    
+    if db.engine.dialect.name == 'postgresql':
+        return apply_fulltext_search(query, clauses)
+    
+    ranked_ids = get_fallback_index().search(clauses)
+    if not ranked_ids:
+        return query.filter(db.false()), None
+    
+    query = query.filter(NewsArticle.article_id.in_(ranked_ids))
+    rank = case({article_id: i for i, article_id in enumerate(ranked_ids)},
+                value=NewsArticle.article_id)
+    return query, rank.asc()
+
+def apply_fulltext_search(query, clauses):
+    """PostgreSQL branch of apply_search()"""
+    ts_query = func.to_tsquery(TS_CONFIG, to_tsquery_string(clauses))
+    title_vector = func.to_tsvector(TS_CONFIG, NewsArticle.title)
+    content_vector = func.to_tsvector(TS_CONFIG, func.coalesce(NewsContent.text, ''))
+    
+    # One branch per table, so each can use its own GIN expression index; an OR
+    # across the joined tables would scan both and compute every tsvector
+    matches = union(
+        select(NewsArticle.article_id).where(title_vector.op('@@')(ts_query)),
+        select(NewsContent.article_id).where(content_vector.op('@@')(ts_query))
+    )
+    query = query.outerjoin(
+        NewsContent, NewsContent.article_id == NewsArticle.article_id
+    ).filter(
+        NewsArticle.article_id.in_(matches)
+    )
+    rank = (func.ts_rank(title_vector, ts_query) * TITLE_WEIGHT +
+            func.ts_rank(content_vector, ts_query) * CONTENT_WEIGHT)
+    return query, rank.desc()
+
+class InvertedIndex:
+    """Positional inverted index used when the database has no full-text support"""
+    
+    def __init__(self):
+        # token -> {article_id: [(field_weight, position), ...]}
+        self.postings = defaultdict(lambda: defaultdict(list))
+        self.vocabulary = []
+    
+    def add(self, article_id, text, weight):
+        for position, token in enumerate(tokenize(text)):
+            self.postings[token][article_id].append((weight, position))
+    
+    def finalize(self):
+        self.vocabulary = sorted(self.postings)
+    
+    def _prefix_matches(self, prefix):
+        matches = defaultdict(list)
+        i = bisect_left(self.vocabulary, prefix)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(prefix):
+            for article_id, hits in self.postings[self.vocabulary[i]].items():
+                matches[article_id].extend(hits)
+            i += 1
+        return matches
+    
+    def _phrase_matches(self, words):
+        first, rest = words[0], words[1:]
+        matches = defaultdict(list)
+        for article_id, hits in self.postings.get(first, {}).items():
+            for weight, position in hits:
+                if all((weight, position + offset) in self.postings.get(word, {}).get(article_id, ())
+                       for offset, word in enumerate(rest, start=1)):
+                    matches[article_id].append((weight, position))
+        return matches
+    
+    def search(self, clauses):
+        """Return article ids matching every clause, best score first"""
+        scores = None
+        for kind, value in clauses:
+            if kind == 'phrase':
+                matches = self._phrase_matches(value)
+            elif kind == 'prefix':
+                matches = self._prefix_matches(value)
+            else:
+                matches = self.postings.get(value, {})
+            
+            clause_scores = {article_id: sum(weight for weight, _ in hits)
+                             for article_id, hits in matches.items()}
+            if scores is None:
+                scores = clause_scores
+            else:
+                scores = {article_id: score + clause_scores[article_id]
+                          for article_id, score in scores.items() if article_id in clause_scores}
+            if not scores:
+                return []
+        
+        return sorted(scores, key=lambda article_id: (-scores[article_id], article_id))
+
+def build_fallback_index():
+    index = InvertedIndex()
+    rows = db.session.query(
+        NewsArticle.article_id, NewsArticle.title, NewsContent.text
+    ).outerjoin(
+        NewsContent, NewsContent.article_id == NewsArticle.article_id
+    ).all()
+    for article_id, title, text in rows:
+        index.add(article_id, title, TITLE_WEIGHT)
+        index.add(article_id, text, CONTENT_WEIGHT)
+    index.finalize()
+    return index
+
+def get_fallback_index():
+    """Return the app's inverted index, rebuilding it when articles or content change"""
+    # Counts and high-water marks catch rows added or removed; edits in place are
+    # caught by the import scripts' invalidate_cache(), which touches the stamp file
+    signature = tuple(db.session.query(
+        db.session.query(func.count(NewsArticle.article_id)).scalar_subquery(),
+        db.session.query(func.max(NewsArticle.created_at)).scalar_subquery(),
+        db.session.query(func.count(NewsContent.content_id)).scalar_subquery(),
+        db.session.query(func.max(NewsContent.content_id)).scalar_subquery()
+    ).one()) + (invalidation_stamp(),)
+    cached = current_app.extensions.get('search_index')
+    if cached is None or cached[0] != signature:
+        # One request thread builds it; the others wait for its result
+        with _index_lock:
+            cached = current_app.extensions.get('search_index')
+            if cached is None or cached[0] != signature:
+                cached = (signature, build_fallback_index())
+                current_app.extensions['search_index'] = cached
+    return cached[1]
+
+def invalidate_search_index():
+    """Drop this process's inverted index; other workers notice the stamp invalidate_cache() touches"""
+    if has_app_context():
+        current_app.extensions.pop('search_index', None)
@@ -0,0 +1,81 @@
+"""
+Request coalescing for expensive endpoints.
+
+When identical requests (same path and normalized query parameters) arrive while one
+is already being computed in this worker, the later ones wait for that computation
+and reuse its response body instead of running the same queries again.
+
+Requests that carry COALESCED_UPSTREAM in their WSGI environ skip it: the ASGI
+mode runs them on its event loop (and coalesces them there), where waiting on a
+threading.Event would block every other request in the worker.
+"""
+
+import threading
+from functools import wraps
+from flask import current_app, request, Response
+from app.cache import cache_key
+
+COALESCED_UPSTREAM = 'dashboard.coalesced'
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+    
+    def do(self, key, fn):
+        """Run fn() once for all concurrent callers with the same key and share its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.followers += 1
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+    
+    def followers(self, key):
+        """Number of callers currently waiting on the in-flight call for key"""
+        with self._lock:
+            call = self._calls.get(key)
+            return call.followers if call else 0
+    
+    def coalesce(self, view):
+        """Share one execution of a view between concurrent identical requests"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.environ.get(COALESCED_UPSTREAM):
+                return view(*args, **kwargs)
+            
+            def compute():
+                # Responses are per-request objects, so only the body is shared
+                response = current_app.make_response(view(*args, **kwargs))
+                return response.get_data(), response.status_code, response.mimetype
+            
+            body, status, mimetype = self.do(cache_key(request.path, request.args), compute)
+            return Response(body, status=status, mimetype=mimetype)
+        return wrapper
+
+single_flight = SingleFlight()
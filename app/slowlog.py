@@ -0,0 +1,235 @@
+"""
+Opt-in slow query log (SLOW_QUERY_LOG=true).
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are queued with their parameters
+for a background thread, which explains them on a connection of its own with
+EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) on PostgreSQL and EXPLAIN QUERY PLAN
+elsewhere, and stores them in slow_query_log under a fingerprint of their
+normalized SQL. A failing EXPLAIN never aborts the request's transaction, and
+requests never wait for one. The queue holds SLOW_QUERY_QUEUE_SIZE statements;
+more are dropped. Each fingerprint is explained at most once per
+SLOW_QUERY_EXPLAIN_INTERVAL seconds, since ANALYZE runs the statement again.
+
+slow_queries.py reports the top offenders, sequential scans on the big tables and
+indexes from create_tables.sql that are never used.
+"""
+
+import hashlib
+import json
+import queue
+import re
+import threading
+import time
+from collections import defaultdict
+from flask import has_request_context, request
+from sqlalchemy import event, func, insert, text
+from app.models import SlowQueryLog
+from app.database import db
+
+BIG_TABLES = ('tweet', 'retweet', 'news_article')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|\?|\$\d+')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,?)+\)', re.IGNORECASE)
+_INDEX_DDL = re.compile(r'CREATE\s+INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+ON\s+(\w+)',
+                        re.IGNORECASE)
+_SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+_SQLITE_INDEX = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+
+def normalize_sql(statement):
+    """Replace literals and bind parameters with ? and collapse whitespace"""
+    normalized = _STRING.sub('?', statement)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _IN_LIST.sub('IN (?)', normalized)
+    return ' '.join(normalized.split())
+
+def fingerprint(normalized):
+    return hashlib.md5(normalized.encode('utf-8')).hexdigest()[:16]
+
+def plan_summary(plan):
+    """(tables read by sequential scans, indexes used) from a stored plan"""
+    seq_scans, indexes = set(), set()
+
+    def walk(node):
+        if node.get('Node Type') == 'Seq Scan':
+            seq_scans.add(node.get('Relation Name'))
+        if node.get('Index Name'):
+            indexes.add(node['Index Name'])
+        for child in node.get('Plans', []):
+            walk(child)
+
+    if isinstance(plan, list) and plan and isinstance(plan[0], dict) and 'Plan' in plan[0]:
+        walk(plan[0]['Plan'])
+    elif isinstance(plan, list):
+        # SQLite EXPLAIN QUERY PLAN rows: (id, parent, notused, detail)
+        for row in plan:
+            detail = row[-1]
+            scan = _SQLITE_SCAN.match(detail)
+            if scan and 'INDEX' not in detail:
+                seq_scans.add(scan.group(1))
+            index = _SQLITE_INDEX.search(detail)
+            if index:
+                indexes.add(index.group(1))
+
+    return sorted(seq_scans), sorted(indexes)
+
+class SlowQueryLogger:
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._explained = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('SLOW_QUERY_LOG'):
+            return
+        self.app = app
+        self._explained = {}
+        self.threshold = app.config['SLOW_QUERY_THRESHOLD_MS'] / 1000
+        self.interval = app.config['SLOW_QUERY_EXPLAIN_INTERVAL']
+        if self._queue is None:
+            self._queue = queue.Queue(app.config['SLOW_QUERY_QUEUE_SIZE'])
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before)
+                event.listen(engine, 'after_cursor_execute', self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        # On the execution context, so a failed statement leaves nothing behind
+        if context is not None:
+            context._slowlog_started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_slowlog_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if (elapsed < self.threshold or executemany or 'slow_query_log' in statement
+                or not statement.lstrip().upper().startswith(('SELECT', 'WITH'))
+                or (context is not None and context.execution_options.get('stream_results'))):
+            return
+
+        normalized = normalize_sql(statement)
+        key = fingerprint(normalized)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained.get(key, -self.interval) < self.interval:
+                return
+            self._explained[key] = now
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='slow-query-log', daemon=True)
+                self._thread.start()
+
+        entry = {
+            'fingerprint': key,
+            'normalized_sql': normalized,
+            'route': request.path if has_request_context() else None,
+            'duration_ms': round(elapsed * 1000, 3),
+        }
+        try:
+            self._queue.put_nowait((conn.engine, entry, statement, parameters))
+        except queue.Full:
+            pass  # the explainer is behind; this capture is lost rather than slowing queries
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                self._store(*item)
+            except Exception:
+                self.app.logger.exception('Could not store a slow query plan')
+            finally:
+                self._queue.task_done()
+
+    def wait(self):
+        """Block until every queued statement is explained and stored"""
+        if self._queue is not None:
+            self._queue.join()
+
+    def _explain(self, engine, cursor, statement, parameters):
+        try:
+            if engine.dialect.name == 'postgresql':
+                cursor.execute('EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ' + statement, parameters)
+                return cursor.fetchone()[0]
+            cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+            return [list(row) for row in cursor.fetchall()]
+        except Exception as e:
+            return {'error': str(e)}
+
+    def _store(self, engine, entry, statement, parameters):
+        """Explain one statement on a connection of its own and store its plan"""
+        # A raw DBAPI connection keeps the EXPLAIN out of the SQLAlchemy events
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            try:
+                plan = self._explain(engine, cursor, statement, parameters)
+            finally:
+                cursor.close()
+            if engine.dialect.name == 'postgresql':
+                # Ends ANALYZE's re-run, or clears the transaction a failed EXPLAIN aborted
+                raw.rollback()
+        finally:
+            raw.close()
+        seq_scans, indexes = plan_summary(plan)
+        with engine.begin() as conn:
+            conn.execute(insert(SlowQueryLog), [dict(entry, plan=json.dumps(plan), seq_scans=','.join(seq_scans),
+                                                     indexes_used=','.join(indexes))])
+
+slow_query_log = SlowQueryLogger()
+
+def top_offenders(limit=20):
+    """Fingerprints ordered by total captured time"""
+    return db.session.query(
+        SlowQueryLog.fingerprint,
+        func.count(SlowQueryLog.log_id).label('captures'),
+        func.avg(SlowQueryLog.duration_ms).label('avg_ms'),
+        func.max(SlowQueryLog.duration_ms).label('max_ms'),
+        func.max(SlowQueryLog.route).label('route'),
+        func.max(SlowQueryLog.normalized_sql).label('sql')
+    ).group_by(
+        SlowQueryLog.fingerprint
+    ).order_by(
+        func.sum(SlowQueryLog.duration_ms).desc()
+    ).limit(limit).all()
+
+def seq_scan_offenders(tables=BIG_TABLES):
+    """{table: [(fingerprint, max duration, sql)]} for plans that sequentially scan `tables`"""
+    offenders = defaultdict(dict)
+    rows = db.session.query(SlowQueryLog).filter(SlowQueryLog.seq_scans != '').all()
+    for row in rows:
+        for table in row.seq_scans.split(','):
+            if table in tables:
+                current = offenders[table].get(row.fingerprint)
+                if current is None or row.duration_ms > current[0]:
+                    offenders[table][row.fingerprint] = (row.duration_ms, row.normalized_sql)
+    return {table: sorted(((fp, ms, sql) for fp, (ms, sql) in entries.items()), key=lambda e: -e[1])
+            for table, entries in offenders.items()}
+
+def declared_indexes(schema_path):
+    """(index, table) pairs declared with CREATE INDEX in a schema file"""
+    with open(schema_path) as f:
+        return _INDEX_DDL.findall(f.read())
+
+def unused_indexes(schema_path):
+    """
+    Indexes declared in `schema_path` that no captured plan used and, on PostgreSQL,
+    that pg_stat_user_indexes has never seen scanned
+    """
+    used = set()
+    for (indexes,) in db.session.query(SlowQueryLog.indexes_used).filter(SlowQueryLog.indexes_used != ''):
+        used.update(indexes.split(','))
+
+    scans = {}
+    if db.engine.dialect.name == 'postgresql':
+        scans = dict(db.session.execute(text(
+            "SELECT indexrelname, idx_scan FROM pg_stat_user_indexes"
+        )).all())
+
+    return [(index, table, scans.get(index)) for index, table in declared_indexes(schema_path)
+            if index not in used and not scans.get(index)]
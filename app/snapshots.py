@@ -0,0 +1,268 @@
+"""
+Columnar Parquet snapshots of news_article, tweet, retweet and users for offline
+analytics (needs the pyarrow package).
+
+Each table is written as hive-style partitions
+
+    <SNAPSHOT_DIR>/<table>/label=<label>/month=<YYYY-MM>/part-<snapshot_id>.parquet
+
+from Arrow record batches built straight off a server-side cursor, so no table is
+ever held in memory. manifest.json records a fingerprint (row count, max key and a
+checksum over every column of every row) for every partition; later snapshots only
+rewrite partitions whose fingerprint changed and drop partitions that disappeared.
+PostgreSQL sums hashtext(row::text) per partition; elsewhere the rows are hashed
+as they stream past.
+
+Snapshots are written by snapshot_export.py, outside any request (a full scan
+would run into the request statement_timeout). A lock file next to the manifest
+keeps concurrent runs from overwriting each other's manifest.
+"""
+
+import fcntl
+import json
+import os
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import select, func, and_, or_, literal, literal_column
+from app.models import NewsArticle, Tweet, Retweet, User
+from app.database import db
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+SNAPSHOT_BATCH_SIZE = 10000
+MANIFEST_NAME = 'manifest.json'
+LOCK_NAME = 'manifest.lock'
+UNKNOWN = 'unknown'
+
+def _arrow_type(column):
+    python_type = column.type.python_type
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is int:
+        return pa.int64()
+    if python_type is float:
+        return pa.float64()
+    if python_type is datetime:
+        return pa.timestamp('us')
+    return pa.string()
+
+def _month(col):
+    if db.engine.dialect.name == 'postgresql':
+        return func.to_char(col, 'YYYY-MM')
+    return func.strftime('%Y-%m', col)
+
+# table -> columns, label expression (None when the table has no label), partition
+# timestamp, key used for the fingerprint and joins
+SNAPSHOT_TABLES = {
+    'news_article': dict(
+        columns=list(NewsArticle.__table__.columns),
+        label=NewsArticle.label,
+        timestamp=NewsArticle.created_at,
+        key=NewsArticle.article_id,
+        joins=[],
+    ),
+    'tweet': dict(
+        columns=list(Tweet.__table__.columns),
+        label=NewsArticle.label,
+        timestamp=Tweet.created_at,
+        key=Tweet.tweet_id,
+        joins=[(NewsArticle, Tweet.article_id == NewsArticle.article_id)],
+    ),
+    'retweet': dict(
+        columns=list(Retweet.__table__.columns),
+        label=NewsArticle.label,
+        timestamp=Retweet.retweeted_at,
+        key=Retweet.retweet_id,
+        joins=[(Tweet, Retweet.tweet_id == Tweet.tweet_id),
+               (NewsArticle, Tweet.article_id == NewsArticle.article_id)],
+    ),
+    'users': dict(
+        columns=list(User.__table__.columns),
+        label=None,
+        timestamp=User.created_at,
+        key=User.user_id,
+        joins=[],
+    ),
+}
+
+def _partition_keys(spec):
+    label = func.coalesce(spec['label'], UNKNOWN) if spec['label'] is not None else literal(UNKNOWN)
+    return label.label('part_label'), func.coalesce(_month(spec['timestamp']), UNKNOWN).label('part_month')
+
+def _from(query, spec):
+    query = query.select_from(spec['columns'][0].table)
+    for target, onclause in spec['joins']:
+        query = query.outerjoin(target, onclause)
+    return query
+
+def _partition_path(table, label, month):
+    return f'{table}/label={label}/month={month}'
+
+def _fingerprints(table, spec):
+    """Row count, max key and whole-row checksum for every partition of `table`"""
+    label, month = _partition_keys(spec)
+    if db.engine.dialect.name != 'postgresql':
+        return _streamed_fingerprints(table, spec, label, month)
+
+    query = _from(select(
+        label, month,
+        func.count(),
+        func.max(spec['key']),
+        func.coalesce(func.sum(literal_column(f'hashtext({table}::text)')), 0)
+    ), spec).group_by(label, month)
+
+    return {_partition_path(table, row[0], row[1]): [row[2], str(row[3]), int(row[4])]
+            for row in db.session.execute(query)}
+
+def _streamed_fingerprints(table, spec, label, month):
+    """_fingerprints() without hashtext: hash each row's values while streaming them"""
+    key_index = spec['columns'].index(spec['key'])
+    query = _from(select(label, month, *spec['columns']), spec)
+    partitions = {}
+    result = db.session.execute(query.execution_options(yield_per=SNAPSHOT_BATCH_SIZE))
+    try:
+        for row in result:
+            values = tuple(row[2:])
+            entry = partitions.setdefault(_partition_path(table, row[0], row[1]), [0, None, 0])
+            entry[0] += 1
+            if entry[1] is None or values[key_index] > entry[1]:
+                entry[1] = values[key_index]
+            entry[2] += zlib.crc32(repr(values).encode('utf-8'))
+    finally:
+        result.close()
+    return {path: [count, str(key), checksum] for path, (count, key, checksum) in partitions.items()}
+
+def _write_partitions(table, spec, changed, out_dir, snapshot_id):
+    """Stream the changed partitions of `table` into Parquet files, one batch at a time"""
+    label, month = _partition_keys(spec)
+    query = _from(select(label, month, *spec['columns']), spec).order_by(label, month)
+    if changed is not None:
+        query = query.filter(or_(*[and_(label == part_label, month == part_month)
+                                   for part_label, part_month in changed]))
+
+    schema = pa.schema([(column.name, _arrow_type(column)) for column in spec['columns']])
+    files = {}
+    writer = None
+    current = None
+    batch = []
+
+    def flush():
+        if batch:
+            columns = list(zip(*batch))
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+            ))
+            batch.clear()
+
+    result = db.session.execute(query.execution_options(yield_per=SNAPSHOT_BATCH_SIZE))
+    try:
+        for row in result:
+            partition = _partition_path(table, row[0], row[1])
+            if partition != current:
+                if writer is not None:
+                    flush()
+                    writer.close()
+                current = partition
+                files[partition] = f'{partition}/part-{snapshot_id}.parquet'
+                os.makedirs(os.path.join(out_dir, partition), exist_ok=True)
+                writer = pq.ParquetWriter(os.path.join(out_dir, files[partition]), schema)
+            batch.append(row[2:])
+            if len(batch) >= SNAPSHOT_BATCH_SIZE:
+                flush()
+        if writer is not None:
+            flush()
+            writer.close()
+    finally:
+        result.close()
+
+    return files
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'snapshots': [], 'tables': {}}
+    with open(path) as f:
+        return json.load(f)
+
+def _save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+def _remove(out_dir, relative_path):
+    path = os.path.join(out_dir, relative_path)
+    if os.path.exists(path):
+        os.remove(path)
+
+@contextmanager
+def _locked(out_dir):
+    """Hold an exclusive lock on the snapshot directory, waiting for any other run"""
+    with open(os.path.join(out_dir, LOCK_NAME), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def write_snapshot(out_dir, tables=None, full=False):
+    """
+    Write a snapshot of `tables` (default: all) to `out_dir` and return a summary of
+    the partitions written, kept and removed per table. `full` rewrites everything.
+    """
+    if pa is None:
+        raise RuntimeError('Snapshots need the pyarrow package')
+
+    os.makedirs(out_dir, exist_ok=True)
+    with _locked(out_dir):
+        return _write_snapshot(out_dir, tables, full)
+
+def _write_snapshot(out_dir, tables, full):
+    manifest = load_manifest(out_dir)
+    snapshot_id = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+    summary = {}
+
+    for table in tables or list(SNAPSHOT_TABLES):
+        spec = SNAPSHOT_TABLES[table]
+        previous = {} if full else manifest['tables'].get(table, {})
+        current = _fingerprints(table, spec)
+
+        changed = [path for path, fingerprint in current.items()
+                   if path not in previous or previous[path]['fingerprint'] != fingerprint]
+        removed = [path for path in manifest['tables'].get(table, {}) if path not in current]
+
+        if changed:
+            keys = None if len(changed) == len(current) else [
+                tuple(part.split('=', 1)[1] for part in path.split('/')[1:]) for path in changed
+            ]
+            files = _write_partitions(table, spec, keys, out_dir, snapshot_id)
+        else:
+            files = {}
+
+        # A partition whose rows were deleted between fingerprinting and writing has no file
+        vanished = [path for path in changed if path not in files]
+        changed = [path for path in changed if path in files]
+        removed += [path for path in vanished if path in manifest['tables'].get(table, {})]
+
+        entries = dict(manifest['tables'].get(table, {}))
+        for path in changed:
+            if path in entries and entries[path]['file'] != files[path]:
+                _remove(out_dir, entries[path]['file'])
+            entries[path] = {'file': files[path], 'fingerprint': current[path],
+                             'rows': current[path][0], 'snapshot_id': snapshot_id}
+        for path in removed:
+            _remove(out_dir, entries.pop(path)['file'])
+
+        manifest['tables'][table] = entries
+        summary[table] = {'written': len(changed), 'unchanged': len(current) - len(changed) - len(vanished),
+                          'removed': len(removed)}
+
+    manifest['snapshots'].append({'snapshot_id': snapshot_id, 'tables': summary})
+    _save_manifest(out_dir, manifest)
+    return {'snapshot_id': snapshot_id, 'tables': summary}
@@ -1,7 +1,10 @@
 // Operational Dashboard JavaScript
 
-let refreshInterval;
+let liveFeed = null;
+let refreshInterval = null;
 let charts = {};
+let engagementCursor = null;
+let engagementLoading = false;
 
 // Initialize dashboard
 document.addEventListener('DOMContentLoaded', () => {
@@ -14,6 +17,16 @@ function initializeFilters() {
     document.getElementById('refreshBtn').addEventListener('click', loadDashboardData);
     document.getElementById('timeRange').addEventListener('change', loadDashboardData);
     document.getElementById('newsType').addEventListener('change', loadDashboardData);
+    document.getElementById('viralSort').addEventListener('change', loadDashboardData);
+    
+    // Load the next page of the engagement table when scrolled near the bottom
+    const tableContainer = document.getElementById('engagementTable').closest('.table-responsive');
+    tableContainer.addEventListener('scroll', () => {
+        const nearBottom = tableContainer.scrollTop + tableContainer.clientHeight >= tableContainer.scrollHeight - 50;
+        if (nearBottom && engagementCursor && !engagementLoading) {
+            loadEngagementPage();
+        }
+    });
 }
 
 
@@ -21,12 +34,13 @@ function initializeFilters() {
 async function loadDashboardData() {
     const hours = document.getElementById('timeRange').value;
     const newsType = document.getElementById('newsType').value;
+    const viralSort = document.getElementById('viralSort').value;
     
     try {
         // Load all data in parallel
         const [stats, viralContent, influencers, sources, categories] = await Promise.all([
             apiRequest('/api/stats/overview'),
-            apiRequest(`/operational/viral-content?hours=${hours}${newsType ? '&label=' + newsType : ''}`),
+            apiRequest(`/operational/viral-content?hours=${hours}&sort=${viralSort}${newsType ? '&label=' + newsType : ''}`),
             apiRequest(`/operational/influencers${newsType ? '?label=' + newsType : ''}`),
             apiRequest('/operational/source-credibility'),
             apiRequest(`/operational/category-distribution?hours=${hours}`)
@@ -38,6 +52,7 @@ async function loadDashboardData() {
         updateSourceCredibility(sources);
         updateCategoryDistribution(categories);
         updateEngagementTable();
+        connectLiveFeed(hours, newsType, viralSort);
         
     } catch (error) {
         console.error('Failed to load dashboard data:', error);
@@ -45,6 +60,41 @@ async function loadDashboardData() {
     }
 }
 
+// Receive overview, viral content and category updates as the server pushes them,
+// or poll for them where the server has the feed turned off
+function connectLiveFeed(hours, newsType, viralSort) {
+    if (liveFeed) {
+        liveFeed.close();
+        liveFeed = null;
+    }
+    clearInterval(refreshInterval);
+    if (!LIVE_FEED || !window.EventSource) {
+        refreshInterval = setInterval(() => pollLivePanels(hours, newsType, viralSort), LIVE_POLL_INTERVAL_MS);
+        return;
+    }
+    
+    liveFeed = new EventSource(`/operational/live?hours=${hours}&sort=${viralSort}${newsType ? '&label=' + newsType : ''}`);
+    liveFeed.addEventListener('overview', event => updateOverviewMetrics(JSON.parse(event.data)));
+    liveFeed.addEventListener('viral', event => updateViralContent(JSON.parse(event.data)));
+    liveFeed.addEventListener('categories', event => updateCategoryDistribution(JSON.parse(event.data)));
+}
+
+async function pollLivePanels(hours, newsType, viralSort) {
+    try {
+        const [stats, viralContent, categories] = await Promise.all([
+            apiRequest('/api/stats/overview'),
+            apiRequest(`/operational/viral-content?hours=${hours}&sort=${viralSort}${newsType ? '&label=' + newsType : ''}`),
+            apiRequest(`/operational/category-distribution?hours=${hours}`)
+        ]);
+        
+        updateOverviewMetrics(stats);
+        updateViralContent(viralContent);
+        updateCategoryDistribution(categories);
+    } catch (error) {
+        console.error('Failed to refresh dashboard data:', error);
+    }
+}
+
 // Update overview metrics
 function updateOverviewMetrics(stats) {
     document.getElementById('totalArticles').textContent = formatNumber(stats.articles.total);
@@ -84,6 +134,10 @@ function updateViralContent(articles) {
                 <small class="text-muted">
                     <i class="fas fa-comment"></i> ${formatNumber(article.tweet_count)} tweets
                 </small>
+                ${article.velocity !== undefined ? `
+                <small class="text-muted" title="Tweets and retweets per hour (acceleration: ${article.acceleration.toFixed(1)}/h)">
+                    <i class="fas fa-tachometer-alt"></i> ${article.velocity.toFixed(1)}/h
+                </small>` : ''}
             </div>
             <div class="progress" style="height: 10px;">
                 <div class="progress-bar bg-warning" 
@@ -291,30 +345,31 @@ function updateCategoryDistribution(categories) {
 
 // Update engagement table
 async function updateEngagementTable() {
+    engagementCursor = null;
+    await loadEngagementPage(true);
+}
+
+// Load one page of the engagement table using cursor pagination
+async function loadEngagementPage(reset = false) {
     const tbody = document.getElementById('engagementTableBody');
     const newsType = document.getElementById('newsType').value;
+    const after = reset ? '' : encodeURIComponent(engagementCursor);
     
+    engagementLoading = true;
     try {
-        const response = await apiRequest(`/api/articles?per_page=10${newsType ? '&label=' + newsType : ''}`);
+        const response = await apiRequest(`/operational/engagement?per_page=10&after=${after}${newsType ? '&label=' + newsType : ''}`);
         const articles = response.articles;
+        engagementCursor = response.next_cursor;
         
         if (!articles || articles.length === 0) {
-            tbody.innerHTML = '<tr><td colspan="7" class="text-center">No articles found.</td></tr>';
+            if (reset) {
+                tbody.innerHTML = '<tr><td colspan="7" class="text-center">No articles found.</td></tr>';
+            }
             return;
         }
         
-        // Fetch engagement data for each article
-        const articlesWithEngagement = await Promise.all(
-            articles.map(async (article) => {
-                const detail = await apiRequest(`/api/articles/${article.article_id}`);
-                return {
-                    ...article,
-                    engagement: detail.engagement
-                };
-            })
-        );
-        
-        const html = articlesWithEngagement.map(article => `
+        // Engagement totals are aggregated server-side in the same response
+        const html = articles.map(article => `
             <tr>
                 <td>
                     <a href="${article.url}" target="_blank" class="text-decoration-none">
@@ -345,11 +400,19 @@ async function updateEngagementTable() {
             </tr>
         `).join('');
         
-        tbody.innerHTML = html;
+        if (reset) {
+            tbody.innerHTML = html;
+        } else {
+            tbody.insertAdjacentHTML('beforeend', html);
+        }
         
     } catch (error) {
         console.error('Failed to load engagement table:', error);
-        tbody.innerHTML = '<tr><td colspan="7" class="text-center text-danger">Failed to load data.</td></tr>';
+        if (reset) {
+            tbody.innerHTML = '<tr><td colspan="7" class="text-center text-danger">Failed to load data.</td></tr>';
+        }
+    } finally {
+        engagementLoading = false;
     }
 }
 
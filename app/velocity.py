@@ -0,0 +1,170 @@
+"""
+Engagement velocity and acceleration for the viral content panel.
+
+Every article keeps two exponentially decayed event rates, counting its tweets
+(tweet.created_at) and retweets (retweet.retweeted_at) in events per hour:
+
+    fast_rate  half-life FAST_HALF_LIFE_HOURS, the current velocity
+    slow_rate  half-life SLOW_HALF_LIFE_HOURS, the article's recent trend
+
+and acceleration = fast_rate - slow_rate, positive while the last few hours
+outpace the day before them. refresh_velocity() maintains them incrementally,
+selecting events by timestamp in hourly buckets rather than by id, since ids are
+neither assigned nor committed in order. Events older than RECOUNT_WINDOW_HOURS are
+settled: folded once into settled_fast/settled_slow, which are decayed to each
+refresh time. The window itself is recounted from scratch on every refresh, so a
+row committed late or with a lower id is still counted, exactly once, as long as it
+lands within the window; older stragglers need a rebuild (delete velocity_state).
+
+All rows share one reference time, so top_trending() ranks by decaying them to
+now with two constant factors, a single ORDER BY ... LIMIT on the small
+article_velocity table. Until the first refresh the rates are computed live from
+the last LIVE_WINDOW_HOURS of events.
+"""
+
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, update
+from app.models import NewsArticle, Tweet, Retweet, ArticleVelocity, VelocityState
+from app.viral import hour_bucket
+from app.database import db
+
+VELOCITY_STATE_NAME = 'article_velocity'
+VELOCITY_SORTS = ('velocity', 'acceleration')
+
+FAST_HALF_LIFE_HOURS = 2
+SLOW_HALF_LIFE_HOURS = 24
+FAST_TAU = FAST_HALF_LIFE_HOURS / math.log(2)
+SLOW_TAU = SLOW_HALF_LIFE_HOURS / math.log(2)
+
+# First refresh and the live fallback only look this far back; older events weigh < 1/16
+LIVE_WINDOW_HOURS = 4 * SLOW_HALF_LIFE_HOURS
+# Recent events are recounted on every refresh; a tweet or retweet committed this
+# long after its timestamp is missed by the incremental refresh
+RECOUNT_WINDOW_HOURS = 6
+# Rows whose rates have both decayed below this (events per hour) are dropped
+MIN_RATE = 0.01
+
+def _decay(hours, tau):
+    return math.exp(-max(hours, 0) / tau)
+
+def _event_buckets(tweet_filters, retweet_filters, label=None):
+    """(article_id, hour, events) for the tweets and retweets matching the filters"""
+    buckets = []
+    for hour, filters, join in ((hour_bucket(Tweet.created_at), tweet_filters, None),
+                                (hour_bucket(Retweet.retweeted_at), retweet_filters, Retweet)):
+        query = db.session.query(Tweet.article_id, hour, func.count())
+        if join is not None:
+            query = query.join(Retweet, Retweet.tweet_id == Tweet.tweet_id)
+        if label:
+            query = query.join(NewsArticle, NewsArticle.article_id == Tweet.article_id).filter(
+                NewsArticle.label == label)
+        buckets += query.filter(
+            Tweet.article_id.isnot(None), hour.isnot(None), *filters
+        ).group_by(Tweet.article_id, hour).all()
+    return buckets
+
+def _rates(buckets, now):
+    """{article_id: [fast_rate, slow_rate]} contributed by event buckets as of `now`"""
+    rates = defaultdict(lambda: [0.0, 0.0])
+    for article_id, hour, events in buckets:
+        # Each bucket's events are counted at its midpoint
+        age = (now - (hour + timedelta(minutes=30))).total_seconds() / 3600
+        rate = rates[article_id]
+        rate[0] += events * _decay(age, FAST_TAU) / FAST_TAU
+        rate[1] += events * _decay(age, SLOW_TAU) / SLOW_TAU
+    return rates
+
+def velocity_ready():
+    """True once refresh_velocity() has populated article_velocity"""
+    return db.session.get(VelocityState, VELOCITY_STATE_NAME) is not None
+
+def refresh_velocity():
+    """Decay the stored rates to now, settle the events that left the recount window and recount it; returns articles touched"""
+    now = datetime.utcnow()
+    settle_to = now - timedelta(hours=RECOUNT_WINDOW_HOURS)
+    state = db.session.get(VelocityState, VELOCITY_STATE_NAME, with_for_update=True)
+
+    if state is None:
+        since = now - timedelta(hours=LIVE_WINDOW_HOURS)
+        db.session.execute(delete(ArticleVelocity))
+        state = VelocityState(name=VELOCITY_STATE_NAME)
+    else:
+        since = state.settled_at
+        hours = (now - state.refreshed_at).total_seconds() / 3600
+        fast_decay, slow_decay = _decay(hours, FAST_TAU), _decay(hours, SLOW_TAU)
+        # The previous recount is dropped along with the decay; only settled rates carry over
+        db.session.execute(update(ArticleVelocity).values(
+            settled_fast=ArticleVelocity.settled_fast * fast_decay,
+            settled_slow=ArticleVelocity.settled_slow * slow_decay,
+            fast_rate=ArticleVelocity.settled_fast * fast_decay,
+            slow_rate=ArticleVelocity.settled_slow * slow_decay
+        ))
+        db.session.execute(delete(ArticleVelocity).where(
+            ArticleVelocity.fast_rate < MIN_RATE, ArticleVelocity.slow_rate < MIN_RATE))
+
+    settled = _rates(_event_buckets([Tweet.created_at >= since, Tweet.created_at < settle_to],
+                                    [Retweet.retweeted_at >= since, Retweet.retweeted_at < settle_to]), now)
+    recent = _rates(_event_buckets([Tweet.created_at >= settle_to], [Retweet.retweeted_at >= settle_to]), now)
+
+    article_ids = list(settled.keys() | recent.keys())
+    for start in range(0, len(article_ids), 1000):
+        chunk = article_ids[start:start + 1000]
+        existing = {row.article_id: row for row in
+                    db.session.query(ArticleVelocity).filter(ArticleVelocity.article_id.in_(chunk))}
+        for article_id in chunk:
+            settled_fast, settled_slow = settled.get(article_id, (0.0, 0.0))
+            recent_fast, recent_slow = recent.get(article_id, (0.0, 0.0))
+            row = existing.get(article_id)
+            if row is None:
+                row = ArticleVelocity(article_id=article_id, fast_rate=0.0, slow_rate=0.0,
+                                      settled_fast=0.0, settled_slow=0.0)
+                db.session.add(row)
+            row.settled_fast += settled_fast
+            row.settled_slow += settled_slow
+            row.fast_rate += settled_fast + recent_fast
+            row.slow_rate += settled_slow + recent_slow
+
+    state.refreshed_at = now
+    state.settled_at = settle_to
+    db.session.add(state)
+    db.session.commit()
+    return len(article_ids)
+
+def top_trending(sort='velocity', label=None, limit=20):
+    """(article, velocity, acceleration) for the `limit` fastest or fastest-accelerating articles"""
+    now = datetime.utcnow()
+    state = db.session.get(VelocityState, VELOCITY_STATE_NAME)
+    if state is None:
+        return _live_trending(sort, label, limit, now)
+
+    hours = (now - state.refreshed_at).total_seconds() / 3600
+    velocity = ArticleVelocity.fast_rate * _decay(hours, FAST_TAU)
+    acceleration = velocity - ArticleVelocity.slow_rate * _decay(hours, SLOW_TAU)
+    ranking = velocity if sort == 'velocity' else acceleration
+
+    query = db.session.query(
+        NewsArticle,
+        velocity.label('velocity'),
+        acceleration.label('acceleration')
+    ).join(
+        ArticleVelocity, ArticleVelocity.article_id == NewsArticle.article_id
+    )
+    if label:
+        query = query.filter(NewsArticle.label == label)
+
+    return query.order_by(ranking.desc(), NewsArticle.article_id).limit(limit).all()
+
+def _live_trending(sort, label, limit, now):
+    since = now - timedelta(hours=LIVE_WINDOW_HOURS)
+    rates = _rates(_event_buckets([Tweet.created_at >= since], [Retweet.retweeted_at >= since], label), now)
+
+    def ranking(item):
+        article_id, (fast, slow) = item
+        return (-(fast if sort == 'velocity' else fast - slow), article_id)
+
+    top = sorted(rates.items(), key=ranking)[:limit]
+    articles = {article.article_id: article for article in
+                NewsArticle.query.filter(NewsArticle.article_id.in_([article_id for article_id, _ in top]))}
+    return [(articles[article_id], fast, fast - slow) for article_id, (fast, slow) in top]
@@ -0,0 +1,123 @@
+"""
+Sliding-window engagement for the viral content panel.
+
+article_engagement_hourly holds per-article engagement in hourly buckets. On
+PostgreSQL the tweet triggers in dashboard_queries.sql keep the buckets current
+as tweets arrive or their counts change; refresh_engagement_buckets() backfills
+them and prunes buckets older than the longest window.
+
+top_viral() serves any window from 1 hour to 7 days by summing the buckets that
+overlap it and ranking by the engagement score in SQL, so the database keeps a
+bounded top-K heap instead of sorting every article or scanning raw tweets. The
+window is widened to whole hours: its oldest bucket is included in full.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import DateTime, delete, func, insert, select
+from app.models import NewsArticle, Tweet, ArticleEngagementHourly, RollupState
+from app.database import db
+
+ENGAGEMENT_STATE_NAME = 'article_engagement_hourly'
+MAX_WINDOW_HOURS = 7 * 24
+
+def hour_bucket(column):
+    if db.engine.dialect.name == 'postgresql':
+        return func.date_trunc('hour', column, type_=DateTime)
+    # Same text format SQLAlchemy uses for SQLite DateTime columns, so comparisons line up
+    return func.strftime('%Y-%m-%d %H:00:00.000000', column, type_=DateTime)
+
+def _floor_hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def engagement_score(retweets, favorites, tweet_count):
+    """The score shown on the dashboard; works on numbers and SQL expressions alike"""
+    return retweets * 2 + favorites + tweet_count * 0.5
+
+def engagement_buckets_ready():
+    """True once refresh_engagement_buckets() has backfilled the hourly buckets"""
+    return db.session.get(RollupState, ENGAGEMENT_STATE_NAME) is not None
+
+def refresh_engagement_buckets(since=None):
+    """Rebuild buckets for tweets posted since `since` (default: the longest window) and prune older ones"""
+    now = datetime.utcnow()
+    oldest = _floor_hour(now - timedelta(hours=MAX_WINDOW_HOURS))
+    since = max(_floor_hour(since), oldest) if since is not None else oldest
+    
+    hour = hour_bucket(Tweet.created_at)
+    db.session.execute(delete(ArticleEngagementHourly).where(ArticleEngagementHourly.hour >= since))
+    db.session.execute(insert(ArticleEngagementHourly).from_select(
+        ['article_id', 'hour', 'tweet_count', 'total_retweets', 'total_favorites'],
+        select(
+            Tweet.article_id,
+            hour,
+            func.count(Tweet.tweet_id),
+            func.coalesce(func.sum(Tweet.retweet_count), 0),
+            func.coalesce(func.sum(Tweet.favorite_count), 0)
+        ).where(
+            Tweet.article_id.isnot(None),
+            Tweet.created_at >= since
+        ).group_by(Tweet.article_id, hour)
+    ))
+    db.session.execute(delete(ArticleEngagementHourly).where(ArticleEngagementHourly.hour < oldest))
+    
+    state = db.session.get(RollupState, ENGAGEMENT_STATE_NAME) or RollupState(name=ENGAGEMENT_STATE_NAME)
+    state.refreshed_at = now
+    db.session.add(state)
+    db.session.commit()
+
+def top_viral(hours, label=None, limit=20):
+    """(article, tweet_count, retweets, favorites, score) for the top `limit` articles of the window"""
+    start = _floor_hour(datetime.utcnow() - timedelta(hours=hours))
+    buckets = ArticleEngagementHourly
+    
+    totals = select(
+        buckets.article_id,
+        func.sum(buckets.tweet_count).label('tweet_count'),
+        func.sum(buckets.total_retweets).label('total_retweets'),
+        func.sum(buckets.total_favorites).label('total_favorites')
+    ).where(
+        buckets.hour >= start
+    ).group_by(buckets.article_id).subquery()
+    score = engagement_score(totals.c.total_retweets, totals.c.total_favorites, totals.c.tweet_count)
+    
+    query = db.session.query(
+        NewsArticle,
+        totals.c.tweet_count,
+        totals.c.total_retweets,
+        totals.c.total_favorites,
+        score.label('engagement_score')
+    ).join(
+        totals, totals.c.article_id == NewsArticle.article_id
+    )
+    if label:
+        query = query.filter(NewsArticle.label == label)
+    
+    return query.order_by(score.desc(), NewsArticle.article_id).limit(limit).all()
+
+def window_totals(article_ids, hours):
+    """{article_id: (tweet_count, retweets, favorites)} over the window for the given articles only"""
+    if not article_ids:
+        return {}
+    if engagement_buckets_ready() and 1 <= hours <= MAX_WINDOW_HOURS:
+        buckets = ArticleEngagementHourly
+        query = db.session.query(
+            buckets.article_id,
+            func.sum(buckets.tweet_count),
+            func.sum(buckets.total_retweets),
+            func.sum(buckets.total_favorites)
+        ).filter(
+            buckets.hour >= _floor_hour(datetime.utcnow() - timedelta(hours=hours))
+        )
+    else:
+        buckets = Tweet
+        query = db.session.query(
+            Tweet.article_id,
+            func.count(Tweet.tweet_id),
+            func.sum(Tweet.retweet_count),
+            func.sum(Tweet.favorite_count)
+        ).filter(
+            Tweet.created_at >= datetime.utcnow() - timedelta(hours=hours)
+        )
+    
+    rows = query.filter(buckets.article_id.in_(article_ids)).group_by(buckets.article_id).all()
+    return {article_id: (tweets, retweets or 0, favorites or 0) for article_id, tweets, retweets, favorites in rows}
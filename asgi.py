@@ -0,0 +1,9 @@
+"""
+ASGI entry point: uvicorn asgi:app --workers 4 (see app/asgi.py)
+Dependencies: pip install -r requirements-asgi.txt
+"""
+
+from app import create_app
+from app.asgi import AsyncDashboard
+
+app = AsyncDashboard(create_app())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark the category performance query plans on a synthetic corpus
+Compares the original article x tweet join against pre-aggregating engagement per
+article. The corpus is built in TEMP tables, which shadow the real tables for this
+session only, so the database is left untouched.
+"""
+
+import argparse
+import statistics
+import time
+from app.pool import get_db_connection
+
+# The query category_performance ran before engagement was pre-aggregated
+FANOUT_SQL = """
+    SELECT DATE_TRUNC('month', na.created_at) AS month, nc.category_name, na.label,
+           COUNT(na.article_id) AS count, AVG(t.retweet_count) AS avg_retweets
+    FROM news_article na
+    JOIN article_category ac ON na.article_id = ac.article_id
+    JOIN news_category nc ON ac.category_id = nc.category_id
+    JOIN tweet t ON na.article_id = t.article_id
+    WHERE na.created_at >= NOW() - INTERVAL '180 days'
+    GROUP BY DATE_TRUNC('month', na.created_at), nc.category_name, na.label
+"""
+
+# Engagement is summed per article before joining to categories
+PREAGGREGATED_SQL = """
+    SELECT DATE_TRUNC('month', na.created_at) AS month, nc.category_name, na.label,
+           COUNT(na.article_id) AS count,
+           SUM(e.total_retweets) * 1.0 / NULLIF(SUM(e.tweet_count), 0) AS avg_retweets
+    FROM news_article na
+    JOIN article_category ac ON na.article_id = ac.article_id
+    JOIN news_category nc ON ac.category_id = nc.category_id
+    LEFT JOIN (
+        SELECT article_id, COUNT(tweet_id) AS tweet_count,
+               COALESCE(SUM(retweet_count), 0) AS total_retweets
+        FROM tweet
+        WHERE article_id IN (SELECT article_id FROM news_article
+                             WHERE created_at >= NOW() - INTERVAL '180 days')
+        GROUP BY article_id
+    ) e ON na.article_id = e.article_id
+    WHERE na.created_at >= NOW() - INTERVAL '180 days'
+    GROUP BY DATE_TRUNC('month', na.created_at), nc.category_name, na.label
+"""
+
+def build_corpus(cur, articles, tweets, categories, seed):
+    """Generate a synthetic corpus server-side in TEMP tables"""
+    cur.execute("SELECT setseed(%s)", (seed,))
+    cur.execute("""
+        CREATE TEMP TABLE news_category AS
+        SELECT g AS category_id, 'category_' || g AS category_name
+        FROM generate_series(1, %s) g
+    """, (categories,))
+    cur.execute("""
+        CREATE TEMP TABLE news_article AS
+        SELECT 'bench_' || g AS article_id,
+               CASE WHEN random() < 0.5 THEN 'fake' ELSE 'real' END AS label,
+               NOW() - random() * INTERVAL '365 days' AS created_at
+        FROM generate_series(1, %s) g
+    """, (articles,))
+    # One or two categories per article
+    cur.execute("""
+        CREATE TEMP TABLE article_category AS
+        SELECT DISTINCT article_id, category_id FROM (
+            SELECT article_id, 1 + floor(random() * %(categories)s)::int AS category_id FROM news_article
+            UNION ALL
+            SELECT article_id, 1 + floor(random() * %(categories)s)::int FROM news_article WHERE random() < 0.5
+        ) pairs
+    """, {'categories': categories})
+    cur.execute("""
+        CREATE TEMP TABLE tweet AS
+        SELECT g::bigint AS tweet_id,
+               'bench_' || (1 + floor(random() * %s)::int) AS article_id,
+               floor(random() * random() * 500)::int AS retweet_count
+        FROM generate_series(1, %s) g
+    """, (articles, tweets))
+    cur.execute("CREATE INDEX ON tweet(article_id)")
+    cur.execute("CREATE INDEX ON article_category(article_id)")
+    cur.execute("CREATE INDEX ON news_article(created_at)")
+    cur.execute("ANALYZE news_category, news_article, article_category, tweet")
+
+def aggregate_input_rows(plan):
+    """Rows fed into the outermost aggregate of an EXPLAIN (ANALYZE, FORMAT JSON) plan"""
+    nodes = [plan]
+    while nodes:
+        node = nodes.pop(0)
+        if node['Node Type'] == 'Aggregate':
+            child = node['Plans'][0]
+            return int(child['Actual Rows'] * child['Actual Loops'])
+        nodes.extend(node.get('Plans', []))
+    return None
+
+def run_plan(cur, name, sql, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        cur.execute(sql)
+        rows = cur.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    
+    cur.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + sql)
+    plan = cur.fetchone()[0][0]['Plan']
+    
+    return {
+        'name': name,
+        'median_ms': statistics.median(timings),
+        'min_ms': min(timings),
+        'groups': len(rows),
+        'total_count': sum(row[3] for row in rows),
+        'aggregated_rows': aggregate_input_rows(plan)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tweets', type=int, default=1000000)
+    parser.add_argument('--articles', type=int, default=50000)
+    parser.add_argument('--categories', type=int, default=10)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--seed', type=float, default=0.42)
+    args = parser.parse_args()
+    
+    conn = get_db_connection()
+    cur = conn.cursor()
+    
+    try:
+        print(f"Building corpus: {args.articles} articles, {args.tweets} tweets, "
+              f"{args.categories} categories...")
+        started = time.perf_counter()
+        build_corpus(cur, args.articles, args.tweets, args.categories, args.seed)
+        print(f"Corpus ready in {time.perf_counter() - started:.1f}s\n")
+        
+        cur.execute("""
+            SELECT COUNT(*) FROM article_category ac
+            JOIN news_article na ON na.article_id = ac.article_id
+            WHERE na.created_at >= NOW() - INTERVAL '180 days'
+        """)
+        expected_count = cur.fetchone()[0]
+        
+        results = [
+            run_plan(cur, 'fan-out join', FANOUT_SQL, args.runs),
+            run_plan(cur, 'pre-aggregated', PREAGGREGATED_SQL, args.runs)
+        ]
+        
+        print(f"{'plan':<16}{'median ms':>12}{'min ms':>10}{'groups':>8}{'rows aggregated':>18}{'sum(count)':>14}")
+        for r in results:
+            print(f"{r['name']:<16}{r['median_ms']:>12.1f}{r['min_ms']:>10.1f}{r['groups']:>8}"
+                  f"{r['aggregated_rows'] or 0:>18}{r['total_count']:>14}")
+        
+        print(f"\nExpected sum(count) (article-category pairs in window): {expected_count}")
+        fanout, preaggregated = results
+        print(f"Speed-up: {fanout['median_ms'] / preaggregated['median_ms']:.1f}x")
+        
+    finally:
+        # The TEMP tables were created in this transaction, so rolling it back drops
+        # them before the connection goes back to the pool
+        conn.rollback()
+        cur.close()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
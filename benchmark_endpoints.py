@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Benchmark every dashboard route on a synthetic database at one or more scale factors
+Seeds articles, users, tweets, retweets and follower edges (scale 1 = 1k articles,
+500 users, 5k tweets, 10k retweets, 5k follower edges), drives each GET route
+through the Flask test client and reports p50/p95/p99 latency, queries per request
+and, on PostgreSQL, rows scanned (from EXPLAIN ANALYZE). Exits non-zero when a
+route answers anything but 200 or regresses past the stored baseline. Routes whose
+queries need PostgreSQL are skipped, and listed, on SQLite.
+
+    python benchmark_endpoints.py --scale 1 10 --update-baseline
+    python benchmark_endpoints.py --scale 1 10
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, insert, text
+from app import create_app
+from app.database import db
+from app.models import (NewsSource, NewsCategory, NewsArticle, NewsContent, ArticleCategory,
+                        User, Tweet, Retweet, UserFollower)
+from app.rollups import refresh_rollups
+from app.profiles import refresh_user_profiles
+from config import Config
+
+BASE_COUNTS = {
+    'articles': 1000,
+    'users': 500,
+    'tweets': 5000,
+    'retweets': 10000,
+    'follower_edges': 5000,
+}
+
+INSERT_BATCH = 5000
+
+# Extra query strings for routes that need them to do real work
+ROUTE_QUERIES = {
+    'api.get_article_details_batch': lambda ids: 'ids=' + ','.join(ids['article_ids'][:20]),
+    'api.get_articles': lambda ids: 'per_page=20',
+}
+
+# Routes that are not part of the dashboard's read path (the live feed stream never ends)
+SKIPPED_ENDPOINTS = {'static', 'metrics', 'api.get_cache_stats', 'api.get_snapshot_manifest',
+                     'operational.live_updates'}
+
+# Routes whose live queries use PostgreSQL date functions; the ones in
+# ROLLUP_ENDPOINTS also run on SQLite once --rollups has built their tables
+POSTGRES_ENDPOINTS = {'analytical.temporal_trends', 'analytical.category_performance',
+                      'analytical.source_reliability_timeline'}
+ROLLUP_ENDPOINTS = {'analytical.temporal_trends', 'analytical.category_performance'}
+
+SCAN_NODES = {'Seq Scan', 'Index Scan', 'Index Only Scan', 'Bitmap Heap Scan'}
+
+def _insert(model, rows):
+    for start in range(0, len(rows), INSERT_BATCH):
+        db.session.execute(insert(model), rows[start:start + INSERT_BATCH])
+
+def seed_database(scale, seed):
+    """Insert a synthetic corpus `scale` times the base size; returns sample ids for routes"""
+    rng = random.Random(seed)
+    counts = {name: int(count * scale) for name, count in BASE_COUNTS.items()}
+    now = datetime.utcnow()
+
+    _insert(NewsSource, [dict(source_id=i, source_name=name, credibility_rating=0.85)
+                         for i, name in enumerate(['gossipcop', 'politifact', 'liar', 'snopes'], start=1)])
+    _insert(NewsCategory, [dict(category_id=i, category_name=f'category_{i}') for i in range(1, 11)])
+
+    users = [dict(user_id=i, username=f'user_{i}', display_name=f'User {i}',
+                  verified=rng.random() < 0.05, followers_count=int(rng.paretovariate(1.2) * 50),
+                  following_count=rng.randint(0, 2000), created_at=now - timedelta(days=rng.randint(30, 3000)))
+             for i in range(1, counts['users'] + 1)]
+    _insert(User, users)
+
+    articles = [dict(article_id=f'article_{i}', source_id=rng.randint(1, 4), url=f'https://example.com/{i}',
+                     title=f'Synthetic headline {i} about topic {rng.randint(1, 500)}',
+                     label='fake' if rng.random() < 0.4 else 'real',
+                     created_at=now - timedelta(minutes=rng.randint(0, 365 * 24 * 60)))
+                for i in range(counts['articles'])]
+    _insert(NewsArticle, articles)
+    _insert(NewsContent, [dict(article_id=a['article_id'], text=f"Body text for {a['title']}")
+                          for a in articles])
+    _insert(ArticleCategory, [dict(article_id=a['article_id'], category_id=category_id)
+                              for a in articles
+                              for category_id in rng.sample(range(1, 11), rng.randint(1, 2))])
+
+    tweets = [dict(tweet_id=i, article_id=rng.choice(articles)['article_id'], user_id=rng.randint(1, counts['users']),
+                   content='Synthetic tweet #news', retweet_count=int(rng.paretovariate(1.5)) - 1,
+                   favorite_count=int(rng.paretovariate(1.3)) - 1,
+                   created_at=now - timedelta(minutes=rng.randint(0, 60 * 24 * 60)))
+              for i in range(1, counts['tweets'] + 1)]
+    _insert(Tweet, tweets)
+
+    retweets = {(rng.randint(1, counts['tweets']), rng.randint(1, counts['users']))
+                for _ in range(counts['retweets'])}
+    _insert(Retweet, [dict(retweet_id=i, tweet_id=tweet_id, user_id=user_id,
+                           retweeted_at=tweets[tweet_id - 1]['created_at'] + timedelta(minutes=rng.randint(1, 600)))
+                      for i, (tweet_id, user_id) in enumerate(sorted(retweets), start=1)])
+
+    edges = {(rng.randint(1, counts['users']), rng.randint(1, counts['users']))
+             for _ in range(counts['follower_edges'])}
+    _insert(UserFollower, [dict(follower_id=a, following_id=b, followed_at=now)
+                           for a, b in edges if a != b])
+    db.session.commit()
+
+    return {'article_ids': [a['article_id'] for a in articles[:100]], 'user_ids': [u['user_id'] for u in users[:100]]}
+
+def unsupported_endpoints(dialect, rollups):
+    """Endpoints that cannot answer on `dialect`"""
+    if dialect == 'postgresql':
+        return set()
+    return POSTGRES_ENDPOINTS - ROLLUP_ENDPOINTS if rollups else set(POSTGRES_ENDPOINTS)
+
+def _route_urls(app, ids, skipped=()):
+    """(endpoint, url) for every GET route, with path arguments filled from sample ids"""
+    values = {'article_id': ids['article_ids'][0], 'user_id': ids['user_ids'][0],
+              'entity': 'articles', 'fmt': 'ndjson'}
+    urls = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if 'GET' not in rule.methods or rule.endpoint in SKIPPED_ENDPOINTS or rule.endpoint in skipped:
+            continue
+        url = rule.build({name: values[name] for name in rule.arguments}, append_unknown=False)[1]
+        query = ROUTE_QUERIES.get(rule.endpoint)
+        urls.append((rule.endpoint, f'{url}?{query(ids)}' if query else url))
+    return urls
+
+class QueryRecorder:
+    """Records the statements issued on the engine while `recording` is set"""
+
+    def __init__(self, engine):
+        self.statements = []
+        self.recording = False
+        event.listen(engine, 'before_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.recording:
+            self.statements.append((statement, parameters))
+
+    @contextmanager
+    def capture(self):
+        self.statements = []
+        self.recording = True
+        try:
+            yield self.statements
+        finally:
+            self.recording = False
+
+def _scanned_rows(plan):
+    rows = 0
+    if plan.get('Node Type') in SCAN_NODES:
+        loops = plan.get('Actual Loops', 1)
+        rows += (plan.get('Actual Rows', 0) + plan.get('Rows Removed by Filter', 0)) * loops
+    for child in plan.get('Plans', []):
+        rows += _scanned_rows(child)
+    return rows
+
+def rows_scanned(statements):
+    """Rows read by scan nodes across `statements`, from EXPLAIN ANALYZE (PostgreSQL only)"""
+    if db.engine.dialect.name != 'postgresql':
+        return None
+
+    total = 0
+    connection = db.engine.raw_connection()
+    try:
+        cur = connection.cursor()
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith('SELECT'):
+                continue
+            cur.execute('EXPLAIN (ANALYZE, FORMAT JSON) ' + statement, parameters)
+            total += _scanned_rows(cur.fetchone()[0][0]['Plan'])
+        connection.rollback()
+    finally:
+        connection.close()
+    return total
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def benchmark_routes(app, client, ids, iterations, warmup, route_filter=None, skipped=()):
+    with app.app_context():
+        recorder = QueryRecorder(db.engine)
+    results = {}
+
+    for endpoint, url in _route_urls(app, ids, skipped):
+        if route_filter and not any(part in url for part in route_filter):
+            continue
+        for _ in range(warmup):
+            client.get(url).get_data()
+
+        timings = []
+        for _ in range(iterations):
+            with recorder.capture() as statements:
+                started = time.perf_counter()
+                response = client.get(url)
+                response.get_data()
+                timings.append((time.perf_counter() - started) * 1000)
+
+        with app.app_context():
+            scanned = rows_scanned(statements)
+        results[url] = {
+            'endpoint': endpoint,
+            'status': response.status_code,
+            'p50_ms': round(_percentile(timings, 50), 2),
+            'p95_ms': round(_percentile(timings, 95), 2),
+            'p99_ms': round(_percentile(timings, 99), 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'queries': len(statements),
+            'rows_scanned': scanned,
+        }
+    return results
+
+def run_scale(scale, args):
+    """Seed a fresh database at `scale` and benchmark every route against it"""
+    database_url = args.database_url
+    tmp = None
+    if database_url is None:
+        tmp = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        tmp.close()
+        database_url = f'sqlite:///{tmp.name}'
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        CACHE_TYPE = 'null'
+
+    try:
+        app = create_app(BenchmarkConfig)
+        # Failing routes show up as a non-200 status in the report instead of tracebacks
+        app.logger.disabled = True
+        with app.app_context():
+            if args.database_url:
+                if not args.reset and db.session.query(func.count(NewsArticle.article_id)).scalar():
+                    sys.exit(f"{args.database_url} is not empty; pass --reset to drop and reseed it")
+                db.drop_all()
+                db.create_all()
+
+            started = time.perf_counter()
+            ids = seed_database(scale, args.seed)
+            if args.rollups:
+                refresh_rollups()
+                refresh_user_profiles()
+            if db.engine.dialect.name == 'postgresql':
+                db.session.execute(text('ANALYZE'))
+                db.session.commit()
+            print(f"Seeded scale {scale} in {time.perf_counter() - started:.1f}s")
+            skipped = unsupported_endpoints(db.engine.dialect.name, args.rollups)
+        for endpoint in sorted(skipped):
+            needs = 'PostgreSQL or --rollups' if endpoint in ROLLUP_ENDPOINTS else 'PostgreSQL'
+            print(f"Skipping {endpoint}: needs {needs}")
+
+        return benchmark_routes(app, app.test_client(), ids, args.iterations, args.warmup, args.routes, skipped)
+    finally:
+        if tmp is not None:
+            os.unlink(tmp.name)
+
+def failures(results):
+    """Routes that answered anything but 200; their timings say nothing"""
+    return [f"scale {scale} {url}: status {result['status']}"
+            for scale, routes in results.items() for url, result in routes.items()
+            if result['status'] != 200]
+
+def compare(results, baseline, tolerance, slack_ms):
+    """Status changes, p95 slowdowns beyond `tolerance` (plus `slack_ms`) and extra queries"""
+    regressions = []
+    for scale, routes in results.items():
+        for url, result in routes.items():
+            previous = baseline.get(scale, {}).get(url)
+            if previous is None:
+                continue
+            if result['status'] != previous['status']:
+                regressions.append(f"scale {scale} {url}: status {result['status']} "
+                                   f"(baseline {previous['status']})")
+            limit = previous['p95_ms'] * (1 + tolerance) + slack_ms
+            if result['p95_ms'] > limit:
+                regressions.append(f"scale {scale} {url}: p95 {result['p95_ms']}ms > {limit:.2f}ms "
+                                   f"(baseline {previous['p95_ms']}ms)")
+            if result['queries'] > previous['queries']:
+                regressions.append(f"scale {scale} {url}: {result['queries']} queries "
+                                   f"(baseline {previous['queries']})")
+    return regressions
+
+def print_results(scale, routes):
+    print(f"\nScale {scale}")
+    print(f"{'route':<48} {'status':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8} {'scanned':>10}")
+    for url, r in routes.items():
+        scanned = '-' if r['rows_scanned'] is None else f"{r['rows_scanned']:,}"
+        print(f"{url[:48]:<48} {r['status']:>6} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f} {r['queries']:>8} {scanned:>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, nargs='+', default=[1], help='Scale factors to run (default: 1)')
+    parser.add_argument('--iterations', type=int, default=20, help='Timed requests per route')
+    parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per route')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the synthetic corpus')
+    parser.add_argument('--routes', nargs='+', help='Only routes whose URL contains one of these')
+    parser.add_argument('--rollups', action='store_true', help='Build rollups and user profiles after seeding')
+    parser.add_argument('--database-url', help='Benchmark against this database instead of a temporary SQLite file')
+    parser.add_argument('--reset', action='store_true', help='Allow dropping and reseeding --database-url')
+    parser.add_argument('--baseline', default='benchmark_baseline.json', help='Baseline file to compare against')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Allowed p95 slowdown as a fraction of the baseline (default: 0.5)')
+    parser.add_argument('--slack-ms', type=float, default=2.0, help='Absolute p95 slack in milliseconds')
+    parser.add_argument('--output', help='Also write the results as JSON to this file')
+    args = parser.parse_args()
+
+    results = {}
+    for scale in args.scale:
+        key = f'{scale:g}'
+        results[key] = run_scale(scale, args)
+        print_results(key, results[key])
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    failed = failures(results)
+    if failed:
+        print("\nFailing routes (fix them before comparing or storing a baseline):")
+        for failure in failed:
+            print(f"- {failure}")
+        sys.exit(1)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.tolerance, args.slack_ms)
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"- {regression}")
+        sys.exit(1)
+    print("\nNo regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -10,9 +11,53 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False  # Set to True for SQL query debugging
     
+    # Connection pool (app/pool.py; PostgreSQL only). Keep DB_POOL_SIZE + DB_MAX_OVERFLOW
+    # per worker within max_connections, or PgBouncer's default_pool_size
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 20)
+    DB_POOL_TIMEOUT = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = 1800  # replace connections older than this many seconds
+    DB_POOL_PRE_PING = True
+    # DATABASE_URL points at PgBouncer in transaction pooling mode
+    DB_PGBOUNCER = (os.environ.get('DB_PGBOUNCER') or '').lower() in ('1', 'true', 'yes')
+    # statement_timeout by route class (blueprint) in milliseconds; 0 disables it
+    STATEMENT_TIMEOUTS = {'operational': 5000, 'api': 15000, 'analytical': 60000}
+    DEFAULT_STATEMENT_TIMEOUT = 30000
+    
     # Pagination
     ITEMS_PER_PAGE = 20
     
     # Cache settings
-    CACHE_TYPE = "simple"
-    CACHE_DEFAULT_TIMEOUT = 300
\ No newline at end of file
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or "simple"  # "simple", "redis" or "null"
+    CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_MAX_ENTRIES = 512
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    CACHE_INVALIDATION_FILE = os.environ.get('CACHE_INVALIDATION_FILE') or \
+        os.path.join(tempfile.gettempdir(), 'fakenews_dashboard_cache.stamp')
+    
+    # Parquet snapshots for offline analytics (see snapshot_export.py)
+    SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR') or 'snapshots'
+    
+    # Opt-in slow query log: EXPLAIN plans for statements slower than the threshold
+    SLOW_QUERY_LOG = (os.environ.get('SLOW_QUERY_LOG') or '').lower() in ('1', 'true', 'yes')
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS') or 250)
+    SLOW_QUERY_EXPLAIN_INTERVAL = 300  # seconds between plans for the same fingerprint
+    SLOW_QUERY_QUEUE_SIZE = 100  # statements waiting to be explained before new ones are dropped
+    
+    # Server-Sent Events feed for the operational dashboard (app/livefeed.py). Every open
+    # stream holds a worker thread under WSGI, so enable it only behind threaded workers;
+    # the ASGI mode turns it on. Otherwise the dashboard polls every LIVE_POLL_INTERVAL
+    LIVE_FEED = (os.environ.get('LIVE_FEED') or '').lower() in ('1', 'true', 'yes')
+    LIVE_POLL_INTERVAL = 30  # seconds
+    LIVE_FEED_INTERVAL = float(os.environ.get('LIVE_FEED_INTERVAL') or 5)  # seconds between change checks
+    LIVE_FEED_MAX_AGE = 60  # re-render the time-window panels at least this often
+    LIVE_FEED_HEARTBEAT = 15  # keepalive comment on idle streams, in seconds
+    LIVE_FEED_MAX_PENDING = 100  # events queued for a slow client before it is dropped
+    
+    # ASGI serving mode (asgi.py): async engine for the dashboard JSON endpoints
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')  # default: DATABASE_URL with asyncpg
+    ASYNC_POOL_SIZE = 20
+    ASYNC_MAX_OVERFLOW = 10
+    ASGI_THREADS = 16  # thread pool for the remaining, synchronous routes
+    # Concurrent identical GETs share one execution (off to compare raw throughput)
+    ASGI_COALESCE = (os.environ.get('ASGI_COALESCE') or 'true').lower() in ('1', 'true', 'yes')
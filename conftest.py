@@ -0,0 +1,97 @@
+"""
+Shared pytest fixtures: a Flask app backed by an in-memory SQLite database
+"""
+
+import contextlib
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.database import db
+from app.models import (NewsSource, NewsArticle, NewsCategory, ArticleCategory,
+                        User, Tweet)
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    CACHE_TYPE = 'null'
+
+def seed_articles(count):
+    """Insert `count` articles spread over two sources and two categories each"""
+    sources = [NewsSource(source_id=1, source_name='gossipcop', credibility_rating=0.85),
+               NewsSource(source_id=2, source_name='politifact', credibility_rating=0.90)]
+    categories = [NewsCategory(category_id=i, category_name=name)
+                  for i, name in enumerate(['politics', 'entertainment', 'health'], start=1)]
+    db.session.add_all(sources + categories)
+    
+    users = [User(user_id=i, username=f'user_{i}', verified=(i % 5 == 0), followers_count=i * 10)
+             for i in range(1, 11)]
+    db.session.add_all(users)
+    
+    now = datetime.utcnow()
+    tweet_id = 1
+    for i in range(count):
+        article_id = f'article_{i}'
+        db.session.add(NewsArticle(
+            article_id=article_id,
+            source_id=sources[i % 2].source_id,
+            url=f'https://example.com/{i}',
+            title=f'Article {i}',
+            label='fake' if i % 3 == 0 else 'real',
+            created_at=now - timedelta(hours=i)
+        ))
+        db.session.add(ArticleCategory(article_id=article_id, category_id=1 + i % 3))
+        db.session.add(ArticleCategory(article_id=article_id, category_id=1 + (i + 1) % 3))
+        for j in range(2):
+            db.session.add(Tweet(
+                tweet_id=tweet_id,
+                article_id=article_id,
+                user_id=users[(i + j) % len(users)].user_id,
+                content='Check out this article! #news',
+                created_at=now - timedelta(hours=i, minutes=j),
+                retweet_count=i + j,
+                favorite_count=2 * i + j
+            ))
+            tweet_id += 1
+    
+    db.session.commit()
+
+@pytest.fixture
+def config_class(tmp_path):
+    class Config(TestConfig):
+        CACHE_INVALIDATION_FILE = str(tmp_path / 'cache.stamp')
+    return Config
+
+@pytest.fixture
+def app(config_class):
+    app = create_app(config_class)
+    with app.app_context():
+        seed_articles(40)
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager factory that records every SQL statement executed inside it"""
+    @contextlib.contextmanager
+    def counter():
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    
+    return counter
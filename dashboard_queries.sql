@@ -188,6 +188,15 @@ CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tweet_user_id ON tweet(user_id);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_article_created_at ON news_article(created_at);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_article_label ON news_article(label);
 CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_retweet_user_tweet ON retweet(user_id, tweet_id);
+-- Composite sort key for keyset pagination in /api/articles?after=<cursor>
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_article_created_at_id ON news_article(created_at, article_id);
+
+-- Full-text search indexes used by /api/articles?search=...
+-- The expressions must match app/search.py exactly for the planner to use them
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_article_title_fts
+ON news_article USING GIN (to_tsvector('english', title));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_text_fts
+ON news_content USING GIN (to_tsvector('english', COALESCE(text, '')));
 
 -- ============================================================================
 -- MATERIALIZED VIEWS FOR DASHBOARD PERFORMANCE
@@ -211,6 +220,12 @@ ON daily_news_stats(news_date, label);
 -- Refresh command (to be run periodically)
 -- REFRESH MATERIALIZED VIEW CONCURRENTLY daily_news_stats;
 
+-- The analytical endpoints read incrementally maintained rollup tables instead
+-- (article_daily_rollup, article_engagement_daily, category_daily_rollup,
+-- category_monthly_rollup; defined in app/models.py). Refresh them with:
+--   python refresh_rollups.py            -- rows touched in the last 2 days
+--   python refresh_rollups.py --full     -- after backfills or date rewrites
+
 -- ============================================================================
 -- AGGREGATION FUNCTIONS FOR DASHBOARD METRICS
 -- ============================================================================
@@ -250,4 +265,271 @@ BEGIN
     
     RETURN COALESCE(threshold, 0);
 END;
-$$ LANGUAGE plpgsql;
\ No newline at end of file
+$$ LANGUAGE plpgsql;
+-- ============================================================================
+-- DASHBOARD COUNTERS (read by /api/stats/overview)
+-- ============================================================================
+
+-- Single-row summary table so the overview endpoint is one primary-key lookup
+CREATE TABLE IF NOT EXISTS dashboard_counters (
+    counter_id INTEGER PRIMARY KEY DEFAULT 1 CHECK (counter_id = 1),
+    total_articles BIGINT NOT NULL DEFAULT 0,
+    fake_articles BIGINT NOT NULL DEFAULT 0,
+    real_articles BIGINT NOT NULL DEFAULT 0,
+    total_users BIGINT NOT NULL DEFAULT 0,
+    verified_users BIGINT NOT NULL DEFAULT 0,
+    total_tweets BIGINT NOT NULL DEFAULT 0,
+    total_retweets BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Statement-level triggers with transition tables apply one delta per statement,
+-- so bulk INSERT ... SELECT and COPY loads touch the counters row once
+CREATE OR REPLACE FUNCTION apply_article_counter_delta() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE dashboard_counters c SET
+            total_articles = c.total_articles + d.total,
+            fake_articles = c.fake_articles + d.fake_count,
+            real_articles = c.real_articles + d.real_count,
+            updated_at = NOW()
+        FROM (SELECT COUNT(*) AS total,
+                     COUNT(*) FILTER (WHERE label = 'fake') AS fake_count,
+                     COUNT(*) FILTER (WHERE label = 'real') AS real_count
+              FROM new_rows) d
+        WHERE c.counter_id = 1;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE dashboard_counters c SET
+            total_articles = c.total_articles - d.total,
+            fake_articles = c.fake_articles - d.fake_count,
+            real_articles = c.real_articles - d.real_count,
+            updated_at = NOW()
+        FROM (SELECT COUNT(*) AS total,
+                     COUNT(*) FILTER (WHERE label = 'fake') AS fake_count,
+                     COUNT(*) FILTER (WHERE label = 'real') AS real_count
+              FROM old_rows) d
+        WHERE c.counter_id = 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_user_counter_delta() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE dashboard_counters c SET
+            total_users = c.total_users + d.total,
+            verified_users = c.verified_users + d.verified_count,
+            updated_at = NOW()
+        FROM (SELECT COUNT(*) AS total,
+                     COUNT(*) FILTER (WHERE verified) AS verified_count
+              FROM new_rows) d
+        WHERE c.counter_id = 1;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE dashboard_counters c SET
+            total_users = c.total_users - d.total,
+            verified_users = c.verified_users - d.verified_count,
+            updated_at = NOW()
+        FROM (SELECT COUNT(*) AS total,
+                     COUNT(*) FILTER (WHERE verified) AS verified_count
+              FROM old_rows) d
+        WHERE c.counter_id = 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_tweet_counter_delta() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE dashboard_counters c SET
+            total_tweets = c.total_tweets + d.total,
+            total_retweets = c.total_retweets + d.retweet_sum,
+            updated_at = NOW()
+        FROM (SELECT COUNT(*) AS total,
+                     COALESCE(SUM(retweet_count), 0) AS retweet_sum
+              FROM new_rows) d
+        WHERE c.counter_id = 1;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE dashboard_counters c SET
+            total_tweets = c.total_tweets - d.total,
+            total_retweets = c.total_retweets - d.retweet_sum,
+            updated_at = NOW()
+        FROM (SELECT COUNT(*) AS total,
+                     COALESCE(SUM(retweet_count), 0) AS retweet_sum
+              FROM old_rows) d
+        WHERE c.counter_id = 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_article_counters_insert AFTER INSERT ON news_article
+REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION apply_article_counter_delta();
+CREATE OR REPLACE TRIGGER trg_article_counters_update AFTER UPDATE ON news_article
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION apply_article_counter_delta();
+CREATE OR REPLACE TRIGGER trg_article_counters_delete AFTER DELETE ON news_article
+REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION apply_article_counter_delta();
+
+CREATE OR REPLACE TRIGGER trg_user_counters_insert AFTER INSERT ON users
+REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION apply_user_counter_delta();
+CREATE OR REPLACE TRIGGER trg_user_counters_update AFTER UPDATE ON users
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION apply_user_counter_delta();
+CREATE OR REPLACE TRIGGER trg_user_counters_delete AFTER DELETE ON users
+REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION apply_user_counter_delta();
+
+CREATE OR REPLACE TRIGGER trg_tweet_counters_insert AFTER INSERT ON tweet
+REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION apply_tweet_counter_delta();
+CREATE OR REPLACE TRIGGER trg_tweet_counters_update AFTER UPDATE ON tweet
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION apply_tweet_counter_delta();
+CREATE OR REPLACE TRIGGER trg_tweet_counters_delete AFTER DELETE ON tweet
+REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION apply_tweet_counter_delta();
+
+-- Seed (or re-sync) the counters row from the base tables; same statement as
+-- app.counters.REFRESH_COUNTERS_SQL
+INSERT INTO dashboard_counters (counter_id, total_articles, fake_articles, real_articles,
+                                total_users, verified_users, total_tweets, total_retweets,
+                                updated_at)
+SELECT 1, a.total, a.fake_count, a.real_count, u.total, u.verified_count,
+       t.total, t.retweet_sum, CURRENT_TIMESTAMP
+FROM (SELECT COUNT(*) AS total,
+             COUNT(*) FILTER (WHERE label = 'fake') AS fake_count,
+             COUNT(*) FILTER (WHERE label = 'real') AS real_count
+      FROM news_article) a,
+     (SELECT COUNT(*) AS total,
+             COUNT(*) FILTER (WHERE verified) AS verified_count
+      FROM users) u,
+     (SELECT COUNT(*) AS total,
+             COALESCE(SUM(retweet_count), 0) AS retweet_sum
+      FROM tweet) t
+ON CONFLICT (counter_id) DO UPDATE SET
+    total_articles = EXCLUDED.total_articles,
+    fake_articles = EXCLUDED.fake_articles,
+    real_articles = EXCLUDED.real_articles,
+    total_users = EXCLUDED.total_users,
+    verified_users = EXCLUDED.verified_users,
+    total_tweets = EXCLUDED.total_tweets,
+    total_retweets = EXCLUDED.total_retweets,
+    updated_at = EXCLUDED.updated_at;
+
+-- ============================================================================
+-- USER ENGAGEMENT PROFILES (read by /api/users/<id>, influencers, user-behavior)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS user_engagement_profile (
+    user_id BIGINT PRIMARY KEY REFERENCES users(user_id),
+    tweet_count INTEGER NOT NULL DEFAULT 0,
+    articles_shared INTEGER NOT NULL DEFAULT 0,
+    fake_tweets INTEGER NOT NULL DEFAULT 0,
+    real_tweets INTEGER NOT NULL DEFAULT 0,
+    total_retweets BIGINT NOT NULL DEFAULT 0,
+    fake_retweets BIGINT NOT NULL DEFAULT 0,
+    real_retweets BIGINT NOT NULL DEFAULT 0,
+    first_activity TIMESTAMP,
+    last_activity TIMESTAMP
+);
+
+-- Fold each batch of inserted tweets into the authors' profiles. An article only
+-- counts towards articles_shared if the user had no earlier tweet about it.
+CREATE OR REPLACE FUNCTION apply_user_profile_delta() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO user_engagement_profile AS p (
+        user_id, tweet_count, articles_shared, fake_tweets, real_tweets,
+        total_retweets, fake_retweets, real_retweets, first_activity, last_activity
+    )
+    SELECT n.user_id,
+           COUNT(*),
+           COUNT(DISTINCT n.article_id) FILTER (WHERE NOT EXISTS (
+               SELECT 1 FROM tweet t
+               WHERE t.user_id = n.user_id AND t.article_id = n.article_id
+                 AND NOT EXISTS (SELECT 1 FROM new_rows r WHERE r.tweet_id = t.tweet_id)
+           )),
+           COUNT(*) FILTER (WHERE na.label = 'fake'),
+           COUNT(*) FILTER (WHERE na.label = 'real'),
+           COALESCE(SUM(n.retweet_count), 0),
+           COALESCE(SUM(n.retweet_count) FILTER (WHERE na.label = 'fake'), 0),
+           COALESCE(SUM(n.retweet_count) FILTER (WHERE na.label = 'real'), 0),
+           MIN(n.created_at),
+           MAX(n.created_at)
+    FROM new_rows n
+    LEFT JOIN news_article na ON na.article_id = n.article_id
+    WHERE n.user_id IS NOT NULL
+    GROUP BY n.user_id
+    ON CONFLICT (user_id) DO UPDATE SET
+        tweet_count = p.tweet_count + EXCLUDED.tweet_count,
+        articles_shared = p.articles_shared + EXCLUDED.articles_shared,
+        fake_tweets = p.fake_tweets + EXCLUDED.fake_tweets,
+        real_tweets = p.real_tweets + EXCLUDED.real_tweets,
+        total_retweets = p.total_retweets + EXCLUDED.total_retweets,
+        fake_retweets = p.fake_retweets + EXCLUDED.fake_retweets,
+        real_retweets = p.real_retweets + EXCLUDED.real_retweets,
+        first_activity = LEAST(p.first_activity, EXCLUDED.first_activity),
+        last_activity = GREATEST(p.last_activity, EXCLUDED.last_activity);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_user_profile_insert AFTER INSERT ON tweet
+REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION apply_user_profile_delta();
+
+-- Updates and deletes of tweets are not tracked incrementally; rebuild with
+--   python refresh_rollups.py --profiles
+
+-- ============================================================================
+-- HOURLY ENGAGEMENT BUCKETS (read by /operational/viral-content, app/viral.py)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS article_engagement_hourly (
+    article_id VARCHAR(50) NOT NULL,
+    hour TIMESTAMP NOT NULL,
+    tweet_count INTEGER NOT NULL DEFAULT 0,
+    total_retweets BIGINT NOT NULL DEFAULT 0,
+    total_favorites BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (article_id, hour)
+);
+CREATE INDEX IF NOT EXISTS ix_article_engagement_hourly_hour ON article_engagement_hourly(hour);
+
+-- Add each statement's tweets to their buckets and take back the old values of
+-- updated or deleted tweets, so growing retweet counts move the scores
+CREATE OR REPLACE FUNCTION apply_engagement_bucket_delta() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO article_engagement_hourly AS b (article_id, hour, tweet_count, total_retweets, total_favorites)
+        SELECT article_id, DATE_TRUNC('hour', created_at), COUNT(*),
+               COALESCE(SUM(retweet_count), 0), COALESCE(SUM(favorite_count), 0)
+        FROM new_rows
+        WHERE article_id IS NOT NULL AND created_at >= NOW() - INTERVAL '8 days'
+        GROUP BY article_id, DATE_TRUNC('hour', created_at)
+        ON CONFLICT (article_id, hour) DO UPDATE SET
+            tweet_count = b.tweet_count + EXCLUDED.tweet_count,
+            total_retweets = b.total_retweets + EXCLUDED.total_retweets,
+            total_favorites = b.total_favorites + EXCLUDED.total_favorites;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE article_engagement_hourly b SET
+            tweet_count = b.tweet_count - d.total,
+            total_retweets = b.total_retweets - d.retweet_sum,
+            total_favorites = b.total_favorites - d.favorite_sum
+        FROM (SELECT article_id, DATE_TRUNC('hour', created_at) AS hour, COUNT(*) AS total,
+                     COALESCE(SUM(retweet_count), 0) AS retweet_sum,
+                     COALESCE(SUM(favorite_count), 0) AS favorite_sum
+              FROM old_rows
+              WHERE article_id IS NOT NULL
+              GROUP BY article_id, DATE_TRUNC('hour', created_at)) d
+        WHERE b.article_id = d.article_id AND b.hour = d.hour;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER trg_engagement_buckets_insert AFTER INSERT ON tweet
+REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION apply_engagement_bucket_delta();
+CREATE OR REPLACE TRIGGER trg_engagement_buckets_update AFTER UPDATE ON tweet
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION apply_engagement_bucket_delta();
+CREATE OR REPLACE TRIGGER trg_engagement_buckets_delete AFTER DELETE ON tweet
+REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION apply_engagement_bucket_delta();
+
+-- Backfill and prune old buckets with: python refresh_rollups.py
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic tweets and retweets with NumPy and load them with COPY
+Use --tweets to build large load-test datasets (e.g. --tweets 10000000)
+"""
+
+import argparse
+from app.pool import get_db_connection
+from app.engagement import ENGAGEMENT_PROFILES, generate_engagement
+from app.counters import refresh_dashboard_counters
+from app.cache import invalidate_cache
+
+def run_profile(profile, seed=None, total=None):
+    """Generate one profile's engagement, then re-sync the counters and caches"""
+    conn = get_db_connection()
+    try:
+        print(f"Generating '{profile}' engagement...")
+        tweets, retweets = generate_engagement(conn, profile, seed=seed, total=total)
+        
+        cur = conn.cursor()
+        refresh_dashboard_counters(cur)
+        conn.commit()
+        cur.close()
+        invalidate_cache()
+    finally:
+        conn.close()
+    
+    print(f"\nCreated {tweets} tweets and {retweets} retweets!")
+    return tweets, retweets
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--profile', choices=list(ENGAGEMENT_PROFILES), default='baseline',
+                        help='Engagement distribution to sample from (default: baseline)')
+    parser.add_argument('--tweets', type=int, default=None,
+                        help="Generate exactly N tweets instead of the profile's per-article counts")
+    parser.add_argument('--seed', type=int, default=None, help='Seed for reproducible datasets')
+    args = parser.parse_args()
+    
+    run_profile(args.profile, seed=args.seed, total=args.tweets)
+
+if __name__ == "__main__":
+    main()
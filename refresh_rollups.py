@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Refresh the analytical rollup tables and the hourly viral-content buckets
+Run periodically (e.g. hourly from cron); use --full after backfilling old data
+and --profiles to rebuild the user engagement profiles. --velocity-only just folds
+new tweets and retweets into the engagement velocity rates, cheap enough for cron
+every few minutes
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from app import create_app
+from app.cache import invalidate_cache
+from app.rollups import refresh_rollups
+from app.profiles import refresh_user_profiles
+from app.viral import refresh_engagement_buckets
+from app.velocity import refresh_velocity
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=2,
+                        help='Rebuild rollups touched by activity in the last N days (default: 2)')
+    parser.add_argument('--full', action='store_true', help='Rebuild every rollup from scratch')
+    parser.add_argument('--profiles', action='store_true', help='Also rebuild user engagement profiles')
+    parser.add_argument('--velocity-only', action='store_true',
+                        help='Only update the engagement velocity rates')
+    args = parser.parse_args()
+    
+    since = None if args.full else (datetime.utcnow() - timedelta(days=args.days)).date()
+    
+    app = create_app()
+    if args.velocity_only:
+        with app.app_context():
+            articles = refresh_velocity()
+        invalidate_cache()
+        print(f"Updated engagement velocity for {articles} article(s)")
+        return
+    
+    with app.app_context():
+        started = datetime.utcnow()
+        days = refresh_rollups(since)
+        # The buckets only span the longest viral window; this also prunes older ones
+        refresh_engagement_buckets(None if args.full else datetime.utcnow() - timedelta(days=args.days))
+        refresh_velocity()
+        if args.profiles:
+            refresh_user_profiles()
+        elapsed = (datetime.utcnow() - started).total_seconds()
+    
+    invalidate_cache()
+    if days is None:
+        print(f"Rebuilt all rollups in {elapsed:.2f}s")
+    else:
+        print(f"Refreshed rollups for {days} day(s) since {since} in {elapsed:.2f}s")
+    if args.profiles:
+        print("Rebuilt user engagement profiles")
+
+if __name__ == "__main__":
+    main()
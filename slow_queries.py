@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Report on the slow query log (enable it with SLOW_QUERY_LOG=true)
+Lists the top offenders by captured time, plans that sequentially scan tweet,
+retweet or news_article, and indexes from create_tables.sql that are never used
+"""
+
+import argparse
+import os
+from app import create_app
+from app.slowlog import top_offenders, seq_scan_offenders, unused_indexes
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'project 1+2 deliverables', 'create_tables.sql')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--limit', type=int, default=20, help='Number of top offenders to list')
+    parser.add_argument('--schema', default=SCHEMA_FILE, help='Schema file whose indexes are checked')
+    args = parser.parse_args()
+    
+    app = create_app()
+    with app.app_context():
+        print("Top offenders (by total captured time):")
+        for fp, captures, avg_ms, max_ms, route, sql in top_offenders(args.limit):
+            print(f"- {fp} x{captures} avg {avg_ms:.1f}ms max {max_ms:.1f}ms {route or ''}")
+            print(f"    {sql[:300]}")
+        
+        print("\nSequential scans on large tables:")
+        offenders = seq_scan_offenders()
+        if not offenders:
+            print("- none captured")
+        for table, entries in sorted(offenders.items()):
+            print(f"- {table}:")
+            for fp, max_ms, sql in entries:
+                print(f"    {fp} max {max_ms:.1f}ms  {sql[:200]}")
+        
+        print(f"\nUnused indexes from {os.path.basename(args.schema)}:")
+        unused = unused_indexes(args.schema)
+        if not unused:
+            print("- none")
+        for index, table, scans in unused:
+            print(f"- {index} on {table}" + (f" (idx_scan = {scans})" if scans is not None else ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Write a Parquet snapshot of articles, tweets, retweets and users partitioned by
+label and month; only partitions that changed since the last run are rewritten
+"""
+
+import argparse
+from app import create_app
+from app.snapshots import SNAPSHOT_TABLES, write_snapshot
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--out', help='Snapshot directory (default: SNAPSHOT_DIR)')
+    parser.add_argument('--tables', nargs='+', choices=list(SNAPSHOT_TABLES),
+                        help='Tables to snapshot (default: all)')
+    parser.add_argument('--full', action='store_true', help='Rewrite every partition')
+    args = parser.parse_args()
+    
+    app = create_app()
+    with app.app_context():
+        summary = write_snapshot(args.out or app.config['SNAPSHOT_DIR'], args.tables, full=args.full)
+    
+    print(f"Snapshot {summary['snapshot_id']}")
+    for table, counts in summary['tables'].items():
+        print(f"  {table}: {counts['written']} written, {counts['unchanged']} unchanged, "
+              f"{counts['removed']} removed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Check that API endpoints issue a fixed number of queries regardless of page size
+"""
+
+from app.counters import refresh_dashboard_counters
+from app.database import db
+
+def test_articles_query_count_is_constant(client, count_queries):
+    counts = {}
+    for per_page in (5, 20, 40):
+        with count_queries() as statements:
+            response = client.get(f'/api/articles?per_page={per_page}')
+        assert response.status_code == 200
+        assert len(response.get_json()['articles']) == per_page
+        counts[per_page] = len(statements)
+    
+    assert len(set(counts.values())) == 1, counts
+
+def test_articles_include_source_and_categories(client):
+    response = client.get('/api/articles?per_page=3')
+    article = response.get_json()['articles'][0]
+    
+    assert article['article_id'] == 'article_0'
+    assert article['source'] == 'gossipcop'
+    assert article['categories'] == ['entertainment', 'politics']
+
+def test_articles_category_filter(client, count_queries):
+    with count_queries() as statements:
+        response = client.get('/api/articles?per_page=40&category_id=3')
+    articles = response.get_json()['articles']
+    
+    assert articles
+    assert all('health' in article['categories'] for article in articles)
+    assert len(statements) == 3
+
+def test_articles_cursor_pagination_walks_all_rows(client):
+    seen = []
+    response = client.get('/api/articles?per_page=15&after=&include_total=false').get_json()
+    assert response['total'] is None
+    assert response['prev_cursor'] is None
+    while True:
+        seen.extend(article['article_id'] for article in response['articles'])
+        if not response['next_cursor']:
+            break
+        response = client.get(f"/api/articles?per_page=15&after={response['next_cursor']}").get_json()
+    
+    assert seen == [f'article_{i}' for i in range(40)]
+    assert response['total'] == 40
+
+def test_articles_cursor_prev_returns_previous_page(client):
+    first = client.get('/api/articles?per_page=10&after=').get_json()
+    second = client.get(f"/api/articles?per_page=10&after={first['next_cursor']}").get_json()
+    back = client.get(f"/api/articles?per_page=10&before={second['prev_cursor']}").get_json()
+    
+    assert back['articles'] == first['articles']
+    assert back['next_cursor'] is not None
+
+def test_articles_invalid_cursor(client):
+    response = client.get('/api/articles?after=not-a-cursor')
+    assert response.status_code == 400
+
+def test_overview_stats_single_query(app, client, count_queries):
+    with count_queries() as statements:
+        fallback = client.get('/api/stats/overview').get_json()
+    assert len(statements) == 2  # counters lookup misses, then one aggregate scan
+    
+    with db.engine.begin() as conn:
+        refresh_dashboard_counters(conn.connection.cursor())
+    
+    with count_queries() as statements:
+        stored = client.get('/api/stats/overview').get_json()
+    assert len(statements) == 1
+    
+    assert stored == fallback
+    assert stored['articles'] == {'total': 40, 'fake': 14, 'real': 26, 'fake_percentage': 35.0}
+    assert stored['users']['verified'] == 2
+    assert stored['engagement']['total_tweets'] == 80
+
+def test_article_detail_query_count(client, count_queries):
+    with count_queries() as statements:
+        detail = client.get('/api/articles/article_3').get_json()
+    
+    assert len(statements) == 3
+    assert detail['source']['source_name'] == 'politifact'
+    assert detail['engagement'] == {'tweet_count': 2, 'total_retweets': 7, 'total_favorites': 13}
+    assert [t['retweet_count'] for t in detail['top_tweets']] == [4, 3]
+    assert detail['top_tweets'][0]['username'] == 'user_5'
+    assert client.get('/api/articles/missing').status_code == 404
+
+def test_article_batch_matches_detail(client, count_queries):
+    ids = [f'article_{i}' for i in range(30)] + ['missing']
+    with count_queries() as statements:
+        batch = client.get('/api/articles/batch?ids=' + ','.join(ids)).get_json()
+    
+    assert len(statements) == 3
+    assert [a['article_id'] for a in batch['articles']] == ids[:30]
+    assert batch['articles'][3] == client.get('/api/articles/article_3').get_json()
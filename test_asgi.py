@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Check the ASGI serving mode against the synchronous app
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+from flask import request
+
+from app.asgi import AsyncDashboard, async_database_url
+from conftest import TestConfig
+
+DASHBOARD_CALLS = ['/api/stats/overview', '/operational/viral-content?hours=24',
+                   '/operational/influencers', '/operational/source-credibility',
+                   '/operational/category-distribution?hours=24']
+
+@pytest.fixture
+def config_class(tmp_path):
+    # The async engine needs a database it can share with the seeding session
+    class Config(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "dashboard.db"}'
+        CACHE_INVALIDATION_FILE = str(tmp_path / 'cache.stamp')
+    return Config
+
+@pytest.fixture
+def asgi(app):
+    dashboard = AsyncDashboard(app)
+    yield dashboard
+    asyncio.run(dashboard.engine.dispose())
+    dashboard.executor.shutdown()
+
+async def call(asgi, url, disconnect_after=None, method='GET'):
+    """(status, headers, body) for a GET; streams are cut off after `disconnect_after` body messages"""
+    path, _, query = url.partition('?')
+    messages = []
+    requested = []
+    done = asyncio.Event()
+
+    async def receive():
+        if not requested:
+            requested.append(True)
+            return {'type': 'http.request', 'body': b''}
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+        if disconnect_after is not None and len(messages) > disconnect_after:
+            done.set()
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(),
+             'headers': [], 'http_version': '1.1', 'root_path': ''}
+    await asyncio.wait_for(asgi(scope, receive, send), 10)
+    return (messages[0]['status'], dict(messages[0]['headers']),
+            b''.join(message.get('body', b'') for message in messages[1:]))
+
+def test_async_database_url():
+    assert async_database_url('postgresql://u:p@db:5432/news').drivername == 'postgresql+asyncpg'
+    assert async_database_url('sqlite:///dashboard.db').drivername == 'sqlite+aiosqlite'
+
+def test_dashboard_calls_run_concurrently_in_one_loop(app, client, asgi):
+    events = []
+    app.before_request(lambda: events.append('start'))
+    app.teardown_request(lambda exc: events.append('end'))
+    expected = [client.get(url).get_json() for url in DASHBOARD_CALLS]
+    events.clear()
+
+    async def load_dashboard():
+        return await asyncio.gather(*(call(asgi, url) for url in DASHBOARD_CALLS))
+
+    responses = asyncio.run(load_dashboard())
+
+    assert [json.loads(body) for _, _, body in responses] == expected
+    assert all(status == 200 for status, _, _ in responses)
+    # Every request started before the first one finished
+    assert events[:len(DASHBOARD_CALLS)] == ['start'] * len(DASHBOARD_CALLS)
+    assert b'queries' in responses[0][1][b'server-timing']
+
+def test_identical_requests_share_one_execution(app, asgi):
+    paths = []
+    app.before_request(lambda: paths.append(request.path))
+
+    async def burst():
+        return await asyncio.gather(*(call(asgi, '/operational/influencers') for _ in range(10)))
+
+    bodies = {body for _, _, body in asyncio.run(burst())}
+    assert len(bodies) == 1
+    assert paths == ['/operational/influencers']
+
+def test_head_joins_the_get_without_blocking_the_loop(app, asgi):
+    paths = []
+    app.before_request(lambda: paths.append(request.path))
+    url = '/operational/influencers'
+
+    async def burst():
+        return await asyncio.gather(call(asgi, url), call(asgi, url, method='HEAD'),
+                                    call(asgi, url), call(asgi, url, method='HEAD'))
+
+    (status, _, body), (head_status, head_headers, head_body), *_ = asyncio.run(burst())
+    assert status == head_status == 200
+    assert body and head_body == b''
+    assert head_headers[b'content-length'] == str(len(body)).encode()
+    assert paths == [url]
+
+def test_other_routes_stream_from_the_thread_pool(client, asgi):
+    expected = client.get('/api/export/articles.ndjson?label=fake').get_data()
+    status, headers, body = asyncio.run(call(asgi, '/api/export/articles.ndjson?label=fake'))
+
+    assert status == 200
+    assert headers[b'content-type'] == b'application/x-ndjson'
+    assert body == expected
+    assert asyncio.run(call(asgi, '/no-such-page'))[0] == 404
+    assert asyncio.run(call(asgi, '/operational/live?sort=newest'))[0] == 400
+
+def test_analytical_views_run_on_the_thread_pool(app, client, asgi):
+    threads = []
+    app.before_request(lambda: threads.append(threading.current_thread().name))
+    expected = client.get('/analytical/user-behavior').get_json()
+    threads.clear()
+
+    status, _, body = asyncio.run(call(asgi, '/analytical/user-behavior'))
+    assert status == 200
+    assert json.loads(body) == expected
+    assert threads[0].startswith('wsgi')
+
+def test_live_feed_streams_without_a_thread(asgi):
+    status, headers, body = asyncio.run(call(asgi, '/operational/live?hours=24', disconnect_after=4))
+
+    assert status == 200
+    assert headers[b'content-type'].startswith(b'text/event-stream')
+    events = {line.split(b': ', 1)[1] for line in body.split(b'\n') if line.startswith(b'event: ')}
+    assert events == {b'overview', b'viral', b'categories'}
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Check the regression rules of the endpoint benchmark harness
+"""
+
+import pytest
+
+from app import create_app
+from app.database import db
+from app.rollups import refresh_rollups
+from benchmark_endpoints import (_percentile, _route_urls, benchmark_routes, compare, failures, seed_database,
+                                 unsupported_endpoints)
+
+@pytest.fixture
+def bench_app(config_class):
+    class Config(config_class):
+        TESTING = False  # failing routes answer 500 instead of raising
+    app = create_app(Config)
+    app.logger.disabled = True
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+def result(p95, queries=2, status=200):
+    return {'p95_ms': p95, 'queries': queries, 'status': status}
+
+def test_percentile_picks_nearest_rank():
+    samples = list(range(1, 101))
+    assert _percentile(samples, 50) == 51
+    assert _percentile(samples, 99) == 99
+    assert _percentile([5.0], 95) == 5.0
+
+def test_compare_flags_slowdowns_extra_queries_and_status_changes():
+    baseline = {'1': {'/a': result(10), '/b': result(10), '/c': result(10), '/d': result(10)}}
+    current = {'1': {'/a': result(14), '/b': result(20), '/c': result(10, queries=3),
+                     '/d': result(10, status=500), '/new': result(99)}}
+    
+    regressions = compare(current, baseline, tolerance=0.5, slack_ms=0)
+    assert len(regressions) == 3
+    assert not any('/a' in r or '/new' in r for r in regressions)
+
+def test_failures_lists_every_non_200_route():
+    assert failures({'1': {'/a': result(10), '/b': result(10, status=500)}}) == ['scale 1 /b: status 500']
+
+@pytest.mark.parametrize('rollups', [False, True])
+def test_every_benchmarked_route_answers_200(bench_app, rollups):
+    ids = seed_database(0.05, seed=1)
+    if rollups:
+        refresh_rollups()
+    skipped = unsupported_endpoints(db.engine.dialect.name, rollups)
+    
+    results = benchmark_routes(bench_app, bench_app.test_client(), ids, iterations=1, warmup=0, skipped=skipped)
+    assert {result['endpoint'] for result in results.values()} == {
+        endpoint for endpoint, _ in _route_urls(bench_app, ids)} - skipped
+    assert failures({'0.05': results}) == []
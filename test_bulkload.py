@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Check the CSV stream that feeds COPY in the bulk loader
+"""
+
+import csv
+import io
+from datetime import datetime
+
+from app.bulkload import BulkLoader, CsvStream, NULL, article_rows
+
+def test_csv_stream_keeps_null_and_empty_string_apart():
+    rows = [(1, None, '', 'say "hi", ok', datetime(2024, 1, 2, 3, 4, 5), True)]
+    data = CsvStream(rows).read().decode('utf-8')
+    
+    assert data == '1,\\N,,"say ""hi"", ok",2024-01-02 03:04:05,True\n'
+    assert next(csv.reader(io.StringIO(data)))[1] == NULL
+
+def test_csv_stream_reads_in_small_chunks():
+    rows = [(i, f'title {i}') for i in range(1000)]
+    stream = CsvStream(rows)
+    chunks = []
+    while True:
+        chunk = stream.read(100)
+        if not chunk:
+            break
+        assert len(chunk) <= 100
+        chunks.append(chunk)
+    
+    assert stream.count == 1000
+    assert len(list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8'))))) == 1000
+
+def test_article_rows_skip_incomplete_and_number_from_start(tmp_path):
+    path = tmp_path / 'politifact_fake.csv'
+    path.write_text('id,news_url,title\n1,http://a,First\n2,,Missing url\n3,http://c,Third\n')
+    
+    rows = list(article_rows(str(path), 'fake', 2, 1, 'politifact', 10))
+    assert [row[0] for row in rows] == ['politifact_11', 'politifact_12']
+    assert rows[0][6] is None  # no content column
+
+class RecordingCursor:
+    def __init__(self, statements):
+        self.statements = statements
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def execute(self, sql):
+        self.statements.append(sql)
+    
+    def copy_expert(self, sql, stream):
+        self.statements.append(sql)
+        while stream.read():
+            pass
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+    
+    def cursor(self):
+        return RecordingCursor(self.statements)
+
+def test_staging_tables_are_dropped_on_commit():
+    conn = RecordingConnection()
+    loader = BulkLoader(conn)
+    
+    assert loader.stage('stage_a', [('id', 'INTEGER')], [(1,), (2,)]) == 2
+    loader.stage('stage_b', ['tweet_id'], [(1,)], like='tweet')
+    
+    creates = [sql for sql in conn.statements if sql.startswith('CREATE TEMP TABLE')]
+    assert len(creates) == 2
+    assert all('ON COMMIT DROP' in sql for sql in creates)
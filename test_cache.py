@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Check the response cache: keys, LRU bounds, hit/miss counting and invalidation
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from werkzeug.datastructures import MultiDict
+from app.cache import LRUCache, ResponseCache, cache_key, invalidate_cache
+
+@pytest.fixture
+def config_class(config_class):
+    class Config(config_class):
+        CACHE_TYPE = 'simple'
+    return Config
+
+def test_cache_key_normalizes_params():
+    assert cache_key('/x', MultiDict([('b', '2'), ('a', '1'), ('label', '')])) == '/x?a=1&b=2'
+    assert cache_key('/x', MultiDict()) == '/x'
+
+def test_lru_cache_bounds_and_expiry():
+    lru = LRUCache(max_entries=2)
+    lru.set('a', 1, 60)
+    lru.set('b', 2, 60)
+    lru.get('a')
+    lru.set('c', 3, 60)
+    
+    assert lru.get('b') is None
+    assert lru.get('a') == 1
+    lru.set('d', 4, -1)
+    assert lru.get('d') is None
+
+def test_overview_is_cached_until_invalidated(app, client, config_class, count_queries):
+    first = client.get('/api/stats/overview')
+    assert first.headers['X-Cache'] == 'MISS'
+    
+    with count_queries() as statements:
+        second = client.get('/api/stats/overview')
+    assert second.headers['X-Cache'] == 'HIT'
+    assert statements == []
+    assert second.get_json() == first.get_json()
+    
+    invalidate_cache(config_class)
+    assert client.get('/api/stats/overview').headers['X-Cache'] == 'MISS'
+    
+    stats = client.get('/api/cache/stats').get_json()
+    assert stats['backend'] == 'LRUCache'
+    assert stats['entries'] == 1
+
+def test_hit_and_miss_counts_are_exact_across_threads(app):
+    counter = ResponseCache(app)
+    view = counter.cached()(lambda: {'ok': True})
+    
+    def request(i):
+        with app.test_request_context(f'/counted?n={i % 10}'):
+            view()
+    
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(request, range(2000)))
+    
+    with app.app_context():
+        stats = counter.stats()
+    assert stats['hits'] + stats['misses'] == 2000
+    assert stats['misses'] >= 10
+
+def test_bypass_neither_reads_nor_fills_the_cache(app):
+    responses = ResponseCache(app)
+    calls = []
+    view = responses.cached()(lambda: calls.append(1) or {'calls': len(calls)})
+    
+    with app.test_request_context('/bypassed'), responses.bypass():
+        assert view() == {'calls': 1}
+    with app.test_request_context('/bypassed'):
+        assert view().headers['X-Cache'] == 'MISS'
+    with app.test_request_context('/bypassed'), responses.bypass():
+        assert view() == {'calls': 3}
+    assert len(calls) == 3
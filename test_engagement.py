@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Check the vectorized synthetic engagement generator
+"""
+
+import numpy as np
+
+from app.engagement import ENGAGEMENT_PROFILES, generate_batches
+
+ARTICLES = [f'article_{i}' for i in range(50)]
+LABELS = ['fake' if i % 3 == 0 else 'real' for i in range(50)]
+USERS = list(range(1, 101))
+
+def generate(profile, **kwargs):
+    rng = np.random.default_rng(7)
+    return list(generate_batches(ENGAGEMENT_PROFILES[profile], ARTICLES, LABELS, USERS, USERS, rng,
+                                 1000, np.datetime64('2024-06-01T12:00:00'), **kwargs))
+
+def test_tweet_ids_are_a_contiguous_range_across_batches():
+    batches = generate('baseline', total=2500, batch_size=1000)
+    
+    ids = np.concatenate([tweets['tweet_id'] for tweets, _ in batches])
+    assert [len(tweets['tweet_id']) for tweets, _ in batches] == [1000, 1000, 500]
+    assert (ids == np.arange(1000, 3500)).all()
+
+def test_retweets_are_unique_and_never_by_the_author():
+    tweets, retweets = generate('recent')[0]
+    
+    pairs = set(zip(retweets['tweet_id'].tolist(), retweets['user_id'].tolist()))
+    assert len(pairs) == len(retweets['tweet_id'])
+    authors = dict(zip(tweets['tweet_id'].tolist(), tweets['user_id'].tolist()))
+    assert all(authors[tweet_id] != user_id for tweet_id, user_id in pairs)
+    posted = dict(zip(tweets['tweet_id'].tolist(), tweets['created_at'].tolist()))
+    assert all(retweeted_at >= posted[tweet_id]
+               for tweet_id, retweeted_at in zip(retweets['tweet_id'].tolist(), retweets['retweeted_at'].tolist()))
+
+def test_verified_profile_engagement_depends_on_label():
+    tweets, _ = generate('verified')[0]
+    
+    fake = np.isin(tweets['article_id'], [a for a, l in zip(ARTICLES, LABELS) if l == 'fake'])
+    assert tweets['retweet_count'][fake].max() <= 100
+    assert tweets['retweet_count'][~fake].min() >= 50
+    assert all('FactCheck' in text or 'fact' in text or 'misleading' in text or 'Media' in text
+               for text in tweets['content'][fake])
+    assert len(tweets['tweet_id']) >= 10 * len(USERS)
+
+def test_same_seed_gives_same_dataset():
+    first, again = generate('baseline')[0][0], generate('baseline')[0][0]
+    assert all((first[name] == again[name]).all() for name in first)
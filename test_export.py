@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Check the streaming NDJSON/CSV export endpoints
+"""
+
+import csv
+import io
+import json
+
+def test_export_articles_ndjson(client):
+    response = client.get('/api/export/articles.ndjson')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(rows) == 40
+    assert rows[0]['article_id'] == 'article_0'
+    assert rows[0]['source_name'] == 'gossipcop'
+
+def test_export_articles_csv_with_filters(client):
+    response = client.get('/api/export/articles.csv?label=fake&category_id=1')
+    assert response.mimetype == 'text/csv'
+    
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert rows
+    assert all(row['label'] == 'fake' for row in rows)
+    # Category 1 is assigned to articles with i % 3 in (0, 2); fake ones have i % 3 == 0
+    assert len(rows) == 14
+
+def test_export_tweets_and_users_follow_article_filters(client):
+    tweets = client.get('/api/export/tweets.ndjson?source_id=1').get_data(as_text=True).splitlines()
+    assert len(tweets) == 40
+    
+    users = client.get('/api/export/users.csv?label=fake').get_data(as_text=True).splitlines()
+    assert users[0].startswith('user_id,username')
+    assert len(users) == 11
+
+def test_export_unknown_entity_or_format(client):
+    assert client.get('/api/export/retweets.csv').status_code == 404
+    assert client.get('/api/export/articles.xml').status_code == 404
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Check the chunk parsing and tweet synthesis of the parallel LIAR import
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import import_liar_data
+from import_liar_data import bounded_map, init_worker, parse_chunk, read_chunks
+
+LINES = [
+    "1\tfalse\tThe sky is green on Tuesdays\tscience\tBob\tanchor\tTX\tnone\n",
+    "2\ttrue\tshort\n",
+    "3\tmostly-true\tTaxes went down last year\n",
+]
+ROWS = [line.rstrip('\n').split('\t') for line in LINES]
+
+def test_parse_chunk_skips_short_statements_and_maps_labels():
+    init_worker([1, 2, 3])
+    filename, index, articles, tweets, retweets = parse_chunk(('train.tsv', 4, ROWS))
+    
+    assert (filename, index) == ('train.tsv', 4)
+    assert [(a[0], a[3]) for a in articles] == [('liar_1', 'fake'), ('liar_3', 'real')]
+    assert articles[0][5].endswith('Party: none')
+    assert all(tweet[2] in ('liar_1', 'liar_3') for tweet in tweets)
+    assert all(retweet[1] != author for retweet in retweets
+               for tweet_id, author, *_ in tweets if tweet_id == retweet[0])
+    # Chunk-local ids, shifted above MAX(tweet_id) when the chunk is loaded
+    assert [tweet[0] for tweet in tweets] == list(range(len(tweets)))
+
+def test_parse_chunk_is_deterministic_per_chunk():
+    init_worker(list(range(1, 101)))
+    first = parse_chunk(('train.tsv', 0, ROWS * 100))
+    again = parse_chunk(('train.tsv', 0, ROWS * 100))
+    
+    assert [t[:2] for t in first[3]] == [t[:2] for t in again[3]]
+
+def test_read_chunks_skips_checkpointed_chunks(tmp_path):
+    path = tmp_path / 'valid.tsv'
+    path.write_text(''.join(LINES * 2000))
+    
+    chunks = list(read_chunks(str(path), 'valid.tsv', done={('valid.tsv', 1)}))
+    assert [chunk[1] for chunk in chunks] == [0, 2]
+    assert sum(len(chunk[2]) for chunk in chunks) == 6000 - 2000
+
+def test_read_chunks_keeps_quoted_multiline_fields_whole(tmp_path, monkeypatch):
+    monkeypatch.setattr(import_liar_data, 'CHUNK_SIZE', 2)
+    path = tmp_path / 'train.tsv'
+    path.write_text('1\tfalse\t"A statement\nover two lines"\n'
+                    '2\ttrue\tAnother statement here\n'
+                    '3\ttrue\tA third statement here\n')
+    
+    chunks = list(read_chunks(str(path), 'train.tsv', done=set()))
+    assert [len(chunk[2]) for chunk in chunks] == [2, 1]
+    assert chunks[0][2][0] == ['1', 'false', 'A statement\nover two lines']
+
+def test_bounded_map_reads_tasks_only_a_little_ahead():
+    read = []
+    
+    def tasks():
+        for i in range(20):
+            read.append(i)
+            yield i
+    
+    with ThreadPoolExecutor(2) as pool:
+        results = bounded_map(pool, lambda x: x * 2, tasks(), 3)
+        assert next(results) == 0
+        assert len(read) == 3
+        assert list(results) == [x * 2 for x in range(1, 20)]
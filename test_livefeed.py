@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Check that the live dashboard feed renders each panel once per tick and pushes only changes
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from app.database import db
+from app.livefeed import live_feed
+from app.models import Tweet
+
+@pytest.fixture
+def config_class(config_class):
+    class LiveFeedConfig(config_class):
+        LIVE_FEED = True
+    return LiveFeedConfig
+
+def drain(subscriber):
+    events = {}
+    while not subscriber.queue.empty():
+        message = subscriber.queue.get_nowait()
+        lines = dict(line.split(': ', 1) for line in message.strip().split('\n'))
+        events[lines['event']] = json.loads(lines['data'])
+    return events
+
+def test_subscribers_share_one_render_per_panel(app, count_queries):
+    subscribers = [live_feed.subscribe((24, None, 'score')) for _ in range(50)]
+    other = live_feed.subscribe((6, 'fake', 'score'))
+    try:
+        with count_queries() as statements:
+            assert live_feed.tick() == 5  # overview plus two viral and two category panels
+        shared = len(statements)
+
+        received = [drain(subscriber) for subscriber in subscribers]
+        assert all(events == received[0] for events in received)
+        assert set(received[0]) == {'overview', 'viral', 'categories'}
+        assert all(a['label'] == 'fake' for a in drain(other)['viral'])
+
+        # Nothing changed, so only the overview counters are read and nothing is pushed
+        with count_queries() as statements:
+            assert live_feed.tick() == 0
+        assert len(statements) < shared
+        assert drain(subscribers[0]) == {}
+
+        db.session.add(Tweet(tweet_id=500, article_id='article_20', user_id=1, retweet_count=5000,
+                             favorite_count=0, created_at=datetime.utcnow()))
+        db.session.commit()
+        live_feed.tick()
+
+        events = drain(subscribers[0])
+        assert set(events) == {'overview', 'viral'}
+        assert events['viral'][0]['article_id'] == 'article_20'
+        assert events['overview']['engagement']['total_tweets'] == 81
+    finally:
+        for subscriber in subscribers + [other]:
+            live_feed.unsubscribe(subscriber)
+
+def test_stream_pushes_panels(app, client):
+    response = client.get('/operational/live?hours=24&label=real', buffered=False)
+    assert response.mimetype == 'text/event-stream'
+
+    chunks = (chunk.decode() for chunk in response.response)
+    assert next(chunks).startswith('retry:')
+    events = {}
+    while len(events) < 3:
+        message = next(chunks)
+        if message.startswith('id:'):
+            lines = dict(line.split(': ', 1) for line in message.strip().split('\n'))
+            events[lines['event']] = json.loads(lines['data'])
+    response.close()
+
+    assert all(a['label'] == 'real' for a in events['viral'])
+    assert events['overview']['articles']['total'] == 40
+    assert live_feed.subscriber_count() == 0
+
+def test_live_feed_rejects_unknown_sort(client):
+    assert client.get('/operational/live?sort=newest').status_code == 400
+
+def test_live_feed_is_off_unless_enabled(app, client):
+    app.config['LIVE_FEED'] = False
+    assert client.get('/operational/live').status_code == 404
+    assert b'const LIVE_FEED = false;' in client.get('/operational').data
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Check the per-route query and latency instrumentation
+"""
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.database import db
+
+def test_server_timing_reports_query_count(client):
+    response = client.get('/api/articles?per_page=5')
+    timing = response.headers['Server-Timing']
+    
+    assert timing.startswith('db;dur=')
+    assert 'desc="3 queries"' in timing
+    assert 'serialize;dur=' in timing and 'total;dur=' in timing
+
+def test_metrics_endpoint_aggregates_per_route(client):
+    client.get('/api/articles/article_1')
+    client.get('/api/articles/article_2')
+    client.get('/api/articles/missing')
+    
+    body = client.get('/metrics').get_data(as_text=True)
+    assert '# TYPE dashboard_requests_total counter' in body
+    assert 'dashboard_requests_total{route="/api/articles/<string:article_id>",method="GET",status="200"} 2' in body
+    assert 'dashboard_requests_total{route="/api/articles/<string:article_id>",method="GET",status="404"} 1' in body
+    assert 'dashboard_db_queries_per_request_max{route="/api/articles/<string:article_id>"} 3' in body
+    assert 'dashboard_slowest_query_seconds{route="/api/articles/<string:article_id>",fingerprint="' in body
+    assert 'statement=' not in body
+
+def test_metrics_snapshot_counts_queries(app, client):
+    client.get('/operational/viral-content')
+    
+    from app.metrics import metrics
+    with app.app_context():
+        stats = metrics.snapshot()['/operational/viral-content']
+    assert stats['requests'] == 1
+    assert stats['queries'] == stats['max_queries'] >= 1
+    assert stats['slowest_query'].startswith('SELECT')
+    assert len(stats['slowest_query_fingerprint']) == 16
+
+def test_metric_values_keep_full_precision(app, client):
+    client.get('/operational/viral-content')
+    with app.app_context():
+        app.extensions['request_metrics']['/operational/viral-content'].duration = 1234567.891
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'dashboard_request_duration_seconds_total{route="/operational/viral-content"} 1234567.891' in body
+    assert 'dashboard_requests_total{route="/operational/viral-content",method="GET",status="200"} 1\n' in body
+
+def test_failed_statements_leave_no_timing_state(app):
+    with app.app_context():
+        with db.engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.exec_driver_sql('SELECT missing_column FROM tweet')
+            assert conn.exec_driver_sql('SELECT COUNT(*) FROM tweet').scalar() > 0
+            assert not any(key.endswith('started') for key in conn.info)
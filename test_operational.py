@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Check the operational dashboard endpoints against the SQLite fixture data
+"""
+
+def test_engagement_table_single_query(client, count_queries):
+    with count_queries() as statements:
+        response = client.get('/operational/engagement?per_page=10&label=fake').get_json()
+    
+    assert len(statements) == 1
+    articles = response['articles']
+    assert [a['article_id'] for a in articles] == [f'article_{i}' for i in range(0, 30, 3)]
+    assert articles[1]['source'] == 'politifact'
+    assert articles[1]['engagement'] == {'tweet_count': 2, 'total_retweets': 7, 'total_favorites': 13}
+
+def test_engagement_table_cursor_and_filters(client):
+    first = client.get('/operational/engagement?per_page=5&category_id=1').get_json()
+    second = client.get(f"/operational/engagement?per_page=5&category_id=1&after={first['next_cursor']}").get_json()
+    back = client.get(f"/operational/engagement?per_page=5&category_id=1&before={second['prev_cursor']}").get_json()
+    
+    assert back['articles'] == first['articles']
+    ids = [a['article_id'] for a in first['articles'] + second['articles']]
+    assert len(set(ids)) == 10
+    assert client.get('/operational/engagement?after=bogus').status_code == 400
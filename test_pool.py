@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Check the pool settings, per-route statement timeouts and the scripts' connection factory
+"""
+
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from app import pool
+from app.pool import QUERY_CANCELED, QueryTimeout, async_engine_options, engine_options, statement_timeout_ms
+from conftest import TestConfig
+
+def settings(url, **overrides):
+    config = {name: getattr(TestConfig, name) for name in dir(TestConfig) if name.isupper()}
+    config.update(SQLALCHEMY_DATABASE_URI=url, **overrides)
+    return config
+
+class QueryCanceled(Exception):
+    pgcode = '57014'
+
+def test_engine_options_apply_to_postgres_only():
+    options = engine_options(settings('postgresql://u:p@db/news', DB_POOL_SIZE=4))
+    assert options['pool_size'] == 4
+    assert options['pool_pre_ping'] is True
+    assert options['pool_recycle'] == TestConfig.DB_POOL_RECYCLE
+    assert engine_options(settings('sqlite://')) == {}
+
+def test_async_options_disable_prepared_statements_behind_pgbouncer():
+    direct = async_engine_options(settings('postgresql://u:p@db/news', ASYNC_POOL_SIZE=7))
+    assert direct['pool_size'] == 7
+    assert 'connect_args' not in direct
+
+    args = async_engine_options(settings('postgresql://u:p@pgbouncer/news', DB_PGBOUNCER=True))['connect_args']
+    assert args['statement_cache_size'] == 0
+    assert args['prepared_statement_cache_size'] == 0
+    assert args['prepared_statement_name_func']() != args['prepared_statement_name_func']()
+
+def test_statement_timeout_by_route_class():
+    config = settings('sqlite://')
+    assert statement_timeout_ms(config, 'operational') == 5000
+    assert statement_timeout_ms(config, 'analytical') == 60000
+    assert statement_timeout_ms(config, None) == config['DEFAULT_STATEMENT_TIMEOUT']
+
+def test_no_statement_timeout_on_sqlite(client, count_queries):
+    with count_queries() as statements:
+        assert client.get('/operational/influencers').status_code == 200
+    assert statements
+    assert not any('statement_timeout' in statement for statement in statements)
+
+def test_cancelled_statements_raise_query_timeout():
+    def context(orig):
+        return SimpleNamespace(original_exception=orig, statement='SELECT pg_sleep(10)', parameters={},
+                               sqlalchemy_exception=OperationalError('SELECT pg_sleep(10)', {}, orig))
+
+    timeout = pool._raise_query_timeouts(context(QueryCanceled()))
+    assert isinstance(timeout, QueryTimeout)
+    assert timeout.orig.pgcode == QUERY_CANCELED
+    assert pool._raise_query_timeouts(context(Exception('server closed the connection'))) is None
+
+def test_cancelled_queries_answer_503(app, client):
+    @app.route('/slow')
+    def slow():
+        raise QueryTimeout('SELECT pg_sleep(10)', {}, QueryCanceled())
+
+    @app.route('/broken')
+    def broken():
+        raise OperationalError('SELECT 1', {}, Exception('server closed the connection'))
+
+    response = client.get('/slow')
+    assert response.status_code == 503
+    assert 'error' in response.get_json()
+    with pytest.raises(OperationalError):
+        client.get('/broken')
+
+def test_scripts_share_one_pool(monkeypatch, tmp_path):
+    monkeypatch.setattr(pool, '_engine', create_engine(f'sqlite:///{tmp_path / "scripts.db"}'))
+    conn = pool.get_db_connection()
+    cur = conn.cursor()
+    cur.execute('SELECT 1')
+    assert cur.fetchone() == (1,)
+    conn.close()
+
+    assert pool.script_engine() is pool._engine
+    assert pool.script_engine().pool.checkedout() == 0
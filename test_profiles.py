@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Check that user engagement profiles agree with the live tweet aggregates
+"""
+
+from app.database import db
+from app.models import UserEngagementProfile
+from app.profiles import refresh_user_profiles
+
+def test_user_detail_single_lookup(app, client, count_queries):
+    live = client.get('/api/users/4').get_json()
+    refresh_user_profiles()
+    
+    with count_queries() as statements:
+        stored = client.get('/api/users/4').get_json()
+    
+    assert len(statements) == 1
+    assert stored == live
+    assert stored['tweets_count'] == 8
+    assert stored['activity']['fake_news_tweets'] + stored['activity']['real_news_tweets'] == 8
+    assert client.get('/api/users/999').status_code == 404
+
+def test_user_detail_ignores_profiles_before_first_refresh(app, client):
+    live = client.get('/api/users/4').get_json()
+    # What the insert trigger leaves for a user's newest tweet before any refresh
+    db.session.add(UserEngagementProfile(user_id=4, tweet_count=1, articles_shared=1, fake_tweets=1,
+                                         real_tweets=0, total_retweets=0, fake_retweets=0,
+                                         real_retweets=0))
+    db.session.commit()
+    
+    assert client.get('/api/users/4').get_json() == live
+
+def test_influencers_and_behavior_match_live_queries(app, client):
+    live_influencers = client.get('/operational/influencers?label=fake').get_json()
+    live_behavior = client.get('/analytical/user-behavior').get_json()
+    refresh_user_profiles()
+    
+    assert client.get('/operational/influencers?label=fake').get_json() == live_influencers
+    stored_behavior = client.get('/analytical/user-behavior').get_json()
+    key = lambda row: (row['user_type'], row['news_type'])
+    assert sorted(stored_behavior, key=key) == sorted(live_behavior, key=key)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Check that the rollup tables match the base tables after full and incremental refreshes
+"""
+
+from datetime import datetime, timedelta
+from app.database import db
+from app.models import (NewsArticle, ArticleCategory, Tweet, ArticleDailyRollup,
+                        CategoryMonthlyRollup)
+from app.rollups import refresh_rollups
+
+def rollup_totals():
+    articles = db.session.query(db.func.sum(ArticleDailyRollup.article_count)).scalar()
+    tweets = db.session.query(db.func.sum(CategoryMonthlyRollup.tweet_count)).scalar()
+    return articles, tweets
+
+def test_full_refresh_matches_base_tables(app):
+    refresh_rollups()
+    
+    # Each article has two categories, so category tweet totals count every tweet twice
+    assert rollup_totals() == (40, 160)
+    assert {row.month.day for row in CategoryMonthlyRollup.query} == {1}
+
+def test_incremental_refresh_picks_up_new_activity(app, client):
+    refresh_rollups()
+    
+    now = datetime.utcnow()
+    db.session.add(NewsArticle(article_id='fresh', url='https://example.com/fresh', title='Fresh',
+                               label='fake', source_id=1, created_at=now))
+    db.session.add(ArticleCategory(article_id='fresh', category_id=1))
+    # A new tweet on an old article changes that article's creation-day rollup
+    db.session.add(Tweet(tweet_id=1000, article_id='article_39', user_id=1, created_at=now,
+                         retweet_count=10, favorite_count=0))
+    db.session.commit()
+    
+    days = refresh_rollups(since=(now - timedelta(days=1)).date())
+    
+    assert days >= 2
+    assert rollup_totals() == (41, 162)
+    
+    trends = client.get('/analytical/temporal-trends?days=30').get_json()
+    assert sum(day['fake'] + day['real'] for day in trends) == 41
+    
+    performance = client.get('/analytical/category-performance?months=6').get_json()
+    assert {row['category'] for row in performance} == {'politics', 'entertainment', 'health'}
+    # One count per article and category, not per tweet
+    assert sum(month['count'] for row in performance for month in row['data'].values()) == 81
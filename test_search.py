@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Check article search: query parsing and the inverted-index fallback used on SQLite
+"""
+
+from sqlalchemy.dialects import postgresql
+
+from app.cache import invalidate_cache
+from app.database import db
+from app.models import NewsArticle, NewsContent
+from app.search import apply_fulltext_search, parse_query, to_tsquery_string
+
+def test_parse_query():
+    clauses = parse_query('Climate "sea level rise" vacc*')
+    
+    assert clauses == [('term', 'climate'), ('phrase', ['sea', 'level', 'rise']), ('prefix', 'vacc')]
+    assert to_tsquery_string(clauses) == 'climate & (sea <-> level <-> rise) & vacc:*'
+
+def test_search_ranks_title_and_content(app, client):
+    db.session.add_all([
+        NewsContent(article_id='article_5', text='The senator denied the vaccine claims.'),
+        NewsContent(article_id='article_7', text='Vaccine vaccine vaccine, said the senator.'),
+        NewsContent(article_id='article_9', text='The vaccination drive continues.'),
+    ])
+    db.session.commit()
+    
+    response = client.get('/api/articles?search=vaccine').get_json()
+    assert [a['article_id'] for a in response['articles']] == ['article_7', 'article_5']
+    
+    response = client.get('/api/articles?search=vacc*').get_json()
+    assert {a['article_id'] for a in response['articles']} == {'article_5', 'article_7', 'article_9'}
+    
+    response = client.get('/api/articles?search="the senator denied"').get_json()
+    assert [a['article_id'] for a in response['articles']] == ['article_5']
+    
+    response = client.get('/api/articles?search="senator the"').get_json()
+    assert response['articles'] == []
+
+def test_search_matches_title_terms(client):
+    response = client.get('/api/articles?search=article 12').get_json()
+    assert [a['article_id'] for a in response['articles']] == ['article_12']
+    assert response['total'] == 1
+
+def test_edited_titles_are_searchable_after_invalidate_cache(app, client, config_class):
+    assert client.get('/api/articles?search=glacier').get_json()['total'] == 0
+    
+    # An edit in place leaves the counts and high-water marks alone
+    db.session.get(NewsArticle, 'article_3').title = 'Glacier retreat'
+    db.session.commit()
+    invalidate_cache(config_class)
+    
+    response = client.get('/api/articles?search=glacier').get_json()
+    assert [a['article_id'] for a in response['articles']] == ['article_3']
+
+def test_fulltext_search_matches_each_table_separately(app):
+    query, _ = apply_fulltext_search(db.session.query(NewsArticle), parse_query('vaccine'))
+    sql = str(query.statement.compile(dialect=postgresql.dialect()))
+    
+    # Each @@ sits in its own branch of the UNION, against one table's indexed expression
+    assert ' OR ' not in sql
+    assert sql.count('@@') == 2
+    assert 'UNION' in sql
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Check that concurrent identical analytical requests share one database execution
+"""
+
+import threading
+import time
+from sqlalchemy import event
+from app.database import db
+from app.singleflight import single_flight
+
+def test_concurrent_requests_share_one_execution(app, client, count_queries):
+    with count_queries() as statements:
+        expected = client.get('/analytical/network-analysis?limit=5').get_json()
+    queries_per_request = len(statements)
+    
+    n = 8
+    key = '/analytical/network-analysis?limit=5'
+    responses = [None] * n
+    
+    def wait_for_followers(*args):
+        # Hold the leader's first query until every other request is waiting on it
+        deadline = time.monotonic() + 5
+        while single_flight.followers(key) < n - 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    
+    def fetch(i):
+        responses[i] = client.get('/analytical/network-analysis?limit=5')
+    
+    with count_queries() as statements:
+        event.listen(db.engine, 'before_cursor_execute', wait_for_followers)
+        try:
+            threads = [threading.Thread(target=fetch, args=(i,)) for i in range(n)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', wait_for_followers)
+    
+    assert len(statements) == queries_per_request
+    assert all(response.status_code == 200 for response in responses)
+    assert all(response.get_json() == expected for response in responses)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Check the opt-in slow query log and its reports
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.database import db
+from app.models import SlowQueryLog
+from app.slowlog import slow_query_log, normalize_sql, fingerprint, plan_summary, seq_scan_offenders, top_offenders, unused_indexes
+
+@pytest.fixture
+def config_class(config_class):
+    class SlowLogConfig(config_class):
+        SLOW_QUERY_LOG = True
+        SLOW_QUERY_THRESHOLD_MS = 0
+    return SlowLogConfig
+
+def test_normalize_sql_strips_literals_and_parameters():
+    a = normalize_sql("SELECT * FROM tweet WHERE user_id = 5 AND label = 'fake' AND id IN (?, ?, ?)")
+    b = normalize_sql("SELECT *  FROM tweet\nWHERE user_id = 12 AND label = 'real' AND id IN (?)")
+    
+    assert a == 'SELECT * FROM tweet WHERE user_id = ? AND label = ? AND id IN (?)'
+    assert fingerprint(a) == fingerprint(b)
+
+def test_plan_summary_reads_postgres_plans():
+    plan = [{'Plan': {'Node Type': 'Hash Join', 'Plans': [
+        {'Node Type': 'Seq Scan', 'Relation Name': 'tweet'},
+        {'Node Type': 'Index Scan', 'Relation Name': 'users', 'Index Name': 'users_pkey'},
+    ]}}]
+    assert plan_summary(plan) == (['tweet'], ['users_pkey'])
+
+def test_slow_queries_are_explained_and_stored(app, client):
+    client.get('/operational/viral-content')
+    client.get('/operational/viral-content?hours=48')
+    slow_query_log.wait()
+    
+    with app.app_context():
+        rows = db.session.query(SlowQueryLog).all()
+        assert rows
+        assert all(row.route and row.plan for row in rows)
+        # Same statement with different parameters is explained once per interval
+        assert len({row.fingerprint for row in rows}) == len(rows)
+        
+        assert top_offenders(5)
+        assert 'news_article' in seq_scan_offenders() or 'tweet' in seq_scan_offenders()
+
+def test_failed_explain_is_stored_and_leaves_the_session_usable(app):
+    with app.app_context():
+        db.session.execute(db.text('SELECT COUNT(*) FROM tweet WHERE user_id = :id'), {'id': 1})
+        slow_query_log._store(db.engine, {'fingerprint': 'broken', 'normalized_sql': 'SELECT ?',
+                                          'route': '/x', 'duration_ms': 1}, 'SELECT missing_column FROM tweet', ())
+        
+        assert 'error' in db.session.query(SlowQueryLog).filter_by(fingerprint='broken').one().plan
+        assert db.session.execute(db.text('SELECT COUNT(*) FROM tweet')).scalar() > 0
+
+def test_response_is_returned_before_the_explain_runs(app, client, monkeypatch):
+    release = threading.Event()
+    explained = []
+    
+    def blocked_explain(engine, cursor, statement, parameters):
+        release.wait(10)
+        explained.append(statement)
+        return []
+    
+    monkeypatch.setattr(slow_query_log, '_explain', blocked_explain)
+    started = time.perf_counter()
+    response = client.get('/operational/source-credibility')
+    
+    assert response.status_code == 200
+    assert time.perf_counter() - started < 5
+    assert explained == []
+    release.set()
+    slow_query_log.wait()
+    assert explained
+
+def test_unused_indexes_lists_indexes_no_plan_used(app, tmp_path):
+    schema = tmp_path / 'schema.sql'
+    schema.write_text("CREATE INDEX idx_never ON tweet(content);\n"
+                      "CREATE INDEX IF NOT EXISTS idx_used ON tweet(user_id);\n")
+    with app.app_context():
+        db.session.add(SlowQueryLog(fingerprint='f', normalized_sql='SELECT ?', duration_ms=1,
+                                    seq_scans='', indexes_used='idx_used'))
+        db.session.commit()
+        
+        assert unused_indexes(str(schema)) == [('idx_never', 'tweet', None)]
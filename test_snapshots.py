@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Check the partitioned Parquet snapshots and their incremental manifest
+"""
+
+import os
+
+import pyarrow.parquet as pq
+
+from app.database import db
+from app.models import Tweet, User
+from app import snapshots
+from app.snapshots import load_manifest, write_snapshot
+
+def test_snapshot_partitions_by_label_and_month(app, tmp_path):
+    with app.app_context():
+        summary = write_snapshot(str(tmp_path))
+    
+    manifest = load_manifest(str(tmp_path))
+    articles = manifest['tables']['news_article']
+    assert summary['tables']['news_article']['written'] == len(articles)
+    assert sum(entry['rows'] for entry in articles.values()) == 40
+    assert all(path.startswith('news_article/label=') for path in articles)
+    
+    fake = [entry for path, entry in articles.items() if '/label=fake/' in path]
+    table = pq.read_table(os.path.join(str(tmp_path), fake[0]['file']))
+    assert set(table.column('label').to_pylist()) == {'fake'}
+    assert sum(entry['rows'] for entry in manifest['tables']['tweet'].values()) == 80
+
+def test_snapshot_rewrites_only_changed_partitions(app, tmp_path):
+    with app.app_context():
+        write_snapshot(str(tmp_path))
+        assert write_snapshot(str(tmp_path))['tables']['tweet']['written'] == 0
+        
+        db.session.get(Tweet, 1).retweet_count += 100
+        db.session.commit()
+        summary = write_snapshot(str(tmp_path))
+    
+    assert summary['tables']['tweet']['written'] == 1
+    assert summary['tables']['news_article']['written'] == 0
+    
+    manifest = load_manifest(str(tmp_path))
+    assert len(manifest['snapshots']) == 3
+    files = [entry['file'] for entry in manifest['tables']['tweet'].values()]
+    assert all(os.path.exists(os.path.join(str(tmp_path), f)) for f in files)
+    assert sum(pq.read_table(os.path.join(str(tmp_path), f)).num_rows for f in files) == 80
+
+def test_snapshot_notices_changes_to_any_column(app, tmp_path):
+    with app.app_context():
+        write_snapshot(str(tmp_path))
+        
+        user = db.session.get(User, 1)
+        user.verified = not user.verified
+        # Offsetting count changes leave the old per-column sum unchanged
+        tweet = db.session.get(Tweet, 2)
+        tweet.retweet_count += 3
+        tweet.favorite_count -= 3
+        db.session.commit()
+        summary = write_snapshot(str(tmp_path))
+    
+    assert summary['tables']['users']['written'] == 1
+    assert summary['tables']['tweet']['written'] == 1
+
+def test_partition_emptied_before_writing_is_left_out(app, tmp_path, monkeypatch):
+    fingerprints = snapshots._fingerprints
+    
+    def with_ghost(table, spec):
+        current = fingerprints(table, spec)
+        current[f'{table}/label=ghost/month=2000-01'] = [1, '1', 1]
+        return current
+    
+    monkeypatch.setattr(snapshots, '_fingerprints', with_ghost)
+    with app.app_context():
+        summary = write_snapshot(str(tmp_path), ['users'])
+    
+    assert summary['tables']['users']['unchanged'] == 0
+    assert not any('ghost' in path for path in load_manifest(str(tmp_path))['tables']['users'])
+
+def test_snapshots_are_written_by_the_cli_only(client, app, tmp_path):
+    app.config['SNAPSHOT_DIR'] = str(tmp_path)
+    assert client.post('/api/snapshots?tables=users').status_code == 405
+    
+    write_snapshot(str(tmp_path), ['users'])
+    assert list(client.get('/api/snapshots').get_json()['tables']) == ['users']
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Check the hourly engagement buckets behind the viral content panel
+"""
+
+from datetime import datetime, timedelta
+
+from app.database import db
+from app.models import Tweet
+from app.viral import refresh_engagement_buckets
+
+def test_viral_content_ranks_by_engagement_score(client):
+    articles = client.get('/operational/viral-content?hours=6').get_json()
+    scores = [a['engagement_score'] for a in articles]
+    
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] == articles[0]['retweet_count'] * 2 + articles[0]['favorite_count'] + articles[0]['tweet_count'] * 0.5
+
+def test_buckets_match_live_query(app, client, count_queries):
+    live = {hours: client.get(f'/operational/viral-content?hours={hours}&label=fake').get_json()
+            for hours in (3, 24, 168)}
+    with app.app_context():
+        refresh_engagement_buckets()
+    
+    for hours, expected in live.items():
+        with count_queries() as statements:
+            served = client.get(f'/operational/viral-content?hours={hours}&label=fake').get_json()
+        assert not any('FROM tweet' in statement for statement in statements)
+        # Buckets cover whole hours, so the oldest partial hour may add articles
+        assert {a['article_id'] for a in expected} <= {a['article_id'] for a in served}
+        assert len(served) <= len(expected) + 1
+        by_id = {a['article_id']: a for a in served}
+        assert all(by_id[a['article_id']] == a for a in expected)
+
+def test_refresh_prunes_and_rebuilds_recent_buckets(app, client):
+    with app.app_context():
+        refresh_engagement_buckets()
+        tweet = db.session.get(Tweet, 1)
+        tweet.retweet_count += 1000
+        db.session.add(Tweet(tweet_id=999, article_id='article_39', user_id=1, retweet_count=0,
+                             favorite_count=0, created_at=datetime.utcnow() - timedelta(days=30)))
+        db.session.commit()
+        refresh_engagement_buckets(since=datetime.utcnow() - timedelta(hours=2))
+    
+    top = client.get('/operational/viral-content?hours=24').get_json()[0]
+    assert top['article_id'] == 'article_0'
+    assert top['retweet_count'] == 1001